@@ -0,0 +1,252 @@
+"""End-to-end benchmark of ``con-duct-gallery generate`` on synthetic registries.
+
+For each registry size the benchmark measures three builds, entirely offline:
+
+- ``cold``: empty manifest, no images, no README
+- ``warm``: immediately rebuild with nothing changed
+- ``incremental``: rebuild after changing 1% of the usage logs
+
+Results are written as JSON to ``benchmarks/results/`` and can be compared
+against an earlier result file to catch scaling regressions::
+
+    python benchmarks/bench_generate.py --sizes 10 100 1000 10000
+    python benchmarks/bench_generate.py --sizes 10 100 --compare benchmarks/results/<old>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic import DEFAULT_MIX, write_registry  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+MODES = ['cold', 'warm', 'incremental']
+
+# Stand-in for `con-duct plot` so the benchmark measures the gallery itself
+STUB_PLOTTER = """#!/bin/sh
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --output) out="$2"; shift ;;
+    esac
+    shift
+done
+printf '<svg xmlns="http://www.w3.org/2000/svg"/>\\n' > "$out"
+"""
+
+
+def install_stub_plotter(bin_dir: Path) -> None:
+    """Put a trivial `con-duct` executable into bin_dir."""
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    script = bin_dir / 'con-duct'
+    script.write_text(STUB_PLOTTER)
+    script.chmod(script.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+def touch_usage_logs(workdir: Path, fraction: float) -> int:
+    """Append a report to a fraction of the usage logs.
+
+    Returns:
+        Number of modified logs
+    """
+    usage_logs = sorted((workdir / 'logs').glob('*/*_usage.json'))
+    step = max(1, round(1 / fraction)) if fraction > 0 else len(usage_logs) + 1
+    changed = usage_logs[::step]
+    for path in changed:
+        with open(path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - 4096, 0))
+            last = f.read().rstrip(b'\n').rsplit(b'\n', 1)[-1]
+            f.write(last + b'\n')
+    return len(changed)
+
+
+def run_generate(workdir: Path, env: dict, jobs: int, extra_args: list[str]) -> dict:
+    """Run one `generate` build and return its measurements."""
+    profile_path = workdir / 'profile.json'
+    cmd = [
+        sys.executable, '-m', 'con_duct_gallery', 'generate',
+        '--profile', str(profile_path),
+        '--jobs', str(jobs),
+    ] + extra_args
+
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=workdir, env=env, capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+
+    if proc.returncode != 0:
+        raise RuntimeError(f"generate failed ({proc.returncode}):\n{proc.stderr[-2000:]}")
+
+    report = json.loads(profile_path.read_text())
+    return {
+        'seconds': round(seconds, 4),
+        'stage_seconds': report['stage_seconds'],
+        'stages_ran': sum(c['misses'] for c in report['cache'].values()),
+        'stages_cached': sum(c['hits'] for c in report['cache'].values()),
+    }
+
+
+def bench_size(size: int, args, env: dict) -> list[dict]:
+    """Run all requested modes for one registry size."""
+    workdir = Path(tempfile.mkdtemp(prefix=f'duct-gallery-bench-{size}-', dir=args.workdir))
+    try:
+        start = time.perf_counter()
+        write_registry(workdir, size, args.mix, seed=args.seed)
+        setup = time.perf_counter() - start
+        print(f"[{size}] generated synthetic logs in {setup:.1f}s", file=sys.stderr)
+
+        results = []
+        for mode in MODES:
+            if mode not in args.modes:
+                # Later modes need the earlier builds' state
+                if mode == 'cold' and ('warm' in args.modes or 'incremental' in args.modes):
+                    run_generate(workdir, env, args.jobs, args.generate_args)
+                continue
+            if mode == 'incremental':
+                changed = touch_usage_logs(workdir, args.incremental_fraction)
+            else:
+                changed = 0
+            measured = run_generate(workdir, env, args.jobs, args.generate_args)
+            measured.update({'size': size, 'mode': mode, 'changed_logs': changed})
+            results.append(measured)
+            print(
+                f"[{size}] {mode:<11} {measured['seconds']:9.3f}s  "
+                f"({measured['stages_ran']} stages ran)",
+                file=sys.stderr
+            )
+        return results
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def git_revision() -> str:
+    """Return the current commit of the repository, if available."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current: dict, baseline_path: Path, threshold: float) -> bool:
+    """Print a comparison against a baseline result file.
+
+    Returns:
+        True if no (size, mode) pair regressed by more than threshold
+    """
+    baseline = json.loads(baseline_path.read_text())
+    before = {(r['size'], r['mode']): r['seconds'] for r in baseline['results']}
+
+    ok = True
+    print(f"\nComparison against {baseline_path} ({baseline.get('revision', '?')}):")
+    for result in current['results']:
+        key = (result['size'], result['mode'])
+        if key not in before:
+            continue
+        ratio = result['seconds'] / before[key] if before[key] else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            ok = False
+        print(
+            f"  {key[0]:>6} {key[1]:<11} {before[key]:9.3f}s -> "
+            f"{result['seconds']:9.3f}s  ({ratio:5.2f}x){flag}"
+        )
+    return ok
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """Parse 'short=96,long=2,many-pids=2' into profile weights."""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000],
+                        help='Registry sizes to benchmark (default: 10 100 1000 10000)')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES,
+                        help='Builds to measure (default: all)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Value passed to generate --jobs (default: CPU count)')
+    parser.add_argument('--plotter', choices=['stub', 'con-duct'], default='stub',
+                        help="'stub' replaces con-duct plot with a trivial script so only "
+                             "the gallery is measured; 'con-duct' uses the real one")
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help='Profile weights (default: short=96,long=2,many-pids=2)')
+    parser.add_argument('--incremental-fraction', type=float, default=0.01,
+                        help='Fraction of usage logs changed for incremental builds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', type=Path, default=None,
+                        help='Where to create temporary registries (default: system temp)')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated registries')
+    parser.add_argument('--results-dir', type=Path, default=RESULTS_DIR)
+    parser.add_argument('--compare', type=Path, metavar='BASELINE',
+                        help='Earlier result file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Relative slowdown reported as a regression (default: 0.25)')
+    parser.add_argument('generate_args', nargs=argparse.REMAINDER,
+                        help='Extra arguments for generate (after --)')
+    args = parser.parse_args(argv)
+    args.generate_args = [a for a in args.generate_args if a != '--']
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [str(REPO_ROOT / 'src')] + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else [])
+    )
+    stub_dir = None
+    if args.plotter == 'stub':
+        stub_dir = Path(tempfile.mkdtemp(prefix='duct-gallery-bench-bin-'))
+        install_stub_plotter(stub_dir)
+        env['PATH'] = f"{stub_dir}{os.pathsep}{env.get('PATH', '')}"
+
+    try:
+        results = []
+        for size in args.sizes:
+            results.extend(bench_size(size, args, env))
+    finally:
+        if stub_dir is not None:
+            shutil.rmtree(stub_dir, ignore_errors=True)
+
+    now = datetime.now(timezone.utc)
+    report = {
+        'revision': git_revision(),
+        'timestamp': now.isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'jobs': args.jobs,
+        'plotter': args.plotter,
+        'mix': args.mix,
+        'results': results,
+    }
+    args.results_dir.mkdir(parents=True, exist_ok=True)
+    out = args.results_dir / f"{now.strftime('%Y%m%dT%H%M%S')}-{report['revision']}.json"
+    out.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {out}", file=sys.stderr)
+
+    if args.compare:
+        return 0 if compare(report, args.compare, args.threshold) else 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
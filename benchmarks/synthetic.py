@@ -0,0 +1,251 @@
+"""Generators for synthetic con/duct log sets modeled on the logs in logs/.
+
+Profiles mirror the real examples:
+
+- ``short``: a minute of sampling from one or two processes
+  (asmacdo-gallery examples)
+- ``long``: a single process sampled for 7.4 hours, 446 reports of up to
+  59 samples each (~26k samples), killed with exit code 137 (s5cmd-1)
+- ``many-pids``: ~1,000 reports with dozens of concurrent, short-lived
+  child processes and ~740 KB of stdout (mriqc)
+
+Every generated example gets unique file content so that content-hash
+based caching cannot collapse them into one.
+"""
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import yaml
+
+
+class Profile(NamedTuple):
+    """Shape of a synthetic duct run."""
+    name: str
+    reports: int
+    samples_per_report: int
+    concurrent_pids: int
+    pid_turnover: float
+    stdout_bytes: int
+    stderr_bytes: int
+    exit_code: int = 0
+
+
+PROFILES = {
+    'short': Profile('short', 60, 1, 2, 0.05, 256, 0),
+    'long': Profile('long', 446, 59, 1, 0.0, 0, 0, exit_code=137),
+    'many-pids': Profile('many-pids', 1024, 56, 40, 0.6, 740_000, 43_000),
+}
+
+# Default registry mix: mostly small examples with a few heavy ones
+DEFAULT_MIX = {'short': 96, 'long': 2, 'many-pids': 2}
+
+COMMANDS = [
+    '/opt/conda/bin/python3.11 /opt/conda/bin/mriqc sourcedata/raw . participant',
+    'antsRegistration --dimensionality 3 --float 1',
+    '3dvolreg -Fourier -twopass -zpad 4',
+    '../s5cmd/s5cmd --dry-run sync s3://dandiarchive/* dandiarchive/',
+    'Singularity runtime parent',
+    '/bin/sh -c antsRegistration --version',
+]
+
+
+def _etime(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def usage_lines(profile: Profile, rng: random.Random, start: datetime):
+    """Yield JSON Lines usage reports for a synthetic run.
+
+    Yields:
+        (line, num_samples, totals) where totals holds the report's summed values
+    """
+    next_pid = rng.randint(100_000, 4_000_000)
+    active: dict[int, tuple[str, int, datetime]] = {}
+    interval = max(profile.samples_per_report, 1)
+
+    for report in range(profile.reports):
+        now = start + timedelta(seconds=report * interval)
+
+        # Replace finished processes and keep the concurrency target
+        for pid in list(active):
+            if rng.random() < profile.pid_turnover:
+                del active[pid]
+        while len(active) < rng.randint(1, profile.concurrent_pids):
+            active[next_pid] = (
+                rng.choice(COMMANDS),
+                rng.randint(1 << 20, 1 << 30),
+                now,
+            )
+            next_pid += rng.randint(1, 50)
+
+        processes = {}
+        totals = {'pmem': 0.0, 'pcpu': 0.0, 'rss': 0, 'vsz': 0}
+        for pid, (cmd, base_rss, started) in active.items():
+            rss = int(base_rss * rng.uniform(0.5, 1.5))
+            vsz = rss * rng.randint(2, 8)
+            pcpu = round(rng.uniform(0, 101), 1)
+            pmem = round(rss / 67_403_276_288 * 100, 1)
+            processes[str(pid)] = {
+                'pcpu': pcpu,
+                'pmem': pmem,
+                'rss': rss,
+                'vsz': vsz,
+                'timestamp': now.isoformat(),
+                'etime': _etime((now - started).total_seconds()),
+                'stat': {'S': profile.samples_per_report},
+                'cmd': cmd,
+            }
+            totals['pmem'] += pmem
+            totals['pcpu'] += pcpu
+            totals['rss'] += rss
+            totals['vsz'] += vsz
+
+        # Like duct, the first report is written after a single sample
+        num_samples = 1 if report == 0 else profile.samples_per_report
+        record = {
+            'timestamp': now.isoformat(),
+            'num_samples': num_samples,
+            'processes': processes,
+            'totals': totals,
+            'averages': dict(totals, num_samples=num_samples),
+        }
+        yield json.dumps(record), num_samples, totals
+
+
+def _text_blob(rng: random.Random, nbytes: int) -> str:
+    """Return log-like text of roughly nbytes."""
+    words = ['INFO', 'nipype.workflow', 'Finished', 'node', 'running', 'fmriprep', 'ok', 'sub-0001']
+    lines = []
+    size = 0
+    while size < nbytes:
+        line = f"{rng.randint(0, 99999):05d} " + ' '.join(rng.choice(words) for _ in range(8))
+        lines.append(line)
+        size += len(line) + 1
+    return '\n'.join(lines) + ('\n' if lines else '')
+
+
+def write_example(example_dir: Path, profile: Profile, seed: int) -> Path:
+    """Write a complete duct log set (info, usage, stdout, stderr).
+
+    Args:
+        example_dir: Directory to write the files into
+        profile: Shape of the run
+        seed: Random seed (distinct seeds give distinct content)
+
+    Returns:
+        Path to the written info JSON
+    """
+    rng = random.Random(seed)
+    example_dir.mkdir(parents=True, exist_ok=True)
+    start = datetime(2024, 10, 28, 11, 8, 51, tzinfo=timezone.utc) + timedelta(seconds=seed)
+    prefix = f"{start.strftime('%Y.%m.%dT%H.%M.%S')}-{seed}_"
+
+    peak = {'rss': 0, 'vsz': 0, 'pmem': 0.0, 'pcpu': 0.0}
+    sums = {'rss': 0.0, 'vsz': 0.0, 'pmem': 0.0, 'pcpu': 0.0}
+    total_samples = 0
+    with open(example_dir / f"{prefix}usage.json", 'w') as f:
+        for line, num_samples, totals in usage_lines(profile, rng, start):
+            f.write(line + '\n')
+            total_samples += num_samples
+            for key in peak:
+                peak[key] = max(peak[key], totals[key])
+                sums[key] += totals[key]
+
+    (example_dir / f"{prefix}stdout").write_text(_text_blob(rng, profile.stdout_bytes))
+    (example_dir / f"{prefix}stderr").write_text(_text_blob(rng, profile.stderr_bytes))
+
+    wall_clock = profile.reports * max(profile.samples_per_report, 1)
+    reports = max(profile.reports, 1)
+    info = {
+        'command': COMMANDS[seed % len(COMMANDS)],
+        'system': {
+            'cpu_total': 32,
+            'memory_total': 67_403_276_288,
+            'hostname': 'synthetic',
+            'uid': 1000,
+            'user': 'bench',
+        },
+        'env': {},
+        'gpu': None,
+        'duct_version': '0.16.0',
+        'schema_version': '0.2.2',
+        'execution_summary': {
+            'exit_code': profile.exit_code,
+            'command': COMMANDS[seed % len(COMMANDS)],
+            'logs_prefix': f".duct/logs/{prefix}",
+            'wall_clock_time': float(wall_clock),
+            'peak_rss': peak['rss'],
+            'average_rss': sums['rss'] / reports,
+            'peak_vsz': peak['vsz'],
+            'average_vsz': sums['vsz'] / reports,
+            'peak_pmem': peak['pmem'],
+            'average_pmem': sums['pmem'] / reports,
+            'peak_pcpu': peak['pcpu'],
+            'average_pcpu': sums['pcpu'] / reports,
+            'num_samples': total_samples,
+            'num_reports': profile.reports,
+            'start_time': start.timestamp(),
+            'end_time': start.timestamp() + wall_clock,
+        },
+        'output_paths': {
+            name: f".duct/logs/{prefix}{suffix}"
+            for name, suffix in [
+                ('stdout', 'stdout'), ('stderr', 'stderr'),
+                ('usage', 'usage.json'), ('info', 'info.json'),
+            ]
+        },
+    }
+    info['output_paths']['prefix'] = f".duct/logs/{prefix}"
+    info_path = example_dir / f"{prefix}info.json"
+    info_path.write_text(json.dumps(info))
+    return info_path
+
+
+def profile_sequence(count: int, mix: Optional[dict[str, int]] = None) -> list[Profile]:
+    """Spread profiles over count examples according to mix weights."""
+    mix = mix or DEFAULT_MIX
+    cycle = [PROFILES[name] for name, weight in sorted(mix.items()) for _ in range(weight)]
+    # Interleave so heavy profiles are spread out instead of clustered at the start
+    random.Random(0).shuffle(cycle)
+    return [cycle[i % len(cycle)] for i in range(count)]
+
+
+def write_registry(
+    root: Path,
+    count: int,
+    mix: Optional[dict[str, int]] = None,
+    seed: int = 0
+) -> Path:
+    """Write count synthetic local examples and a matching gallery config.
+
+    Args:
+        root: Working directory (config, logs/ are created here)
+        count: Number of examples
+        mix: Profile weights (default DEFAULT_MIX)
+        seed: Base random seed
+
+    Returns:
+        Path to the written con-duct-gallery.yaml
+    """
+    examples = []
+    for index, profile in enumerate(profile_sequence(count, mix)):
+        example_dir = root / 'logs' / f"synthetic-{index:05d}"
+        info_path = write_example(example_dir, profile, seed + index)
+        examples.append({
+            'title': f"synthetic {index:05d} ({profile.name})",
+            'source_repo': '',
+            'info_file': str(info_path.relative_to(root)),
+            'tags': ['synthetic', profile.name],
+        })
+
+    config = root / 'con-duct-gallery.yaml'
+    config.write_text(yaml.safe_dump({'examples': examples}, sort_keys=False))
+    return config
@@ -1,3 +1,17 @@
 """con/duct Examples Gallery - Automated markdown gallery generator for con/duct usage examples."""
 
 __version__ = "0.1.0"
+
+# The library API is imported on first use, so the CLI starts without the pipeline
+_API = ('build_gallery', 'DirectorySink', 'GalleryBuild', 'LogSources', 'MemorySink',
+        'TarballSink')
+
+__all__ = ['__version__', *_API]
+
+
+def __getattr__(name):
+    if name in _API:
+        from . import api
+
+        return getattr(api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,14 +1,16 @@
-"""Main entry point for con-duct-gallery CLI."""
+"""Main entry point for con-duct-gallery CLI.
+
+Only the argument parser is imported at module level. Each command imports
+what it needs when it runs, so `--help` and `generate --dry-run` do not
+pay for importing requests, pydantic or the build pipeline.
+"""
 
 import logging
 import sys
 from pathlib import Path
+from typing import Optional
 
 from .cli import parse_args
-from .models import ExampleRegistry
-from .fetcher import fetch_log_files
-from .plotter import generate_plot, should_regenerate_plot
-from .generator import generate_gallery, slugify
 
 
 def setup_logging(verbose: bool = False):
@@ -37,117 +39,415 @@ def main() -> int:
     setup_logging(args.verbose)
     logger = logging.getLogger(__name__)
 
-    # Check for generate command
-    if args.command != 'generate':
+    commands = {
+        'generate': dry_run if getattr(args, 'dry_run', False) else generate,
+        'watch': watch,
+        'serve': serve,
+        'check': check,
+        'compare': compare,
+        'query': query,
+        'cache': cache,
+    }
+    if args.command not in commands:
         logger.error("Please specify a command. Use 'generate' to create the gallery.")
         return 1
 
     try:
-        # 1. Load and validate YAML configuration
-        logger.info(f"Loading configuration from {args.config}")
-        if not args.config.exists():
-            logger.error(f"Configuration file not found: {args.config}")
-            return 1
+        return commands[args.command](args)
+    except KeyboardInterrupt:
+        logger.info("\nInterrupted by user")
+        return 130
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        if args.verbose:
+            import traceback
+            traceback.print_exc()
+        return 1
+
+
+def cache_dir(args) -> Optional[Path]:
+    """Persistent cache directory selected by the cache options, or None if disabled."""
+    if args.no_cache:
+        return None
+    if args.cache_dir is not None:
+        return args.cache_dir
+    from .cache import default_cache_dir
+
+    return default_cache_dir()
+
+
+def dry_run(args) -> int:
+    """Report what `generate` would do, importing nothing but PyYAML.
+
+    The configuration is checked with the rules of the models (titles,
+    tags, info files, duplicates) but without pydantic, so values it
+    coerces (URLs, renderers, git sources) are only checked by `generate`.
+    """
+    import yaml
+
+    from .validation import check_config
+
+    logger = logging.getLogger(__name__)
+    logger.info(f"Loading configuration from {args.config}")
+    if not args.config.exists():
+        logger.error(f"Configuration file not found: {args.config}")
+        return 1
+
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    try:
+        with open(args.config) as f:
+            examples = check_config(yaml.load(f, Loader=loader))
+    except Exception as e:
+        logger.error(f"Failed to load configuration: {e}")
+        return 1
+
+    logger.info(f"✓ Loaded {len(examples)} examples")
+    logger.info(f"[DRY RUN] Would fetch logs for {len(examples)} examples")
+    logger.info(f"[DRY RUN] Would generate {len(examples)} plots")
+    logger.info(f"[DRY RUN] Would write {args.output}")
+    return 0
+
+
+def generate(args) -> int:
+    """Run the `generate` command."""
+    import sqlite3
+
+    from .history import RunHistory, record_build
+    from .models import ExampleRegistry
+    from .pipeline import BuildOptions, GalleryPipeline
+    from .profiling import BuildProfile
+
+    logger = logging.getLogger(__name__)
+
+    # 1. Load and validate YAML configuration
+    logger.info(f"Loading configuration from {args.config}")
+    if not args.config.exists():
+        logger.error(f"Configuration file not found: {args.config}")
+        return 1
+
+    try:
+        registry = ExampleRegistry.from_yaml(args.config)
+        logger.info(f"✓ Loaded {len(registry.examples)} examples")
+    except Exception as e:
+        logger.error(f"Failed to load configuration: {e}")
+        return 1
+
+    # 2. Bring fetch, parse and plot stages of each example up to date
+    options = BuildOptions(
+        output=args.output,
+        log_dir=args.log_dir,
+        image_dir=args.image_dir,
+        manifest=args.manifest,
+        preview_lines=args.preview_lines,
+        renderer=args.renderer,
+        force=args.force,
+        revalidate=args.revalidate,
+        deadline=args.deadline,
+        host_failures=args.host_failures,
+        cache_dir=cache_dir(args),
+        cache_size=args.cache_limit
+    )
+    diff = None
+    if args.diff_against:
+        from .preview import base_fingerprints, diff_examples
 
         try:
-            registry = ExampleRegistry.from_yaml(args.config)
-            logger.info(f"✓ Loaded {len(registry.examples)} examples")
-        except Exception as e:
-            logger.error(f"Failed to load configuration: {e}")
+            diff = diff_examples(registry, base_fingerprints(args.diff_against, args.config))
+        except ValueError as e:
+            logger.error(f"Cannot diff against '{args.diff_against}': {e}")
             return 1
+        logger.info(
+            f"✓ {len(diff.added)} added, {len(diff.changed)} changed, "
+            f"{len(diff.removed)} removed since {args.diff_against}"
+        )
 
-        # Dry run mode
-        if args.dry_run:
-            logger.info(f"[DRY RUN] Would fetch logs for {len(registry.examples)} examples")
-            logger.info(f"[DRY RUN] Would generate {len(registry.examples)} plots")
-            logger.info(f"[DRY RUN] Would write {args.output}")
-            return 0
-
-        # 2. Process each example
-        fetch_failures = 0
-        plot_failures = 0
-        example_log_paths = {}  # Store log paths for each example
+    profile = BuildProfile() if args.profile else None
+    pipeline = GalleryPipeline(options, profile=profile)
 
-        for example in registry.examples:
-            try:
-                # Fetch logs
-                fetched_log = fetch_log_files(example, args.log_dir, args.force)
-
-                # Store log paths for this example
-                example_log_paths[example.title] = {
-                    'info': fetched_log.info_json,
-                    'usage': fetched_log.usage_json,
-                    'stdout': fetched_log.stdout,
-                    'stderr': fetched_log.stderr
-                }
-
-                # Generate plot if needed
-                slug = slugify(example.title)
-                svg_path = args.image_dir / f"{slug}.svg"
-
-                if should_regenerate_plot(svg_path, fetched_log.usage_json, args.force):
-                    try:
-                        logger.info(f"Generating plot for '{example.title}'")
-                        generate_plot(
-                            fetched_log.usage_json,
-                            svg_path,
-                            example.plot_options
-                        )
-                        logger.info(f"  ✓ Plot saved: {svg_path}")
-                    except Exception as e:
-                        logger.warning(f"  ✗ Plot generation failed: {e}")
-                        plot_failures += 1
-                else:
-                    logger.info(f"Using cached plot for '{example.title}'")
-
-            except Exception as e:
-                logger.warning(f"✗ Failed to fetch '{example.title}': {e}")
-                fetch_failures += 1
-                continue
+    try:
+        if diff is None:
+            results = pipeline.build_examples(registry.examples, jobs=args.jobs)
+        else:
+            results = pipeline.build_changed(registry.examples, diff.rebuild, jobs=args.jobs)
+        fetch_failures = sum(1 for r in results if r.fetch_error is not None)
+        plot_failures = sum(1 for r in results if r.plot_error is not None)
 
         # Check if all examples failed
         if fetch_failures == len(registry.examples):
             logger.error("All examples failed to fetch")
             return 2
 
-        # 3. Generate README.md
+        # 3. Append new runs to the history database
+        try:
+            with RunHistory(args.history) as history:
+                added = record_build(history, registry, results, pipeline.manifest)
+            if added:
+                logger.info(f"✓ Recorded {added} new runs in {args.history}")
+        except (sqlite3.Error, OSError, ValueError) as e:
+            logger.warning(f"Could not update run history {args.history}: {e}")
+
+        # 4. Render README.md (only rewritten when its content changed)
         logger.info("Generating markdown gallery")
         try:
-            markdown = generate_gallery(registry, args.image_dir, example_log_paths)
+            rendered = pipeline.render(registry, results)
         except Exception as e:
-            logger.error(f"Failed to generate gallery: {e}")
+            logger.error(f"Failed to write gallery: {e}")
             return 4
 
-        # 4. Write output file
+        if diff is not None:
+            from .preview import write_preview
+
+            try:
+                preview = write_preview(diff, results, args.preview_dir, args.image_dir)
+                logger.info(f"✓ Preview of changed examples written to {preview}")
+            except OSError as e:
+                logger.warning(f"Could not write preview to {args.preview_dir}: {e}")
+
+        # 5. Drop images replaced in this build, and cache entries beyond the limit
         try:
-            args.output.write_text(markdown)
-            logger.info(f"✓ Gallery written to {args.output}")
+            removed = pipeline.prune_images(registry.examples)
+            if removed:
+                logger.info(f"✓ Removed {len(removed)} unused images")
+        except OSError as e:
+            logger.warning(f"Could not prune {args.image_dir}: {e}")
+        if pipeline.cache is not None:
+            try:
+                pipeline.cache.evict()
+            except OSError as e:
+                logger.warning(f"Could not trim cache {pipeline.cache.root}: {e}")
+    finally:
+        pipeline.save()
+        if profile is not None:
+            profile.finish()
+            try:
+                profile.write(args.profile)
+            except OSError as e:
+                logger.warning(f"Could not write profile report: {e}")
 
-            # Summary
-            successful = len(registry.examples) - fetch_failures
-            num_tags = len(registry.get_all_tags())
-            logger.info(f"✓ Generated gallery with {successful} examples, {num_tags} tags")
+    if rendered.ran:
+        logger.info(f"✓ Gallery written to {args.output}")
+    else:
+        logger.info(f"✓ Gallery {args.output} is up to date")
 
-            if fetch_failures > 0:
-                logger.warning(f"  {fetch_failures} examples failed to fetch")
-            if plot_failures > 0:
-                logger.warning(f"  {plot_failures} plots failed to generate")
+    # Summary
+    successful = len(registry.examples) - fetch_failures
+    num_tags = len(registry.get_all_tags())
+    logger.info(f"✓ Generated gallery with {successful} examples, {num_tags} tags")
+    pipeline.report()
+    if profile is not None:
+        for line in profile.summary_lines():
+            logger.info(line)
+        logger.info(f"  Profile report written to {args.profile}")
 
-        except Exception as e:
-            logger.error(f"Failed to write output file: {e}")
-            return 4
+    if fetch_failures > 0:
+        logger.warning(f"  {fetch_failures} examples failed to fetch")
+    if plot_failures > 0:
+        logger.warning(f"  {plot_failures} plots failed to generate")
 
-        return 0
+    return 0
 
-    except KeyboardInterrupt:
-        logger.info("\nInterrupted by user")
-        return 130
+
+def watch(args) -> int:
+    """Run the `watch` command."""
+    from .pipeline import BuildOptions
+    from .watch import GalleryWatcher, make_watcher
+
+    logger = logging.getLogger(__name__)
+    if not args.config.exists():
+        logger.error(f"Configuration file not found: {args.config}")
+        return 1
+
+    options = BuildOptions(
+        output=args.output,
+        log_dir=args.log_dir,
+        image_dir=args.image_dir,
+        manifest=args.manifest,
+        preview_lines=args.preview_lines,
+        renderer=args.renderer
+    )
+    gallery = GalleryWatcher(args.config, options)
+    watcher = make_watcher(args.poll, args.poll_interval)
+    try:
+        gallery.run(watcher, args.debounce)
+    finally:
+        watcher.close()
+    return 0
+
+
+def serve(args) -> int:
+    """Run the `serve` command."""
+    from .models import ExampleRegistry
+    from .pipeline import BuildOptions
+    from .server import GalleryServer, make_server
+
+    logger = logging.getLogger(__name__)
+    try:
+        registry = ExampleRegistry.from_yaml(args.config)
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
-        if args.verbose:
-            import traceback
-            traceback.print_exc()
+        logger.error(f"Failed to load configuration: {e}")
+        return 1
+
+    options = BuildOptions(
+        output=args.output,
+        log_dir=args.log_dir,
+        image_dir=args.image_dir,
+        manifest=args.manifest,
+        preview_lines=args.preview_lines,
+        renderer=args.renderer
+    )
+    gallery = GalleryServer(registry, options, args.cache_size * 1024 * 1024)
+    server = make_server(gallery, args.host, args.port)
+    host, port = server.server_address[:2]
+    logger.info(f"Serving {len(registry.examples)} examples at http://{host}:{port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+    return 0
+
+
+def check(args) -> int:
+    """Run the `check` command.
+
+    Returns:
+        0 if the gallery is up to date, 1 if `generate` has work to do
+        (or the configuration cannot be loaded)
+    """
+    from .check import check_gallery
+    from .models import ExampleRegistry
+    from .pipeline import BuildOptions
+
+    logger = logging.getLogger(__name__)
+    if not args.config.exists():
+        logger.error(f"Configuration file not found: {args.config}")
+        return 1
+    try:
+        registry = ExampleRegistry.from_yaml(args.config)
+    except Exception as e:
+        logger.error(f"Failed to load configuration: {e}")
+        return 1
+
+    options = BuildOptions(
+        output=args.output,
+        log_dir=args.log_dir,
+        image_dir=args.image_dir,
+        manifest=args.manifest,
+        preview_lines=args.preview_lines,
+        renderer=args.renderer,
+        revalidate=not args.offline
+    )
+    outdated = check_gallery(registry, options)
+    if outdated:
+        logger.info(f"✗ {len(outdated)} stages out of date")
+        return 1
+    logger.info("✓ Gallery is up to date")
+    return 0
+
+
+def compare(args) -> int:
+    """Run the `compare` command."""
+    from .compare import compare_examples, select_examples
+    from .models import ExampleRegistry
+    from .pipeline import BuildOptions, GalleryPipeline
+
+    logger = logging.getLogger(__name__)
+    try:
+        registry = ExampleRegistry.from_yaml(args.config)
+        examples = select_examples(registry, args.examples, args.tag)
+    except Exception as e:
+        logger.error(f"Failed to select examples: {e}")
+        return 1
+
+    pipeline = GalleryPipeline(BuildOptions(
+        log_dir=args.log_dir,
+        manifest=args.manifest,
+        cache_dir=cache_dir(args),
+        cache_size=args.cache_limit
+    ))
+    logger.info(f"Comparing {len(examples)} examples")
+    try:
+        output = compare_examples(
+            examples, pipeline, args.output, args.points, tuple(args.metrics)
+        )
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+    finally:
+        pipeline.save()
+    logger.info(f"✓ Comparison written to {output}")
+    return 0
+
+
+def query(args) -> int:
+    """Run the `query` command, printing a table to stdout."""
+    from .history import RunHistory, format_metric, parse_since
+
+    logger = logging.getLogger(__name__)
+    if not args.history.exists():
+        logger.error(f"Run history not found: {args.history} (run generate first)")
+        return 1
+
+    try:
+        with RunHistory(args.history) as history:
+            if args.query == 'top':
+                rows = history.top(args.metric, args.limit, args.tag)
+                header = (args.metric,)
+                columns = (args.metric,)
+            else:
+                since = parse_since(args.since)
+                rows = history.growth(args.metric, since, args.threshold, args.tag)
+                header = ('before', 'latest', 'growth')
+                columns = (args.metric, args.metric, None)
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+
+    table = [('example',) + header]
+    for row in rows:
+        table.append((row.title,) + tuple(
+            format_metric(metric, value) if metric else f"{value:+.1f}%"
+            for metric, value in zip(columns, row.values)
+        ))
+    widths = [max(len(line[i]) for line in table) for i in range(len(header) + 1)]
+    for line in table:
+        print('  '.join(
+            cell.ljust(width) if i == 0 else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(line, widths))
+        ).rstrip())
+    return 0
+
+
+def cache(args) -> int:
+    """Run the `cache` command."""
+    from .atomic import atomic_write
+    from .cache import ContentCache, cache_key
+    from .units import format_bytes
+
+    logger = logging.getLogger(__name__)
+    if args.cache == 'key':
+        if not args.config.exists():
+            logger.error(f"Configuration file not found: {args.config}")
+            return 1
+        key = cache_key(args.config)
+        if args.output is not None and (
+            not args.output.exists() or args.output.read_text().strip() != key
+        ):
+            atomic_write(args.output, key + '\n')
+        print(key)
+        return 0
+
+    directory = cache_dir(args)
+    if directory is None:
+        logger.error("The cache is disabled (--no-cache)")
         return 1
+    store = ContentCache(directory, args.cache_limit)
+    if args.cache == 'prune':
+        removed = store.evict()
+        logger.info(f"✓ Evicted {len(removed)} entries")
+    usage = store.usage()
+    print(f"{directory}: {usage.files} files, {format_bytes(usage.bytes)} "
+          f"(limit {format_bytes(args.cache_limit)})")
+    return 0
 
 
 if __name__ == '__main__':
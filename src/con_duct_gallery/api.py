@@ -0,0 +1,331 @@
+"""Building the gallery from Python, e.g. inside a long-running service.
+
+``build_gallery`` runs the same stages as ``generate`` and returns what it
+built as data: the markdown, every example's section, plot bytes, parsed
+summary and resource distribution, plus build metrics. The files of the
+gallery (README.md, images/, logs/) go to sinks: a directory, memory or a
+tarball. Nothing is kept at module level, so several builds can run at
+once in one process; what they may share (the log cache, git clones, an
+HTTP session) is passed in as LogSources.
+"""
+
+import io
+import logging
+import tarfile
+import tempfile
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, Optional, Protocol, Sequence, Union
+
+from .atomic import atomic_output, atomic_write
+from .cache import DEFAULT_CACHE_SIZE
+from .generator import assemble_gallery, generate_leaderboards
+from .gitsource import GitSources
+from .models import ExampleRegistry
+from .pipeline import BuildOptions, ExampleResult, GalleryPipeline
+from .plotter import DEFAULT_RENDERER
+
+logger = logging.getLogger(__name__)
+
+GALLERY_FILE = 'README.md'
+IMAGES_DIR = 'images'
+LOGS_DIR = 'logs'
+
+
+class Sink(Protocol):
+    """Destination of the files of a build, named by relative POSIX paths."""
+
+    def write(self, name: str, data: bytes) -> None:
+        """Store one file."""
+
+    def close(self) -> None:
+        """Finish the output once all files were written."""
+
+    def abort(self) -> None:
+        """Discard the output of a build that failed."""
+
+
+class DirectorySink:
+    """Writes the files under a directory, leaving unchanged files untouched."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def write(self, name: str, data: bytes) -> None:
+        path = self.root / name
+        if path.is_file() and path.stat().st_size == len(data) and path.read_bytes() == data:
+            return
+        atomic_write(path, data)
+
+    def close(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        # Every file was replaced atomically, so nothing is half written
+        pass
+
+
+class MemorySink:
+    """Keeps the files in a dict, e.g. to serve them without touching disk."""
+
+    def __init__(self):
+        self.files: dict[str, bytes] = {}
+
+    def write(self, name: str, data: bytes) -> None:
+        self.files[name] = data
+
+    def close(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        self.files.clear()
+
+
+class TarballSink:
+    """Writes the files into a gzip-compressed tarball.
+
+    The tarball is written to a temporary file and renamed over path when
+    the sink is closed (and removed if it is aborted), or written to an
+    open binary file object.
+    """
+
+    def __init__(self, target: Union[Path, BinaryIO], mtime: Optional[float] = None):
+        self.mtime = int(time.time() if mtime is None else mtime)
+        self._stack = ExitStack()
+        if isinstance(target, (str, Path)):
+            target = self._stack.enter_context(
+                open(self._stack.enter_context(atomic_output(Path(target))), 'wb')
+            )
+        self._tar = tarfile.open(fileobj=target, mode='w:gz')
+
+    def write(self, name: str, data: bytes) -> None:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = self.mtime
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self) -> None:
+        self._tar.close()
+        self._stack.close()
+
+    def abort(self) -> None:
+        try:
+            self._tar.close()
+        finally:
+            # Unwinding with an error removes the temporary file instead of renaming it
+            self._stack.__exit__(RuntimeError, RuntimeError("build failed"), None)
+
+
+class LogSources:
+    """Where builds find example logs, shareable by concurrent builds.
+
+    Args:
+        repo_root: Root of local info files and archives (defaults to cwd)
+        cache_dir: Persistent cache of logs and plots (None to disable)
+        cache_size: Size cap of the cache in bytes
+        session: Optional requests session to reuse connections
+    """
+
+    def __init__(
+        self,
+        repo_root: Optional[Path] = None,
+        cache_dir: Optional[Path] = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        session=None
+    ):
+        self.repo_root = Path(repo_root or Path.cwd()).resolve()
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.cache_size = cache_size
+        self.session = session
+        # One set of clones, so builds of the same repository take turns on it
+        self.git = GitSources(self.cache_dir / 'git' if self.cache_dir is not None else None)
+
+
+class ExampleOutput(NamedTuple):
+    """What a build made of one example."""
+    slug: str
+    title: str
+    section: Optional[str]
+    plot: Optional[bytes]
+    processes_plot: Optional[bytes]
+    summary: dict
+    distribution: Optional[dict]
+    processes: Optional[list[dict]]
+    error: Optional[str]
+
+
+class GalleryBuild(NamedTuple):
+    """Result of build_gallery."""
+    markdown: str
+    examples: list[ExampleOutput]
+    files: dict[str, bytes]
+    metrics: dict
+
+
+def _file_names(result: ExampleResult, roots: Sequence[Path]) -> dict[Path, str]:
+    """Name in the gallery output of every file of a result, by its path."""
+    paths = list((result.log_paths or {}).values())
+    if result.svg_path is not None:
+        paths.append(result.svg_path)
+        paths.append(result.svg_path.with_name(f"{result.svg_path.stem}-processes.svg"))
+
+    names = {}
+    for path in paths:
+        if not path.is_file():
+            continue
+        for root in roots:
+            if path.is_relative_to(root):
+                names[path] = path.relative_to(root).as_posix()
+                break
+    return names
+
+
+def _example_output(result: ExampleResult, names: dict[Path, str], files: dict[str, bytes]):
+    """Collect the output of one example, with its section linking to file names."""
+    section = result.section
+    if section is not None:
+        for path, name in names.items():
+            section = section.replace(f"]({path})", f"]({name})")
+
+    def read(path):
+        return files.get(names[path]) if path in names else None
+
+    svg = result.svg_path
+    return ExampleOutput(
+        result.example.slug,
+        result.example.title,
+        section,
+        read(svg) if svg is not None else None,
+        read(svg.with_name(f"{svg.stem}-processes.svg")) if svg is not None else None,
+        result.summary,
+        result.distribution,
+        result.processes,
+        result.fetch_error or result.plot_error
+    )
+
+
+def build_gallery(
+    registry: ExampleRegistry,
+    sources: Optional[LogSources] = None,
+    sinks: Sequence[Sink] = (),
+    workspace: Optional[Path] = None,
+    jobs: int = 1,
+    renderer: str = DEFAULT_RENDERER,
+    force: bool = False,
+    deadline: Optional[float] = None,
+    include_logs: bool = True
+) -> GalleryBuild:
+    """Build the gallery of a registry and write its files to sinks.
+
+    The fetchers and con-duct work on files, so logs are fetched and
+    plots rendered into a workspace. Plots rendered by this build are
+    handed to the sinks from memory; logs, and plots that were already up
+    to date, are read back from the workspace (or, for local logs, the
+    repository) once for all sinks. The markdown never goes through disk.
+    The workspace thus holds a copy of every fetched log and image while
+    the build runs. A workspace given by the caller keeps them, and the
+    build manifest, so the next build with it only reruns outdated
+    stages; without one, a temporary directory is used and removed
+    afterwards.
+
+    Args:
+        registry: Examples to build
+        sources: Where to find logs (local files under cwd, no cache if None)
+        sinks: Destinations of the gallery files, each closed once all were
+            written, or aborted if the build or any sink fails
+        workspace: Directory for fetched logs, images and the manifest
+        jobs: Number of fetch and plot workers
+        renderer: Default plot renderer
+        force: If True, rerun all stages
+        deadline: Seconds after which no more logs are fetched or plotted
+        include_logs: If False, only README.md and images go to the sinks
+
+    Returns:
+        GalleryBuild with the markdown, example outputs, all files by name
+        and build metrics
+    """
+    sources = sources or LogSources()
+    started = time.monotonic()
+    # Sinks not closed yet are aborted if anything fails, the build included
+    pending = list(sinks)
+    try:
+        with ExitStack() as stack:
+            if workspace is None:
+                workspace = stack.enter_context(
+                    tempfile.TemporaryDirectory(prefix='con-duct-gallery-build-')
+                )
+                manifest = None
+            else:
+                manifest = Path(workspace) / 'manifest.json'
+            workspace = Path(workspace).resolve()
+
+            options = BuildOptions(
+                output=workspace / GALLERY_FILE,
+                log_dir=workspace / LOGS_DIR,
+                image_dir=workspace / IMAGES_DIR,
+                manifest=manifest,
+                force=force,
+                repo_root=sources.repo_root,
+                renderer=renderer,
+                deadline=deadline,
+                cache_dir=sources.cache_dir,
+                cache_size=sources.cache_size
+            )
+            rendered = {}
+            pipeline = GalleryPipeline(
+                options, git=sources.git, session=sources.session, rendered=rendered
+            )
+            results = pipeline.build_examples(registry.examples, jobs=jobs)
+
+            files = {}
+            examples = []
+            for result in results:
+                names = _file_names(result, [workspace, sources.repo_root])
+                for path, name in names.items():
+                    if path in rendered:
+                        files[name] = rendered[path]
+                    elif include_logs or path.suffix == '.svg':
+                        files[name] = path.read_bytes()
+                examples.append(_example_output(result, names, files))
+
+            shown = [(r, e) for r, e in zip(results, examples) if e.section is not None]
+            leaderboards = generate_leaderboards([(r.example, r.summary) for r, _ in shown])
+            markdown = assemble_gallery(
+                registry, [e.section for _, e in shown], leaderboards=leaderboards
+            )
+
+            if manifest is not None:
+                pipeline.prune_images(registry.examples)
+                pipeline.save()
+
+        files = {GALLERY_FILE: markdown.encode('utf-8'), **files}
+        for sink in sinks:
+            for name, data in files.items():
+                sink.write(name, data)
+        while pending:
+            pending[0].close()
+            pending.pop(0)
+    except BaseException:
+        for sink in pending:
+            try:
+                sink.abort()
+            except Exception as e:
+                logger.warning(f"Could not abort {type(sink).__name__}: {e}")
+        raise
+
+    ran = sum(1 for o in pipeline.runner.outcomes if o.ran)
+    metrics = {
+        'examples': len(results),
+        'fetch_failures': sum(1 for r in results if r.fetch_error is not None),
+        'plot_failures': sum(1 for r in results if r.plot_error is not None),
+        'stages_run': ran,
+        'stages_up_to_date': len(pipeline.runner.outcomes) - ran,
+        'bytes_written': sum(map(len, files.values())),
+        'seconds': time.monotonic() - started,
+    }
+    logger.info(
+        f"✓ Built {metrics['examples']} examples ({ran} stages ran) "
+        f"into {len(sinks)} sinks"
+    )
+    return GalleryBuild(markdown, examples, files, metrics)
@@ -0,0 +1,286 @@
+"""Example logs inside .tar.gz, .tar.zst and .zip archives.
+
+An info_file of the form ``<archive>#<member>`` names the info file of a
+run inside an archive, either a local path (relative to the repository
+root) or a URL. The other logs are the members its output_paths name,
+looked up next to the info member like local logs are. Members are
+streamed from the archive into the log directory without extracting
+anything else (a tar archive in a single pass), and a remote archive is
+downloaded once per build however many examples refer to it.
+"""
+
+import logging
+import posixpath
+import shutil
+import tarfile
+import tempfile
+import threading
+import zipfile
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from .atomic import atomic_output
+from .fetcher import (
+    LOG_KINDS,
+    REQUEST_TIMEOUT,
+    FetchedLog,
+    cached_log_paths,
+    member_output_paths,
+    response_validators,
+)
+from .manifest import hash_data
+from .models import ExampleEntry
+from .records import loads
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 1 << 20
+
+
+def member_name(name: str) -> str:
+    """Normalize a member name ('./logs//a.json' and 'logs/a.json' are the same member)."""
+    return posixpath.normpath(name).lstrip('/')
+
+
+@contextmanager
+def _open_tar(path: Path) -> Iterator[tarfile.TarFile]:
+    """Open a tar archive for one sequential pass."""
+    if path.name.lower().endswith(('.tar.zst', '.tzst')):
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError(
+                f"Reading {path.name} needs the zstandard package "
+                "(pip install 'con-duct-gallery[zstd]')"
+            ) from None
+        with open(path, 'rb') as raw, \
+                zstandard.ZstdDecompressor().stream_reader(raw) as stream, \
+                tarfile.open(fileobj=stream, mode='r|') as tar:
+            yield tar
+    else:
+        with tarfile.open(path, mode='r|gz') as tar:
+            yield tar
+
+
+def copy_members(archive: Path, members: dict[str, Path]) -> dict[str, int]:
+    """Stream members of an archive into files, without extracting the others.
+
+    Tar archives are read in a single sequential pass that stops once all
+    members were found; zip archives are read by member.
+
+    Args:
+        archive: .tar.gz, .tar.zst or .zip file
+        members: Destination file of every member to copy
+
+    Returns:
+        Size of every member copied (members missing from the archive are
+        left out)
+
+    Raises:
+        ValueError: If the archive cannot be read
+    """
+    wanted = {member_name(name): dest for name, dest in members.items()}
+    copied = {}
+
+    def copy(name: str, source: BinaryIO) -> None:
+        with open(wanted[name], 'wb') as f:
+            shutil.copyfileobj(source, f, _CHUNK_SIZE)
+            copied[name] = f.tell()
+
+    try:
+        if Path(archive).name.lower().endswith('.zip'):
+            with zipfile.ZipFile(archive) as zf:
+                for info in zf.infolist():
+                    name = member_name(info.filename)
+                    if name in wanted and not info.is_dir():
+                        with zf.open(info) as source:
+                            copy(name, source)
+        else:
+            with _open_tar(Path(archive)) as tar:
+                for info in tar:
+                    name = member_name(info.name)
+                    if name in wanted and name not in copied and info.isfile():
+                        copy(name, tar.extractfile(info))
+                        if len(copied) == len(wanted):
+                            break
+    except (tarfile.TarError, zipfile.BadZipFile, EOFError) as e:
+        raise ValueError(f"Cannot read archive {archive}: {e}") from None
+    return copied
+
+
+def copy_log_members(archive: Path, info_member: str, dests: dict[str, Path]) -> dict[str, int]:
+    """Stream an info member, and the logs its output_paths name, into files.
+
+    A tar archive is decompressed once: members next to the info member
+    that come before it are kept aside (in memory while small, on disk
+    otherwise) until the info member tells which of them are logs.
+
+    Args:
+        archive: .tar.gz, .tar.zst or .zip file
+        info_member: Name of the info file in the archive
+        dests: Destination file of every log kind ('info', 'usage', ...)
+
+    Returns:
+        Size of every log kind copied ('info' is missing if the info
+        member is not in the archive)
+
+    Raises:
+        ValueError: If the archive or the info member cannot be read
+    """
+    info_member = member_name(info_member)
+    if Path(archive).name.lower().endswith('.zip'):
+        # Members of a zip are compressed one by one, so reading it by member costs nothing extra
+        if not copy_members(archive, {info_member: dests['info']}):
+            return {}
+        logs = member_output_paths(loads(dests['info'].read_bytes()), info_member)
+        copied = copy_members(archive, {name: dests[kind] for kind, name in logs.items()})
+        sizes = {kind: copied[name] for kind, name in logs.items() if name in copied}
+        return {'info': dests['info'].stat().st_size, **sizes}
+
+    base_dir = posixpath.dirname(info_member)
+    sizes = {}
+    wanted = None
+    pending: dict[str, BinaryIO] = {}
+
+    def copy(kind: str, source: BinaryIO) -> None:
+        with open(dests[kind], 'wb') as f:
+            shutil.copyfileobj(source, f, _CHUNK_SIZE)
+            sizes[kind] = f.tell()
+
+    try:
+        with ExitStack() as stack, _open_tar(Path(archive)) as tar:
+            for info in tar:
+                name = member_name(info.name)
+                if not info.isfile():
+                    continue
+                if wanted is None:
+                    if name == info_member:
+                        copy('info', tar.extractfile(info))
+                        logs = member_output_paths(loads(dests['info'].read_bytes()), info_member)
+                        wanted = {name: kind for kind, name in logs.items()}
+                        for member, buffer in pending.items():
+                            if member in wanted:
+                                buffer.seek(0)
+                                copy(wanted[member], buffer)
+                        pending.clear()
+                    elif posixpath.dirname(name) == base_dir and name not in pending:
+                        buffer = stack.enter_context(tempfile.SpooledTemporaryFile(_CHUNK_SIZE))
+                        shutil.copyfileobj(tar.extractfile(info), buffer, _CHUNK_SIZE)
+                        pending[name] = buffer
+                elif name in wanted and wanted[name] not in sizes:
+                    copy(wanted[name], tar.extractfile(info))
+                if wanted is not None and len(sizes) == len(wanted) + 1:
+                    break
+    except (tarfile.TarError, EOFError) as e:
+        raise ValueError(f"Cannot read archive {archive}: {e}") from None
+    return sizes
+
+
+class ArchiveDownloads:
+    """Remote archives downloaded by a build, each once.
+
+    Archives are kept in a temporary directory that is removed with this
+    object; concurrent requests for the same URL wait for one download.
+    """
+
+    def __init__(self):
+        self._tmp: Optional[tempfile.TemporaryDirectory] = None
+        self._downloads: dict[str, tuple[Path, dict]] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _root(self) -> Path:
+        with self._lock:
+            if self._tmp is None:
+                self._tmp = tempfile.TemporaryDirectory(prefix='con-duct-gallery-archives-')
+            return Path(self._tmp.name)
+
+    def download(self, url: str, session=None) -> tuple[Path, dict, int]:
+        """Path of the downloaded archive, the validators of its response, and its size.
+
+        The size is that of the archive when this call downloaded it, and
+        0 when it was downloaded before.
+
+        Raises:
+            requests.RequestException: If the download fails
+        """
+        with self._lock:
+            lock = self._locks.setdefault(url, threading.Lock())
+        with lock:
+            if url in self._downloads:
+                return (*self._downloads[url], 0)
+            name = posixpath.basename(urlparse(url).path)
+            path = self._root() / f"{hash_data(url)[:16]}-{name}"
+            logger.debug(f"Downloading archive {url}")
+            response = (session or requests).get(url, timeout=REQUEST_TIMEOUT, stream=True)
+            response.raise_for_status()
+            with atomic_output(path) as tmp_path, open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(_CHUNK_SIZE):
+                    f.write(chunk)
+                size = f.tell()
+            self._downloads[url] = (path, response_validators(url, response))
+            return (*self._downloads[url], size)
+
+
+def fetch_archive_logs(
+    example: ExampleEntry,
+    log_dir: Path,
+    repo_root: Optional[Path] = None,
+    downloads: Optional[ArchiveDownloads] = None,
+    session=None,
+    force: bool = False
+) -> FetchedLog:
+    """Copy an example's logs out of its archive into the log directory.
+
+    Args:
+        example: Example entry whose info_file is <archive>#<member>
+        log_dir: Base directory for storing logs
+        repo_root: Repository root for local archives (defaults to cwd)
+        downloads: Remote archives of the build (a new set if None)
+        session: Optional requests session (or FetchGuard) for downloads
+        force: If True, copy again even if the files exist
+
+    Returns:
+        FetchedLog with the paths of the written files (and, for remote
+        archives, the archive's validators as those of the info file, and
+        its size as downloaded bytes if this call downloaded it)
+
+    Raises:
+        FileNotFoundError: If the archive or the info member does not exist
+        ValueError: If the archive cannot be read
+        requests.HTTPError: If downloading the archive fails
+    """
+    source, member = example.archive
+    member = member_name(member)
+    cached = cached_log_paths(example, log_dir)
+    if not force and all(p.exists() for p in cached.paths):
+        logger.info(f"Using cached logs for '{example.title}'")
+        return cached
+
+    logger.info(f"Reading logs for '{example.title}' from {source}")
+    validators = None
+    downloaded = 0
+    if source.startswith('http'):
+        # Kept referenced until the members are copied: its directory goes with it
+        downloads = downloads or ArchiveDownloads()
+        archive, validator, downloaded = downloads.download(source, session)
+        validators = {'info': validator}
+    else:
+        archive = (repo_root or Path.cwd()) / source
+        if not archive.exists():
+            raise FileNotFoundError(f"Local archive not found: {archive}")
+
+    cached.info_json.parent.mkdir(parents=True, exist_ok=True)
+    with ExitStack() as stack:
+        tmp_paths = {
+            kind: stack.enter_context(atomic_output(path))
+            for kind, path in zip(LOG_KINDS, cached.paths)
+        }
+        if 'info' not in copy_log_members(archive, member, tmp_paths):
+            raise FileNotFoundError(f"{member} not found in {source}")
+
+    return cached._replace(bytes_downloaded=downloaded, validators=validators)
@@ -0,0 +1,60 @@
+"""Crash-safe file writes: write a temporary sibling, then rename it over the target.
+
+A reader (or the next build after an interrupted one) therefore sees either
+the previous or the new content of a file, never a partially written one.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+# Temporary files are hidden siblings ending in the target's suffix, so
+# tools that pick a format from the file name (con-duct plot) still work
+TEMP_MARKER = '.tmp-'
+
+
+def fsync_file(path: Path) -> None:
+    """Flush a file's content to disk."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def temp_sibling(path: Path) -> Path:
+    """Temporary path, private to this process and thread, next to path."""
+    return path.with_name(
+        f".{path.stem}{TEMP_MARKER}{os.getpid()}-{threading.get_ident()}{path.suffix}"
+    )
+
+
+@contextmanager
+def atomic_output(path: Path) -> Iterator[Path]:
+    """Yield a temporary path to write the new content of path to.
+
+    When the block completes, the temporary file is flushed to disk and
+    renamed to path; if the block raises, it is removed and path is left
+    untouched. If nothing was written to the temporary path, path is left
+    as is too.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_sibling(path)
+    try:
+        yield tmp_path
+        if tmp_path.exists():
+            fsync_file(tmp_path)
+            os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def atomic_write(path: Path, data: Union[str, bytes]) -> None:
+    """Atomically replace a file's content (str is written as UTF-8)."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    with atomic_output(path) as tmp_path:
+        tmp_path.write_bytes(data)
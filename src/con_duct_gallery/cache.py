@@ -0,0 +1,140 @@
+"""Persistent cache shared by builds across checkouts.
+
+Downloaded logs, parsed usage series and rendered plots are stored under
+a cache directory (by default in the XDG cache) keyed by hashes of the
+content or stage inputs they were made from, so an entry never goes
+stale: it is either found and valid, or missing. Entries are plain files;
+reading one bumps its mtime, and eviction removes the least recently used
+files until the cache fits its size cap.
+"""
+
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+from .atomic import TEMP_MARKER, atomic_output, atomic_write
+from .manifest import hash_data
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_SIZE = 1 << 30
+
+
+class CacheUsage(NamedTuple):
+    """Number and total size of the files in a cache."""
+    files: int
+    bytes: int
+
+
+def default_cache_dir() -> Path:
+    """The con-duct-gallery directory of $XDG_CACHE_HOME (~/.cache by default)."""
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'con-duct-gallery'
+
+
+def cache_key(config: Path) -> str:
+    """Key for CI cache actions, changing with the cache format and the configuration.
+
+    CI restores the cache from the most recent key sharing the prefix
+    before the configuration hash, so a changed configuration starts
+    from the previous cache rather than an empty one.
+    """
+    return f"con-duct-gallery-v{CACHE_VERSION}-{hash_data(Path(config).read_text())[:16]}"
+
+
+class ContentCache:
+    """Size-capped directory of content-addressed files.
+
+    Files are stored as ``<root>/v<version>/<kind>/<key[:2]>/<key><suffix>``.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_CACHE_SIZE):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    @property
+    def entries(self) -> Path:
+        """Directory of the entries of the current cache format."""
+        return self.root / f"v{CACHE_VERSION}"
+
+    def path(self, kind: str, key: str, suffix: str = '') -> Path:
+        """Location of an entry, whether it exists or not."""
+        return self.entries / kind / key[:2] / f"{key}{suffix}"
+
+    def get(self, kind: str, key: str, suffix: str = '') -> Optional[Path]:
+        """Path of an entry, marked as recently used, or None if missing."""
+        path = self.path(kind, key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def restore(self, kind: str, key: str, dest: Path, suffix: str = '') -> bool:
+        """Copy an entry to dest.
+
+        Returns:
+            False if the entry is missing
+        """
+        path = self.get(kind, key, suffix)
+        if path is None:
+            return False
+        shutil.copyfile(path, dest)
+        return True
+
+    def put(self, kind: str, key: str, source: Union[Path, bytes], suffix: str = '') -> Path:
+        """Store a file (or bytes) as an entry, replacing any previous one."""
+        path = self.path(kind, key, suffix)
+        if isinstance(source, bytes):
+            atomic_write(path, source)
+        else:
+            with atomic_output(path) as tmp_path:
+                shutil.copyfile(source, tmp_path)
+        return path
+
+    def _files(self) -> list[tuple[float, int, Path]]:
+        """(mtime, size, path) of every entry."""
+        files = []
+        for directory, _, names in os.walk(self.entries):
+            for name in names:
+                if TEMP_MARKER in name:
+                    continue
+                path = Path(directory) / name
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+        return files
+
+    def usage(self) -> CacheUsage:
+        """Number and total size of the cached files."""
+        files = self._files()
+        return CacheUsage(len(files), sum(size for _, size, _ in files))
+
+    def evict(self, max_bytes: Optional[int] = None) -> list[Path]:
+        """Remove least recently used entries until the cache fits max_bytes.
+
+        Args:
+            max_bytes: Size cap (default: the cache's own)
+
+        Returns:
+            Removed paths
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        removed = []
+        for _, size, path in files:
+            if total <= limit:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed.append(path)
+        if removed:
+            logger.debug(f"Evicted {len(removed)} cache entries from {self.root}")
+        return removed
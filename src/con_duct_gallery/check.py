@@ -0,0 +1,117 @@
+"""Decide whether the gallery needs rebuilding without fetching or rendering.
+
+Every stage `generate` would run is rebuilt as a Stage object and checked
+against the build manifest; no stage action is executed. Local logs are
+compared by their (stat-cached) content hashes, and mutable remote URLs
+are revalidated with conditional HEAD requests.
+"""
+
+import logging
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from .fetcher import LOG_KINDS, FetchGuard, log_previews
+from .generator import generate_example_section, generate_leaderboards, slugify
+from .manifest import BuildManifest
+from .models import ExampleRegistry
+from .pipeline import (
+    BuildOptions,
+    PipelineRunner,
+    Stage,
+    distribution_stage,
+    fetch_stage,
+    log_links,
+    parse_stage,
+    plot_stage,
+    processes_stage,
+    render_stage,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class OutdatedStage(NamedTuple):
+    """A stage that `generate` would run, and why."""
+    name: str
+    key: str
+    reason: str
+
+
+def check_gallery(
+    registry: ExampleRegistry,
+    options: BuildOptions,
+    manifest: Optional[BuildManifest] = None
+) -> list[OutdatedStage]:
+    """List the stages a build of the registry would run.
+
+    Stages downstream of an outdated fetch are not inspected, since their
+    inputs are only known once the logs have been fetched.
+
+    Args:
+        registry: Gallery configuration
+        options: Build locations; options.revalidate enables upstream checks
+        manifest: Build manifest (loaded from options.manifest if None)
+
+    Returns:
+        Outdated stages (empty if the gallery is up to date)
+    """
+    if manifest is None:
+        manifest = BuildManifest.load(options.manifest) if options.manifest else BuildManifest()
+    runner = PipelineRunner(manifest)
+    guard = FetchGuard.with_budget(options.deadline, options.host_failures)
+    outdated = []
+
+    def check(stage: Stage) -> bool:
+        reason = runner.outdated_reason(stage)
+        if reason is not None:
+            logger.info(f"{stage.id}: {reason}")
+            outdated.append(OutdatedStage(stage.name, stage.key, reason))
+        return reason is None
+
+    sections = []
+    summaries = []
+    for example in registry.examples:
+        fetch = fetch_stage(example, options, manifest, guard=guard)
+        if not check(fetch):
+            continue
+        fetched = manifest.get(fetch.id).result
+        log_paths = {name: Path(fetched[name]) for name in LOG_KINDS}
+
+        parse = parse_stage(example, log_paths['info'], manifest)
+        if check(parse):
+            summaries.append((example, manifest.get(parse.id).result))
+
+        svg_path = options.image_dir / f"{slugify(example.title)}.svg"
+        check(plot_stage(
+            example, log_paths['usage'], svg_path, manifest, renderer=options.renderer
+        ))
+
+        distribution = None
+        stage = distribution_stage(example, log_paths['usage'], manifest)
+        if check(stage):
+            distribution = manifest.get(stage.id).result
+
+        processes = None
+        if example.processes is not None:
+            stage = processes_stage(
+                example, log_paths['usage'],
+                options.image_dir / f"{slugify(example.title)}-processes.svg", manifest
+            )
+            if check(stage):
+                processes = manifest.get(stage.id).result['groups']
+
+        sections.append(generate_example_section(
+            example,
+            svg_path.exists(),
+            log_paths=log_links(example, log_paths['info'], log_paths),
+            image_dir=str(options.image_dir),
+            # Only the tails fetched by the last build, so checking sends no GETs
+            previews=log_previews(log_paths, lines=options.preview_lines),
+            processes=processes,
+            distribution=distribution
+        ))
+
+    if not outdated:
+        leaderboards = generate_leaderboards(summaries)
+        check(render_stage(registry, sections, options.output, leaderboards))
+    return outdated
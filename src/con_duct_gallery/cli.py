@@ -1,9 +1,122 @@
 """CLI argument parsing for con-duct-gallery."""
 
 import argparse
+import re
 from pathlib import Path
 
 
+_DURATION = re.compile(r'^(?:(\d+)h)?(?:(\d+)m)?(?:(\d+(?:\.\d*)?)s?)?$')
+
+
+def duration(text: str) -> float:
+    """Parse a duration such as '45m', '1h30m', '90s' or '900' into seconds."""
+    match = _DURATION.match(text.strip())
+    if not text.strip() or match is None:
+        raise argparse.ArgumentTypeError(f"invalid duration '{text}', expected e.g. 45m or 1h30m")
+    hours, minutes, seconds = match.groups()
+    return int(hours or 0) * 3600 + int(minutes or 0) * 60 + float(seconds or 0)
+
+
+_SIZE = re.compile(r'^(\d+(?:\.\d*)?)\s*([kmgt]?)(?:i?b)?$', re.IGNORECASE)
+_SIZE_UNITS = {'': 1, 'k': 1 << 10, 'm': 1 << 20, 'g': 1 << 30, 't': 1 << 40}
+
+
+def size(text: str) -> int:
+    """Parse a size such as '500M', '2GiB' or '1048576' into bytes."""
+    match = _SIZE.match(text.strip())
+    if match is None:
+        raise argparse.ArgumentTypeError(f"invalid size '{text}', expected e.g. 500M or 2G")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the persistent cache shared across checkouts."""
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        help='Persistent cache of downloaded logs, parsed series and rendered plots '
+             '(default: $XDG_CACHE_HOME/con-duct-gallery, i.e. ~/.cache/con-duct-gallery)'
+    )
+
+    parser.add_argument(
+        '--cache-limit',
+        type=size,
+        default=1 << 30,
+        metavar='SIZE',
+        help='Evict least recently used cache entries beyond this size (default: 1G)'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the persistent cache'
+    )
+
+
+def add_build_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the config, output and cache location options shared by build commands."""
+    parser.add_argument(
+        '--config',
+        type=Path,
+        default=Path('con-duct-gallery.yaml'),
+        help='Path to YAML configuration file (default: con-duct-gallery.yaml)'
+    )
+
+    parser.add_argument(
+        '--output',
+        type=Path,
+        default=Path('README.md'),
+        help='Path for generated markdown file (default: README.md)'
+    )
+
+    parser.add_argument(
+        '--log-dir',
+        type=Path,
+        default=Path('logs'),
+        help='Directory for cached log files (default: logs/)'
+    )
+
+    parser.add_argument(
+        '--image-dir',
+        type=Path,
+        default=Path('images'),
+        help='Directory for generated SVG plots (default: images/)'
+    )
+
+    parser.add_argument(
+        '--manifest',
+        type=Path,
+        default=Path('.con-duct-gallery/manifest.json'),
+        help='Build manifest recording stage input hashes '
+             '(default: .con-duct-gallery/manifest.json)'
+    )
+
+    parser.add_argument(
+        '--preview-lines',
+        type=int,
+        default=10,
+        metavar='N',
+        help='Lines of stdout/stderr shown in each example section (default: 10, 0 disables)'
+    )
+
+    parser.add_argument(
+        '--renderer',
+        choices=['con-duct', 'native'],
+        default='con-duct',
+        help="Plot renderer for examples that do not set one: 'con-duct' "
+             "(con-duct plot) or 'native' (lightweight SVG) (default: con-duct)"
+    )
+
+
+def add_verbose_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the -v/--verbose option."""
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Enable detailed logging'
+    )
+
+
 def parse_args(args: list[str] = None) -> argparse.Namespace:
     """Parse command-line arguments.
 
@@ -30,50 +143,319 @@ def parse_args(args: list[str] = None) -> argparse.Namespace:
         help='Generate the gallery README.md and plot images'
     )
 
+    add_build_arguments(generate_parser)
+
     generate_parser.add_argument(
-        '--config',
-        type=Path,
-        default=Path('con-duct-gallery.yaml'),
-        help='Path to YAML configuration file (default: con-duct-gallery.yaml)'
+        '--force',
+        action='store_true',
+        help='Re-fetch logs and regenerate plots even if cached'
     )
 
     generate_parser.add_argument(
-        '--output',
-        type=Path,
-        default=Path('README.md'),
-        help='Path for generated markdown file (default: README.md)'
+        '--revalidate',
+        action='store_true',
+        help='Re-fetch remote logs whose mutable upstream URLs changed'
     )
 
     generate_parser.add_argument(
-        '--log-dir',
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Number of examples processed concurrently; above 1, examples '
+             'stream through fetch, plot and render as soon as their inputs '
+             'are ready (default: 1)'
+    )
+
+    generate_parser.add_argument(
+        '--profile',
         type=Path,
-        default=Path('logs'),
-        help='Directory for cached log files (default: logs/)'
+        metavar='REPORT',
+        help='Write per-stage timing and resource usage as JSON to REPORT '
+             'and log a summary at the end of the run'
     )
 
     generate_parser.add_argument(
-        '--image-dir',
+        '--deadline',
+        type=duration,
+        metavar='DURATION',
+        help='Time budget for the run (e.g. 45m, 1h30m, 900). Past it, nothing is '
+             'fetched or plotted any more: stale cached logs and previous plots are '
+             'used and the README is written with what is available'
+    )
+
+    generate_parser.add_argument(
+        '--host-failures',
+        type=int,
+        default=3,
+        metavar='N',
+        help='Stop contacting a host after N consecutive failed requests and use '
+             'cached logs instead (default: 3)'
+    )
+
+    generate_parser.add_argument(
+        '--history',
         type=Path,
-        default=Path('images'),
-        help='Directory for generated SVG plots (default: images/)'
+        default=Path('.con-duct-gallery/history.sqlite'),
+        help='SQLite database the execution summary of each new run is appended to '
+             '(default: .con-duct-gallery/history.sqlite)'
     )
 
     generate_parser.add_argument(
-        '--force',
-        action='store_true',
-        help='Re-fetch logs and regenerate plots even if cached'
+        '--diff-against',
+        metavar='BASE',
+        help='Only fetch and plot examples added or changed since BASE, a build '
+             'manifest, configuration file or git ref (e.g. origin/main); other '
+             'sections are reused from the manifest. Also writes a preview of the '
+             'changed examples to --preview-dir'
     )
 
     generate_parser.add_argument(
-        '-v', '--verbose',
-        action='store_true',
-        help='Enable detailed logging'
+        '--preview-dir',
+        type=Path,
+        default=Path('preview'),
+        help='Directory for the --diff-against preview (default: preview/)'
     )
 
+    add_cache_arguments(generate_parser)
+
+    add_verbose_argument(generate_parser)
+
     generate_parser.add_argument(
         '--dry-run',
         action='store_true',
         help='Show what would be done without executing'
     )
 
+    # Watch subcommand
+    watch_parser = subparsers.add_parser(
+        'watch',
+        help='Rebuild plots and README sections as the config or local logs change'
+    )
+
+    add_build_arguments(watch_parser)
+
+    watch_parser.add_argument(
+        '--debounce',
+        type=float,
+        default=0.2,
+        metavar='SECONDS',
+        help='Wait for this long without further changes before rebuilding (default: 0.2)'
+    )
+
+    watch_parser.add_argument(
+        '--poll',
+        action='store_true',
+        help='Poll file modification times instead of using inotify'
+    )
+
+    watch_parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=0.25,
+        metavar='SECONDS',
+        help='Polling interval when inotify is unavailable or --poll is given (default: 0.25)'
+    )
+
+    add_verbose_argument(watch_parser)
+
+    # Check subcommand
+    check_parser = subparsers.add_parser(
+        'check',
+        help='Exit 0 if the gallery is up to date, 1 if generate has work to do'
+    )
+
+    add_build_arguments(check_parser)
+
+    check_parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Do not revalidate remote logs with their upstream servers'
+    )
+
+    add_verbose_argument(check_parser)
+
+    # Compare subcommand
+    compare_parser = subparsers.add_parser(
+        'compare',
+        help='Overlay the resource usage of several examples in one plot'
+    )
+
+    compare_parser.add_argument(
+        'examples',
+        nargs='*',
+        metavar='EXAMPLE',
+        help='Titles or slugs of examples to compare'
+    )
+
+    compare_parser.add_argument(
+        '--tag',
+        help='Also compare every example with this tag'
+    )
+
+    compare_parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        default=Path('comparison.svg'),
+        help='Output image (default: comparison.svg)'
+    )
+
+    compare_parser.add_argument(
+        '--metrics',
+        nargs='+',
+        choices=['rss', 'vsz', 'pcpu', 'pmem'],
+        default=['rss', 'pcpu'],
+        help='Metrics to plot, one panel each (default: rss pcpu)'
+    )
+
+    compare_parser.add_argument(
+        '--points',
+        type=int,
+        default=500,
+        help='Points on the normalized time grid (default: 500)'
+    )
+
+    compare_parser.add_argument(
+        '--config',
+        type=Path,
+        default=Path('con-duct-gallery.yaml'),
+        help='Path to YAML configuration file (default: con-duct-gallery.yaml)'
+    )
+
+    compare_parser.add_argument(
+        '--log-dir',
+        type=Path,
+        default=Path('logs'),
+        help='Directory for cached log files (default: logs/)'
+    )
+
+    compare_parser.add_argument(
+        '--manifest',
+        type=Path,
+        default=Path('.con-duct-gallery/manifest.json'),
+        help='Build manifest (default: .con-duct-gallery/manifest.json)'
+    )
+
+    add_cache_arguments(compare_parser)
+
+    add_verbose_argument(compare_parser)
+
+    # Query subcommand
+    query_parser = subparsers.add_parser(
+        'query',
+        help='Query the run history recorded by generate'
+    )
+
+    query_subparsers = query_parser.add_subparsers(dest='query', required=True)
+
+    top_parser = query_subparsers.add_parser(
+        'top',
+        help='Rank examples by a metric of their latest run'
+    )
+    top_parser.add_argument('metric', help='Metric, e.g. peak_rss or wall_clock_time')
+    top_parser.add_argument(
+        '-n', '--limit',
+        type=int,
+        default=20,
+        help='Number of examples to show (default: 20)'
+    )
+
+    growth_parser = query_subparsers.add_parser(
+        'growth',
+        help='List examples whose latest run grew in a metric since an earlier time'
+    )
+    growth_parser.add_argument('metric', help='Metric, e.g. peak_rss or wall_clock_time')
+    growth_parser.add_argument(
+        '--since',
+        default='30d',
+        help='Baseline: latest run recorded before this age (30d, 2w, 12h) '
+             'or ISO date (default: 30d)'
+    )
+    growth_parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.0,
+        metavar='PERCENT',
+        help='Only show examples that grew by at least this much (default: 0)'
+    )
+
+    for parser_ in (top_parser, growth_parser):
+        parser_.add_argument(
+            '--tag',
+            help='Only consider examples with this tag'
+        )
+        parser_.add_argument(
+            '--history',
+            type=Path,
+            default=Path('.con-duct-gallery/history.sqlite'),
+            help='Run history database (default: .con-duct-gallery/history.sqlite)'
+        )
+        add_verbose_argument(parser_)
+
+    # Cache subcommand
+    cache_parser = subparsers.add_parser(
+        'cache',
+        help='Inspect or trim the persistent cache'
+    )
+
+    cache_subparsers = cache_parser.add_subparsers(dest='cache', required=True)
+
+    key_parser = cache_subparsers.add_parser(
+        'key',
+        help='Print a cache key for CI cache actions, derived from the configuration'
+    )
+    key_parser.add_argument(
+        '--config',
+        type=Path,
+        default=Path('con-duct-gallery.yaml'),
+        help='Path to YAML configuration file (default: con-duct-gallery.yaml)'
+    )
+    key_parser.add_argument(
+        '--output',
+        type=Path,
+        metavar='FILE',
+        help='Also write the key to FILE (left untouched if unchanged)'
+    )
+
+    info_parser = cache_subparsers.add_parser('info', help='Show the cache location and size')
+    prune_parser = cache_subparsers.add_parser(
+        'prune',
+        help='Evict least recently used entries down to --cache-limit'
+    )
+
+    for parser_ in (info_parser, prune_parser):
+        add_cache_arguments(parser_)
+    for parser_ in (key_parser, info_parser, prune_parser):
+        add_verbose_argument(parser_)
+
+    # Serve subcommand
+    serve_parser = subparsers.add_parser(
+        'serve',
+        help='Serve a local preview of the gallery, rendering pages and plots on demand'
+    )
+
+    add_build_arguments(serve_parser)
+
+    serve_parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help='Address to listen on (default: 127.0.0.1)'
+    )
+
+    serve_parser.add_argument(
+        '--port',
+        type=int,
+        default=8000,
+        help='Port to listen on (default: 8000)'
+    )
+
+    serve_parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=64,
+        metavar='MB',
+        help='In-memory cache size for rendered pages and plots (default: 64)'
+    )
+
+    add_verbose_argument(serve_parser)
+
     return parser.parse_args(args)
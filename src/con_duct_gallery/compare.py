@@ -0,0 +1,165 @@
+"""Overlay the resource usage of several examples on a normalized time axis.
+
+Runs of different lengths are compared by mapping each onto [0, 1] (start
+to end of the run) and resampling every metric onto a common grid with
+NumPy interpolation, so no Python code loops over individual samples.
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .models import ExampleEntry, ExampleRegistry
+from .series import SERIES_METRICS, UsageSeries, load_series
+from .units import byte_unit
+
+logger = logging.getLogger(__name__)
+
+METRIC_LABELS = {
+    'rss': 'RSS',
+    'vsz': 'VSZ',
+    'pcpu': 'CPU (%)',
+    'pmem': 'Memory (%)',
+}
+
+
+def resample(series: UsageSeries, points: int = 500) -> dict[str, np.ndarray]:
+    """Resample a series onto a normalized time grid.
+
+    Args:
+        series: Usage series
+        points: Number of grid points between the start (0) and end (1) of the run
+
+    Returns:
+        Dictionary with the 'progress' grid and one resampled array per metric
+    """
+    grid = np.linspace(0.0, 1.0, points)
+    duration = series.seconds[-1]
+    if duration > 0:
+        progress = series.seconds / duration
+    else:
+        # All reports at one instant: hold the last values over the whole grid
+        progress = np.zeros(1)
+        series = UsageSeries(*(column[-1:] for column in series))
+
+    result = {'progress': grid}
+    for metric in SERIES_METRICS:
+        result[metric] = np.interp(grid, progress, getattr(series, metric))
+    return result
+
+
+def select_examples(
+    registry: ExampleRegistry,
+    names: list[str],
+    tag: Optional[str] = None
+) -> list[ExampleEntry]:
+    """Pick examples by title or slug and/or by tag, in registry order.
+
+    Raises:
+        ValueError: If a name matches no example or nothing is selected
+    """
+    by_name = {}
+    for example in registry.examples:
+        by_name[example.title] = example
+        by_name[example.slug] = example
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown examples: {', '.join(unknown)}")
+
+    wanted = {by_name[name].title for name in names}
+    selected = [
+        e for e in registry.examples
+        if e.title in wanted or (tag is not None and tag in e.tags)
+    ]
+    if not selected:
+        raise ValueError("No examples selected")
+    return selected
+
+
+def _scale_bytes(values: list[np.ndarray]) -> tuple[float, str]:
+    """Binary unit of the peak of several curves (see units.byte_unit)."""
+    return byte_unit(max((float(v.max()) for v in values if len(v)), default=0.0))
+
+
+def render_comparison(
+    curves: dict[str, dict[str, np.ndarray]],
+    output: Path,
+    metrics: tuple[str, ...] = ('rss', 'pcpu')
+) -> Path:
+    """Plot resampled curves of several examples overlaid, one panel per metric.
+
+    Args:
+        curves: Resampled series (see resample) by example title
+        output: Image to write (format from its suffix, e.g. .svg)
+        metrics: Metrics to plot
+
+    Returns:
+        Path to the written image
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(len(metrics), 1, sharex=True, figsize=(10, 3 * len(metrics)))
+    axes = np.atleast_1d(axes)
+    for ax, metric in zip(axes, metrics):
+        factor, unit = 1, ''
+        if metric in ('rss', 'vsz'):
+            factor, unit = _scale_bytes([c[metric] for c in curves.values()])
+        for title, curve in curves.items():
+            ax.plot(curve['progress'] * 100, curve[metric] / factor, label=title, linewidth=1.2)
+        label = METRIC_LABELS.get(metric, metric)
+        ax.set_ylabel(f"{label} ({unit})" if unit else label)
+        ax.grid(True, alpha=0.3)
+    axes[0].legend(loc='upper left', fontsize='small')
+    axes[-1].set_xlabel('Run progress (%)')
+    fig.tight_layout()
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(output)
+    plt.close(fig)
+    return output
+
+
+def compare_examples(
+    examples: list[ExampleEntry],
+    pipeline,
+    output: Path,
+    points: int = 500,
+    metrics: tuple[str, ...] = ('rss', 'pcpu')
+) -> Path:
+    """Fetch (or reuse cached) logs of examples and render their comparison.
+
+    Args:
+        examples: Examples to compare
+        pipeline: GalleryPipeline whose fetch stages provide the usage logs
+        output: Image to write
+        points: Resampling grid size
+        metrics: Metrics to plot
+
+    Returns:
+        Path to the written image
+
+    Raises:
+        ValueError: If no selected example could be loaded
+    """
+    curves = {}
+    for example in examples:
+        fetched = pipeline.fetch_example(example)
+        if fetched.log_paths is None:
+            continue
+        try:
+            series = load_series(fetched.log_paths['usage'], pipeline.cache)
+        except (OSError, ValueError) as e:
+            logger.warning(f"✗ Skipping '{example.title}': {e}")
+            continue
+        logger.info(
+            f"  {example.title}: {len(series.seconds)} reports over {series.seconds[-1]:.0f}s"
+        )
+        curves[example.title] = resample(series, points)
+
+    if not curves:
+        raise ValueError("None of the selected examples has usage data")
+    return render_comparison(curves, output, metrics)
@@ -1,17 +1,139 @@
 """Module for fetching con/duct log files from online sources."""
 
-import json
 import logging
+import posixpath
+import re
+import threading
+import time
+from contextlib import ExitStack
 from pathlib import Path
-from typing import NamedTuple
+from typing import NamedTuple, Optional
 from urllib.parse import urljoin, urlparse
 
 import requests
 
+from .atomic import atomic_output, atomic_write
 from .models import ExampleEntry
+from .records import loads
 
 logger = logging.getLogger(__name__)
 
+LOG_KINDS = ('info', 'usage', 'stdout', 'stderr')
+
+# Default size of the stdout/stderr previews embedded in example sections
+PREVIEW_LINES = 10
+PREVIEW_MAX_BYTES = 8192
+
+# A full commit SHA in the URL path pins the content (e.g. raw.githubusercontent.com)
+_PINNED_URL_PATH = re.compile(r'/[0-9a-f]{40}/')
+
+# Consecutive failures after which a host is not contacted again in a run
+HOST_FAILURES = 3
+
+REQUEST_TIMEOUT = 30
+
+
+class FetchSkipped(requests.ConnectionError):
+    """A request was not attempted: its host kept failing or the run deadline passed."""
+
+
+class FetchGuard:
+    """Per-host circuit breaker and run deadline shared by a build's requests.
+
+    A host whose requests failed (connection errors, timeouts, 5xx) several
+    times in a row is not contacted again, and no request starts after the
+    deadline; both raise FetchSkipped immediately instead of waiting out
+    another timeout. Request timeouts are also capped by the time left.
+    A guard can be passed wherever a requests session is accepted.
+    """
+
+    def __init__(
+        self,
+        max_failures: int = HOST_FAILURES,
+        deadline: Optional[float] = None,
+        session=None
+    ):
+        """
+        Args:
+            max_failures: Consecutive failures that open a host's circuit
+            deadline: time.monotonic() value after which nothing is fetched
+            session: Optional requests session to reuse connections
+        """
+        self.max_failures = max_failures
+        self.deadline = deadline
+        self.session = session
+        self._failures: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def with_budget(
+        cls,
+        seconds: Optional[float] = None,
+        max_failures: int = HOST_FAILURES,
+        session=None
+    ) -> 'FetchGuard':
+        """Create a guard whose deadline is seconds from now (None for no deadline)."""
+        deadline = None if seconds is None else time.monotonic() + seconds
+        return cls(max_failures, deadline, session)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without a deadline."""
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def is_open(self, host: str) -> bool:
+        """Whether requests to host are currently refused."""
+        with self._lock:
+            return self._failures.get(host, 0) >= self.max_failures
+
+    def _record(self, host: str, error) -> None:
+        with self._lock:
+            if error is None:
+                self._failures.pop(host, None)
+                return
+            failures = self._failures[host] = self._failures.get(host, 0) + 1
+        if failures == self.max_failures:
+            logger.warning(
+                f"✗ {host} failed {failures} times in a row ({error}); "
+                f"not contacting it again in this run"
+            )
+
+    def request(self, method: str, url: str, timeout: float = REQUEST_TIMEOUT, **kwargs):
+        """Send a request unless its host is failing or the deadline passed.
+
+        Raises:
+            FetchSkipped: If the request was not attempted
+            requests.RequestException: If the request fails
+        """
+        host = urlparse(url).netloc
+        if self.is_open(host):
+            raise FetchSkipped(f"{host} is unavailable (failed {self.max_failures} times in a row)")
+        remaining = self.remaining()
+        if remaining is not None:
+            if remaining <= 0:
+                raise FetchSkipped(f"Run deadline reached, not fetching {url}")
+            timeout = min(timeout, remaining)
+
+        http = self.session or requests
+        try:
+            response = getattr(http, method)(url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            self._record(host, e)
+            raise
+        self._record(host, f"HTTP {response.status_code}" if response.status_code >= 500 else None)
+        return response
+
+    def get(self, url: str, **kwargs):
+        return self.request('get', url, **kwargs)
+
+    def head(self, url: str, **kwargs):
+        return self.request('head', url, **kwargs)
+
 
 class FetchedLog(NamedTuple):
     """Represents downloaded con/duct log files for an example."""
@@ -19,37 +141,326 @@ class FetchedLog(NamedTuple):
     usage_json: Path
     stdout: Path
     stderr: Path
+    bytes_downloaded: int = 0
+    validators: Optional[dict[str, dict]] = None
 
+    @property
+    def paths(self) -> list[Path]:
+        """The info, usage, stdout and stderr paths."""
+        return [self.info_json, self.usage_json, self.stdout, self.stderr]
+
+
+def cached_log_paths(example: ExampleEntry, log_dir: Path) -> FetchedLog:
+    """Return where downloaded log files for a remote example are cached.
+
+    Args:
+        example: Example entry
+        log_dir: Base directory for storing logs
+
+    Returns:
+        FetchedLog with the cache paths (files may not exist yet)
+    """
+    example_dir = log_dir / example.slug
+    return FetchedLog(
+        example_dir / "example_output_info.json",
+        example_dir / "example_output_usage.json",
+        example_dir / "example_output_stdout",
+        example_dir / "example_output_stderr"
+    )
+
+
+def response_validators(url: str, response) -> dict[str, str]:
+    """Extract the cache validators (ETag, Last-Modified) of a response.
+
+    Args:
+        url: URL the response was fetched from
+        response: HTTP response
 
-def fetch_info_json(url_or_path: str, dest: Path, repo_root: Path = None) -> dict:
+    Returns:
+        Dictionary with 'url' and, where the server sent them, 'etag'
+        and 'last_modified'
+    """
+    validator = {'url': url}
+    headers = getattr(response, 'headers', None) or {}
+    for field, header in (('etag', 'ETag'), ('last_modified', 'Last-Modified')):
+        value = headers.get(header)
+        if isinstance(value, str):
+            validator[field] = value
+    return validator
+
+
+def is_mutable_url(url: str) -> bool:
+    """Check whether the content behind a URL may change (not pinned to a commit)."""
+    return not _PINNED_URL_PATH.search(urlparse(url).path)
+
+
+def revalidate(validators: dict[str, dict], session=None, timeout: float = 10) -> list[str]:
+    """Ask upstream whether previously downloaded files changed.
+
+    Files behind URLs pinned to a commit are skipped. Each other file gets
+    a conditional HEAD request, so no bodies are transferred.
+
+    Args:
+        validators: Per log kind, the validators recorded when it was downloaded
+        session: Optional requests session to reuse connections
+        timeout: Request timeout in seconds
+
+    Returns:
+        Log kinds whose upstream content changed (or cannot be revalidated)
+
+    Raises:
+        requests.RequestException: If a HEAD request fails
+    """
+    http = session or requests
+    changed = []
+    for kind, validator in sorted(validators.items()):
+        url = validator['url']
+        if not is_mutable_url(url):
+            continue
+        etag, last_modified = validator.get('etag'), validator.get('last_modified')
+        if etag is None and last_modified is None:
+            logger.debug(f"No validator recorded for {url}")
+            changed.append(kind)
+            continue
+
+        headers = {'If-None-Match': etag} if etag else {'If-Modified-Since': last_modified}
+        response = http.head(url, headers=headers, timeout=timeout, allow_redirects=True)
+        if response.status_code == 304:
+            continue
+        response.raise_for_status()
+
+        current = response_validators(url, response)
+        if etag:
+            unchanged = current.get('etag') == etag
+        else:
+            unchanged = current.get('last_modified') == last_modified
+        if not unchanged:
+            logger.debug(f"Upstream changed: {url}")
+            changed.append(kind)
+    return changed
+
+
+def _last_lines(data: bytes, lines: int, truncated: bool) -> str:
+    """Decode the last lines of a file tail, dropping a partial first line."""
+    if truncated and b'\n' in data:
+        data = data.split(b'\n', 1)[1]
+    text = data.decode('utf-8', errors='replace').rstrip('\n')
+    return '\n'.join(text.split('\n')[-lines:]) if text else ''
+
+
+def tail_file(path: Path, lines: int = PREVIEW_LINES, max_bytes: int = PREVIEW_MAX_BYTES) -> str:
+    """Return the last lines of a local file, reading backwards from its end.
+
+    Args:
+        path: File to read
+        lines: Maximum number of lines
+        max_bytes: Maximum number of bytes read from the end of the file
+
+    Returns:
+        The last lines (without a trailing newline)
+    """
+    with open(path, 'rb') as f:
+        size = f.seek(0, 2)
+        start = max(size - max_bytes, 0)
+        data = b''
+        # Read blocks backwards until enough lines (or max_bytes) are in hand
+        position = size
+        while position > start and data.count(b'\n') <= lines:
+            block = min(4096, position - start)
+            position -= block
+            f.seek(position)
+            data = f.read(block) + data
+    return _last_lines(data, lines, truncated=position > 0)
+
+
+def tail_url(
+    url: str,
+    lines: int = PREVIEW_LINES,
+    max_bytes: int = PREVIEW_MAX_BYTES,
+    session=None
+) -> str:
+    """Return the last lines of a remote file using an HTTP Range request.
+
+    Servers that ignore the Range header send the whole file: it is read
+    only as long as it fits in max_bytes, and a longer file gets no
+    preview rather than being downloaded.
+
+    Raises:
+        requests.HTTPError: If the request fails
+    """
+    http = session or requests
+    response = http.get(url, headers={'Range': f'bytes=-{max_bytes}'}, timeout=REQUEST_TIMEOUT, stream=True)
+    try:
+        if response.status_code == 416:
+            # Range not satisfiable: the file is empty
+            return ''
+        response.raise_for_status()
+        if response.status_code == 206:
+            data = response.content
+            content_range = response.headers.get('Content-Range', '')
+            truncated = not content_range.startswith('bytes 0-')
+        else:
+            data = b''
+            truncated = False
+            for chunk in response.iter_content(64 * 1024):
+                data += chunk
+                if len(data) > max_bytes:
+                    logger.debug(f"  {url} ignores Range requests and is too long to preview")
+                    return ''
+    finally:
+        response.close()
+    return _last_lines(data, lines, truncated)
+
+
+def download_tail(
+    url: str,
+    dest: Path,
+    max_bytes: int = PREVIEW_MAX_BYTES,
+    session=None
+) -> tuple[dict[str, str], int]:
+    """Save the end of a remote file to dest using an HTTP Range request.
+
+    Only the last max_bytes are requested (a partial first line is
+    dropped). Servers that ignore the Range header send the whole file,
+    of which only the end is kept.
+
+    Returns:
+        (validators of the response, bytes received)
+
+    Raises:
+        requests.HTTPError: If the request fails
+    """
+    http = session or requests
+    response = http.get(url, headers={'Range': f'bytes=-{max_bytes}'}, timeout=REQUEST_TIMEOUT, stream=True)
+    try:
+        if response.status_code == 416:
+            # Range not satisfiable: the file is empty
+            data, received, truncated = b'', 0, False
+        else:
+            response.raise_for_status()
+            if response.status_code == 206:
+                data = response.content
+                received = len(data)
+                truncated = not response.headers.get('Content-Range', '').startswith('bytes 0-')
+            else:
+                data, received = b'', 0
+                for chunk in response.iter_content(64 * 1024):
+                    received += len(chunk)
+                    data = (data + chunk)[-max_bytes:]
+                truncated = received > len(data)
+        validators = response_validators(url, response)
+    finally:
+        response.close()
+    if truncated and b'\n' in data:
+        data = data.split(b'\n', 1)[1]
+    dest.write_bytes(data)
+    return validators, received
+
+
+def tail_links(example: ExampleEntry, info_path: Path) -> dict[str, str]:
+    """Upstream URLs of the logs of an example that are only kept as tails.
+
+    fetch_log_files keeps just the end of the stdout and stderr of
+    examples fetched by URL, so links to them go upstream instead.
+
+    Args:
+        example: Example entry
+        info_path: Its fetched info file
+
+    Returns:
+        URLs by log kind (empty unless the example is fetched by URL)
+    """
+    if example.is_local or example.git is not None or example.archive is not None:
+        return {}
+    urls = parse_output_paths(loads(info_path.read_bytes()), str(example.info_file))
+    return {kind: urls[kind] for kind in ('stdout', 'stderr') if kind in urls}
+
+
+def log_previews(
+    log_paths: dict[str, Path],
+    upstream: Optional[dict[str, dict]] = None,
+    lines: int = PREVIEW_LINES,
+    session=None
+) -> dict[str, str]:
+    """Tail the stdout and stderr of an example.
+
+    Local (or cached) files are read from their end; files that are not
+    available locally are tailed upstream with a Range request.
+
+    Args:
+        log_paths: Paths with 'stdout' and 'stderr' keys
+        upstream: Upstream validators (with 'url') recorded when fetching
+        lines: Number of lines per preview (0 disables previews)
+        session: Optional requests session (or FetchGuard) for upstream tails
+
+    Returns:
+        Non-empty previews by log kind
+    """
+    previews = {}
+    if lines <= 0:
+        return previews
+    for kind in ('stdout', 'stderr'):
+        path = log_paths.get(kind)
+        url = (upstream or {}).get(kind, {}).get('url')
+        try:
+            if path is not None and Path(path).is_file():
+                text = tail_file(Path(path), lines)
+            elif url:
+                text = tail_url(url, lines, session=session)
+            else:
+                continue
+        except (OSError, requests.RequestException) as e:
+            logger.debug(f"No {kind} preview: {e}")
+            continue
+        if text:
+            previews[kind] = text
+    return previews
+
+
+def fetch_info_json(
+    url_or_path: str,
+    dest: Path,
+    repo_root: Path = None,
+    validators: Optional[dict[str, dict]] = None,
+    session=None,
+    sizes: Optional[dict[str, int]] = None
+) -> dict:
     """Download and parse info JSON file or read from local path.
 
     Args:
         url_or_path: URL to the info JSON file or local file path
         dest: Destination path to save the file
         repo_root: Repository root path for resolving local paths (defaults to cwd)
+        validators: If given, the response's cache validators are stored
+            in it under 'info'
+        session: Optional requests session (or FetchGuard)
+        sizes: If given, the size of the downloaded response is stored in
+            it under 'info'
 
     Returns:
         Parsed JSON content as dictionary
 
     Raises:
         requests.HTTPError: If download fails
-        json.JSONDecodeError: If file is not valid JSON
+        ValueError: If file is not valid JSON
         FileNotFoundError: If local file does not exist
     """
     # Check if it's a local path or URL
     if url_or_path.startswith('http'):
         # Remote URL - download it
         logger.debug(f"Fetching info JSON from {url_or_path}")
-        response = requests.get(url_or_path, timeout=30)
+        response = (session or requests).get(url_or_path, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
+        if validators is not None:
+            validators['info'] = response_validators(url_or_path, response)
+        if sizes is not None:
+            sizes['info'] = len(response.content)
 
         # Save to disk
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        dest.write_text(response.text)
+        atomic_write(dest, response.text)
 
         # Parse and return
-        return json.loads(response.text)
+        return loads(response.text)
     else:
         # Local file path
         if repo_root is None:
@@ -62,13 +473,12 @@ def fetch_info_json(url_or_path: str, dest: Path, repo_root: Path = None) -> dic
             raise FileNotFoundError(f"Local info file not found: {source_path}")
 
         # Read and parse
-        content = source_path.read_text()
+        content = source_path.read_bytes()
 
         # Save to destination
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        dest.write_text(content)
+        atomic_write(dest, content)
 
-        return json.loads(content)
+        return loads(content)
 
 
 def parse_output_paths(info_json: dict, base_url_or_path: str, repo_root: Path = None) -> dict[str, str]:
@@ -130,19 +540,43 @@ def parse_output_paths(info_json: dict, base_url_or_path: str, repo_root: Path =
     return file_urls
 
 
+def member_output_paths(info_json: dict, info_member: str) -> dict[str, str]:
+    """Paths of the logs named in output_paths, for an info file inside a tree.
+
+    For info files in git commits or archives: like local logs, the other
+    logs are looked up by name next to the info file.
+
+    Returns:
+        Dictionary mapping 'usage', 'stdout' and 'stderr' (where given)
+        to paths in the same tree
+    """
+    output_paths = info_json.get('output_paths') or {}
+    base_dir = posixpath.dirname(info_member)
+    return {
+        kind: posixpath.join(base_dir, posixpath.basename(output_paths[kind]))
+        for kind in ('usage', 'stdout', 'stderr') if output_paths.get(kind)
+    }
+
+
 def fetch_log_files(
     example: ExampleEntry,
     log_dir: Path,
     force: bool = False,
-    repo_root: Path = None
+    repo_root: Path = None,
+    session=None
 ) -> FetchedLog:
     """Download all log files for an example or use local paths directly.
 
+    Of remote stdout and stderr, only the end is downloaded (see
+    download_tail): it is all previews show, and sections link the full
+    files upstream (see tail_links).
+
     Args:
         example: Example entry to fetch logs for
         log_dir: Base directory for storing logs (used for remote files only)
         force: If True, re-fetch even if files exist
         repo_root: Repository root path for local files (defaults to cwd)
+        session: Optional requests session (or FetchGuard) for downloads
 
     Returns:
         FetchedLog with paths to all files (local or downloaded)
@@ -167,8 +601,7 @@ def fetch_log_files(
         logger.info(f"Using local logs for '{example.title}'")
 
         # Parse info JSON to get other file paths
-        content = info_file_path.read_text()
-        info_json = json.loads(content)
+        info_json = loads(info_file_path.read_bytes())
         file_paths = parse_output_paths(info_json, str(example.info_file), repo_root)
 
         # Use the original local paths directly
@@ -186,15 +619,11 @@ def fetch_log_files(
         return FetchedLog(info_path, usage_path, stdout_path, stderr_path)
     else:
         # Remote files - download to log_dir
-        # Create subdirectory for this example
-        example_dir = log_dir / example.slug
-        example_dir.mkdir(parents=True, exist_ok=True)
-
-        # Define file paths
-        info_path = example_dir / "example_output_info.json"
-        usage_path = example_dir / "example_output_usage.json"
-        stdout_path = example_dir / "example_output_stdout"
-        stderr_path = example_dir / "example_output_stderr"
+        # Define file paths and create subdirectory for this example
+        cached = cached_log_paths(example, log_dir)
+        info_path, usage_path = cached.info_json, cached.usage_json
+        stdout_path, stderr_path = cached.stdout, cached.stderr
+        info_path.parent.mkdir(parents=True, exist_ok=True)
 
         # Check if files exist and skip if not forcing
         if not force and all(p.exists() for p in [info_path, usage_path, stdout_path, stderr_path]):
@@ -203,29 +632,42 @@ def fetch_log_files(
 
         logger.info(f"Fetching logs for '{example.title}'")
 
-        # Fetch and parse info JSON
-        info_json = fetch_info_json(str(example.info_file), info_path, repo_root)
-
-        # Parse output_paths to get other file URLs
-        file_paths = parse_output_paths(info_json, str(example.info_file), repo_root)
-
-        # Fetch usage, stdout, stderr
-        if 'usage' in file_paths:
-            response = requests.get(file_paths['usage'], timeout=30)
-            response.raise_for_status()
-            usage_path.write_text(response.text)
-            logger.debug(f"  ├─ Downloaded usage.json")
-
-        if 'stdout' in file_paths:
-            response = requests.get(file_paths['stdout'], timeout=30)
-            response.raise_for_status()
-            stdout_path.write_text(response.text)
-            logger.debug(f"  ├─ Downloaded stdout")
-
-        if 'stderr' in file_paths:
-            response = requests.get(file_paths['stderr'], timeout=30)
-            response.raise_for_status()
-            stderr_path.write_text(response.text)
-            logger.debug(f"  └─ Downloaded stderr")
-
-        return FetchedLog(info_path, usage_path, stdout_path, stderr_path)
+        # Download into temporaries that only replace the cached files once
+        # all of them arrived, so an interrupted fetch leaves no mixed set
+        with ExitStack() as stack:
+            tmp_info, tmp_usage, tmp_stdout, tmp_stderr = (
+                stack.enter_context(atomic_output(p))
+                for p in [info_path, usage_path, stdout_path, stderr_path]
+            )
+
+            # Fetch and parse info JSON
+            validators = {}
+            # Bytes received per log kind, counting only what was downloaded
+            sizes = {}
+            info_json = fetch_info_json(
+                str(example.info_file), tmp_info, repo_root, validators, session, sizes
+            )
+
+            # Parse output_paths to get other file URLs
+            file_paths = parse_output_paths(info_json, str(example.info_file), repo_root)
+
+            # Fetch usage, stdout, stderr
+            http = session or requests
+            if 'usage' in file_paths:
+                response = http.get(file_paths['usage'], timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
+                tmp_usage.write_text(response.text)
+                validators['usage'] = response_validators(file_paths['usage'], response)
+                sizes['usage'] = len(response.content)
+                logger.debug(f"  ├─ Downloaded usage.json")
+
+            for kind, tmp_path in (('stdout', tmp_stdout), ('stderr', tmp_stderr)):
+                if kind in file_paths:
+                    validators[kind], sizes[kind] = download_tail(
+                        file_paths[kind], tmp_path, session=session
+                    )
+                    logger.debug(f"  ├─ Downloaded the end of {kind}")
+
+        return FetchedLog(
+            info_path, usage_path, stdout_path, stderr_path, sum(sizes.values()), validators
+        )
@@ -1,10 +1,16 @@
 """Module for generating markdown gallery output."""
 
 import re
+import signal
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 from .models import ExampleEntry, ExampleRegistry
+from .quantiles import HIGH_USAGE
+from .units import format_bytes, format_duration
+
+LEADERBOARD_SIZE = 10
 
 
 def slugify(title: str) -> str:
@@ -78,11 +84,110 @@ def generate_tag_index(registry: ExampleRegistry) -> str:
     return "\n".join(lines)
 
 
+def _exit_status(code: Optional[int]) -> str:
+    """Exit code with the signal that killed the process, e.g. '137 (SIGKILL)'."""
+    if code is None:
+        return "—"
+    if code > 128:
+        try:
+            return f"{code} ({signal.Signals(code - 128).name})"
+        except ValueError:
+            pass
+    return str(code)
+
+
+def _leaderboard_table(rows: list[tuple[ExampleEntry, dict, dict]]) -> list[str]:
+    """Markdown table of examples with their execution summary and system values."""
+    lines = [
+        "| Example | Peak RSS | Wall time | Avg CPU | Samples | Exit code |",
+        "| --- | ---: | ---: | ---: | ---: | ---: |",
+    ]
+    for example, summary, system in rows:
+        peak_rss = summary.get('peak_rss')
+        memory_total = system.get('memory_total')
+        if peak_rss is None:
+            memory = "—"
+        elif memory_total:
+            memory = f"{format_bytes(peak_rss)} ({peak_rss / memory_total:.0%})"
+        else:
+            memory = format_bytes(peak_rss)
+
+        wall_clock_time = summary.get('wall_clock_time')
+        wall_time = "—" if wall_clock_time is None else format_duration(wall_clock_time)
+
+        average_pcpu = summary.get('average_pcpu')
+        cpu_total = system.get('cpu_total')
+        if average_pcpu is None:
+            cpu = "—"
+        elif cpu_total:
+            cpu = f"{average_pcpu:.0f}% of {cpu_total} CPUs"
+        else:
+            cpu = f"{average_pcpu:.0f}%"
+
+        samples = summary.get('num_samples')
+        title = example.title.replace('|', '\\|')
+        lines.append(
+            f"| [{title}](#{slugify(example.title)}) | {memory} | {wall_time} | {cpu} "
+            f"| {'—' if samples is None else samples} | {_exit_status(summary.get('exit_code'))} |"
+        )
+    return lines
+
+
+def generate_leaderboards(
+    summaries: list[tuple[ExampleEntry, dict]],
+    limit: int = LEADERBOARD_SIZE
+) -> str:
+    """Generate tables ranking examples by their execution summaries.
+
+    Only the values duct precomputes in info files are used, so the
+    tables never need the (much larger) usage logs.
+
+    Args:
+        summaries: Examples with the 'execution_summary' and 'system'
+                   sections of their info files
+        limit: Number of examples in each ranking (failed runs are all listed)
+
+    Returns:
+        Markdown leaderboards section, or an empty string if no example
+        has an execution summary
+    """
+    rows = [
+        (example, summary.get('execution_summary') or {}, summary.get('system') or {})
+        for example, summary in summaries
+    ]
+    rows = [row for row in rows if row[1]]
+    if not rows:
+        return ""
+
+    def ranked(key: str) -> list[tuple[ExampleEntry, dict, dict]]:
+        # Sorting is stable, so ties keep the registry order
+        with_value = [row for row in rows if row[1].get(key) is not None]
+        return sorted(with_value, key=lambda row: row[1][key], reverse=True)[:limit]
+
+    boards = [
+        ("🧠 Largest memory", ranked('peak_rss')),
+        ("⏱️ Longest runs", ranked('wall_clock_time')),
+        ("❌ Failed runs", [row for row in rows if row[1].get('exit_code') not in (None, 0)]),
+    ]
+
+    lines = ["## 🏆 Leaderboards\n"]
+    for title, board in boards:
+        if not board:
+            continue
+        lines.append(f"#### {title}\n")
+        lines.extend(_leaderboard_table(board))
+        lines.append("")
+    return "\n".join(lines)
+
+
 def generate_example_section(
     example: ExampleEntry,
     svg_exists: bool,
     log_paths: dict[str, Path],
-    image_dir: str
+    image_dir: str,
+    previews: Optional[dict[str, str]] = None,
+    processes: Optional[list[dict]] = None,
+    distribution: Optional[dict] = None
 ) -> str:
     """Generate markdown section for a single example.
 
@@ -91,6 +196,11 @@ def generate_example_section(
         svg_exists: Whether SVG plot file exists
         log_paths: Dictionary with 'info', 'usage', 'stdout', 'stderr' paths
         image_dir: Directory containing image files
+        previews: Last lines of 'stdout' and/or 'stderr', shown collapsed
+        processes: Ranked process groups ('name', 'processes', 'peak_rss',
+                   'cpu_seconds'); shown collapsed with the breakdown plot
+        distribution: Quantiles of RSS and CPU (see UsageDistribution.to_dict),
+                      shown collapsed
 
     Returns:
         Markdown section for the example
@@ -142,6 +252,58 @@ def generate_example_section(
     lines.append("</details>")
     lines.append("")
 
+    if distribution:
+        duration = distribution['duration']
+        lines.append("<details>")
+        lines.append("<summary>📈 Resource distribution</summary>")
+        lines.append("")
+        lines.append(f"| Metric | p50 | p90 | p99 | Peak | Time ≥ {HIGH_USAGE:.0%} of peak |")
+        lines.append("| --- | ---: | ---: | ---: | ---: | ---: |")
+        for label, metric, fmt in (
+            ("RSS", 'rss', format_bytes),
+            ("CPU", 'pcpu', lambda value: f"{value:.0f}%"),
+        ):
+            values = distribution[metric]
+            time_above = format_duration(values['time_above'])
+            if duration > 0:
+                time_above += f" ({values['time_above'] / duration:.0%})"
+            cells = " | ".join(fmt(values[key]) for key in ('p50', 'p90', 'p99', 'peak'))
+            lines.append(f"| {label} | {cells} | {time_above} |")
+        lines.append("")
+        lines.append("</details>")
+        lines.append("")
+
+    if processes:
+        lines.append("<details>")
+        lines.append("<summary>⚙️ Top processes</summary>")
+        lines.append("")
+        lines.append(f"![Memory by process for {example.title}]({image_dir}/{slug}-processes.svg)")
+        lines.append("")
+        lines.append("| Command | Processes | Peak RSS | CPU time |")
+        lines.append("| --- | ---: | ---: | ---: |")
+        for group in processes:
+            name = group['name'].replace('|', '\\|')
+            lines.append(
+                f"| `{name}` | {group['processes']} | {format_bytes(group['peak_rss'])} "
+                f"| {format_duration(group['cpu_seconds'])} |"
+            )
+        lines.append("")
+        lines.append("</details>")
+        lines.append("")
+
+    for kind, text in (previews or {}).items():
+        # Use a fence longer than any backtick run in the log itself
+        fence = "`" * max(3, max((len(run) for run in re.findall(r"`+", text)), default=0) + 1)
+        lines.append("<details>")
+        lines.append(f"<summary>📄 {kind} (last {len(text.splitlines())} lines)</summary>")
+        lines.append("")
+        lines.append(f"{fence}text")
+        lines.append(text)
+        lines.append(fence)
+        lines.append("")
+        lines.append("</details>")
+        lines.append("")
+
     return "\n".join(lines)
 
 
@@ -161,12 +323,12 @@ This gallery is automatically updated daily via GitHub Actions.
 """
 
 
-def generate_gallery(
+def render_sections(
     registry: ExampleRegistry,
     image_dir: Path,
     example_log_paths: dict[str, dict[str, Path]]
-) -> str:
-    """Generate complete gallery markdown.
+) -> list[str]:
+    """Render the markdown section of every example in registry order.
 
     Args:
         registry: Example registry
@@ -175,18 +337,9 @@ def generate_gallery(
                           (each with 'info', 'usage', 'stdout', 'stderr' keys)
 
     Returns:
-        Complete README.md markdown content
+        List of example sections, one per registry entry
     """
-    # Generate timestamp
-    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
-
-    # Build sections
     sections = []
-    sections.append(generate_header(timestamp))
-    sections.append(generate_tag_index(registry))
-    sections.append("## 📊 Examples\n")
-
-    # Generate section for each example
     for example in registry.examples:
         slug = slugify(example.title)
         svg_path = image_dir / f"{slug}.svg"
@@ -195,15 +348,66 @@ def generate_gallery(
         # Get log paths for this example
         log_paths = example_log_paths.get(example.title, {})
 
-        section = generate_example_section(
+        sections.append(generate_example_section(
             example,
             svg_exists,
             log_paths=log_paths,
             image_dir=str(image_dir)
-        )
-        sections.append(section)
-        sections.append("---\n")  # Separator
+        ))
+    return sections
+
+
+def assemble_gallery(
+    registry: ExampleRegistry,
+    sections: list[str],
+    timestamp: str = None,
+    leaderboards: str = ""
+) -> str:
+    """Assemble complete gallery markdown from pre-rendered example sections.
+
+    Args:
+        registry: Example registry
+        sections: Example sections in registry order
+        timestamp: Last updated timestamp (defaults to current UTC time)
+        leaderboards: Leaderboards section (see generate_leaderboards)
+
+    Returns:
+        Complete README.md markdown content
+    """
+    if timestamp is None:
+        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
+
+    parts = []
+    parts.append(generate_header(timestamp))
+    parts.append(generate_tag_index(registry))
+    if leaderboards:
+        parts.append(leaderboards)
+    parts.append("## 📊 Examples\n")
+
+    for section in sections:
+        parts.append(section)
+        parts.append("---\n")  # Separator
+
+    parts.append(generate_footer())
+
+    return "\n".join(parts)
 
-    sections.append(generate_footer())
 
-    return "\n".join(sections)
+def generate_gallery(
+    registry: ExampleRegistry,
+    image_dir: Path,
+    example_log_paths: dict[str, dict[str, Path]]
+) -> str:
+    """Generate complete gallery markdown.
+
+    Args:
+        registry: Example registry
+        image_dir: Directory containing image files
+        example_log_paths: Dict mapping example titles to their log file paths
+                          (each with 'info', 'usage', 'stdout', 'stderr' keys)
+
+    Returns:
+        Complete README.md markdown content
+    """
+    sections = render_sections(registry, image_dir, example_log_paths)
+    return assemble_gallery(registry, sections)
@@ -0,0 +1,314 @@
+"""Example logs read from git repositories pinned at a commit.
+
+Rather than downloading each log file of each example separately, every
+repository is kept as a shallow, blob-less bare clone: fetching a commit
+brings its trees only, the blobs the examples need are then fetched
+together in one request, and each example's files are read back through
+a single ``git cat-file --batch`` process. Many examples from one
+repository thus cost a few fetches rather than four HTTP requests each.
+"""
+
+import logging
+import subprocess
+import tempfile
+import threading
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+from .atomic import atomic_output
+from .fetcher import LOG_KINDS, FetchedLog, cached_log_paths, member_output_paths
+from .manifest import hash_data
+from .models import ExampleEntry
+from .records import loads
+
+logger = logging.getLogger(__name__)
+
+GIT_TIMEOUT = 600
+
+
+class GitError(RuntimeError):
+    """A git command failed."""
+
+
+class GitRepository:
+    """Shallow, blob-less bare clone of a remote repository.
+
+    The objects in the clone are listed once and then tracked as they are
+    fetched, and the tree of each commit is listed once, so checking what
+    to fetch and resolving paths needs no git process after the first.
+    Calls are serialized with a lock, so a repository can be shared by the
+    threads of a build.
+    """
+
+    def __init__(self, url: str, path: Path):
+        self.url = url
+        self.path = Path(path)
+        self.lock = threading.RLock()
+        self._objects: Optional[set[str]] = None
+        self._trees: dict[str, dict[str, str]] = {}
+
+    def _git(self, *args: str, input: Optional[bytes] = None) -> bytes:
+        try:
+            process = subprocess.run(
+                ['git', '--git-dir', str(self.path), *args],
+                input=input, capture_output=True, timeout=GIT_TIMEOUT
+            )
+        except FileNotFoundError:
+            raise GitError("git is not installed") from None
+        if process.returncode != 0:
+            stderr = process.stderr.decode(errors='replace').strip()
+            raise GitError(f"git {args[0]} failed for {self.url}: {stderr}")
+        return process.stdout
+
+    def _init(self) -> None:
+        if (self.path / 'HEAD').exists():
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._git('init', '--quiet', '--bare')
+        self._git('remote', 'add', 'origin', self.url)
+
+    def _present(self) -> set[str]:
+        """Objects in the clone, listed on first use and updated by _fetch."""
+        if self._objects is None:
+            # Asking for a missing object by name would fetch it on its own
+            output = self._git(
+                'cat-file', '--batch-check=%(objectname)', '--batch-all-objects', '--unordered'
+            )
+            self._objects = set(output.decode().split())
+        return self._objects
+
+    def _fetch(self, wants: list[str], shallow: bool) -> None:
+        args = ['fetch', '--quiet', '--no-tags', '--filter=blob:none']
+        if shallow:
+            args.append('--depth=1')
+        logger.debug(f"Fetching {len(wants)} objects from {self.url}")
+        self._git(*args, 'origin', *wants)
+        self._present().update(wants)
+
+    @contextmanager
+    def _cat_file(self) -> Iterator[Callable[[Iterable[str]], dict[str, bytes]]]:
+        """Yield a function reading blobs through one ``git cat-file --batch`` process.
+
+        The function can be called several times, e.g. to read the logs an
+        info file names after reading the info file. Blobs must be in the
+        clone (see fetch_blobs).
+        """
+        try:
+            process = subprocess.Popen(
+                ['git', '--git-dir', str(self.path), 'cat-file', '--batch'],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            raise GitError("git is not installed") from None
+
+        def read(oids: Iterable[str]) -> dict[str, bytes]:
+            blobs = {}
+            # One object at a time, so neither pipe fills up while the other waits
+            for oid in sorted(set(oids)):
+                process.stdin.write(f'{oid}\n'.encode())
+                process.stdin.flush()
+                header = process.stdout.readline().split()
+                if len(header) != 3:
+                    raise GitError(f"Object {oid} is missing from {self.url}")
+                blobs[oid] = process.stdout.read(int(header[2]))
+                process.stdout.read(1)
+            return blobs
+
+        try:
+            yield read
+        finally:
+            process.stdin.close()
+            process.stdout.close()
+            process.wait(timeout=GIT_TIMEOUT)
+
+    def ensure_commits(self, commits: Iterable[str]) -> None:
+        """Fetch the trees (but no blobs) of the commits not yet in the clone."""
+        with self.lock:
+            self._init()
+            present = self._present()
+            missing = sorted({c for c in commits if c not in present})
+            if missing:
+                self._fetch(missing, shallow=True)
+
+    def tree(self, commit: str) -> dict[str, str]:
+        """Object name of every file at a commit, by path."""
+        with self.lock:
+            if commit not in self._trees:
+                self.ensure_commits([commit])
+                output = self._git('ls-tree', '-r', '-z', '--full-tree', commit)
+                files = {}
+                for entry in output.decode().split('\0'):
+                    if entry:
+                        meta, _, path = entry.partition('\t')
+                        files[path] = meta.split()[2]
+                self._trees[commit] = files
+            return self._trees[commit]
+
+    def blob_ids(self, commit: str, paths: Iterable[str]) -> dict[str, str]:
+        """Object names of files at a commit (paths missing there are left out)."""
+        files = self.tree(commit)
+        return {path: files[path] for path in set(paths) if path in files}
+
+    def fetch_blobs(self, oids: Iterable[str]) -> None:
+        """Fetch the blobs not yet in the clone, all in one request."""
+        with self.lock:
+            self._init()
+            missing = sorted(set(oids) - self._present())
+            if missing:
+                self._fetch(missing, shallow=False)
+
+    def read_blobs(self, oids: Iterable[str]) -> dict[str, bytes]:
+        """Contents of blobs, read through one cat-file process."""
+        oids = set(oids)
+        if not oids:
+            return {}
+        with self.lock:
+            self.fetch_blobs(oids)
+            with self._cat_file() as read:
+                return read(oids)
+
+    def read(self, commit: str, paths: Iterable[str]) -> dict[str, bytes]:
+        """Contents of files at a commit.
+
+        Raises:
+            FileNotFoundError: If a path does not exist at the commit
+            GitError: If fetching or reading fails
+        """
+        paths = list(paths)
+        ids = self.blob_ids(commit, paths)
+        for path in paths:
+            if path not in ids:
+                raise FileNotFoundError(f"{path} not found at {commit[:12]} of {self.url}")
+        blobs = self.read_blobs(ids.values())
+        return {path: blobs[ids[path]] for path in paths}
+
+    def read_logs(self, commit: str, info_path: str) -> dict[str, bytes]:
+        """Contents of an info file and of the logs it names, through one cat-file process.
+
+        Returns:
+            Dictionary mapping 'info' and the kinds of the logs named in its
+            output_paths to their contents
+
+        Raises:
+            FileNotFoundError: If the info file or a log does not exist at the commit
+            GitError: If fetching or reading fails
+        """
+        with self.lock:
+            files = self.tree(commit)
+
+            def blob_id(path: str) -> str:
+                if path not in files:
+                    raise FileNotFoundError(f"{path} not found at {commit[:12]} of {self.url}")
+                return files[path]
+
+            info_id = blob_id(info_path)
+            self.fetch_blobs([info_id])
+            with self._cat_file() as read:
+                info = read([info_id])[info_id]
+                members = member_output_paths(loads(info), info_path)
+                log_ids = {kind: blob_id(path) for kind, path in members.items()}
+                self.fetch_blobs(log_ids.values())
+                logs = read(log_ids.values())
+        return {'info': info, **{kind: logs[oid] for kind, oid in log_ids.items()}}
+
+
+class GitSources:
+    """The clones used by a build, one per repository URL.
+
+    Clones live under root (e.g. in the persistent cache) so later builds
+    reuse them; without a root they go to a temporary directory that is
+    removed with this object.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self._root = Path(root) if root is not None else None
+        self._tmp = None
+        self._repositories: dict[str, GitRepository] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> Path:
+        """Directory of the clones."""
+        if self._root is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix='con-duct-gallery-git-')
+            self._root = Path(self._tmp.name)
+        return self._root
+
+    def repository(self, url: str) -> GitRepository:
+        """The clone of a repository (created on first fetch)."""
+        with self._lock:
+            if url not in self._repositories:
+                path = self.root / f"{hash_data(url)[:16]}.git"
+                self._repositories[url] = GitRepository(url, path)
+            return self._repositories[url]
+
+    def prefetch(self, examples: list[ExampleEntry]) -> None:
+        """Fetch everything the git examples need with a few requests per repository.
+
+        All commits of a repository are fetched together, then the blobs
+        of all info files, then the blobs of all the logs they name. Later
+        reads of these examples need no network.
+        """
+        by_url: dict[str, list[ExampleEntry]] = {}
+        for example in examples:
+            if example.git is not None:
+                by_url.setdefault(example.git.url, []).append(example)
+
+        for url, group in by_url.items():
+            repo = self.repository(url)
+            repo.ensure_commits(e.git.commit for e in group)
+            info_ids = {e.slug: repo.blob_ids(e.git.commit, [str(e.info_file)]) for e in group}
+            infos = repo.read_blobs(oid for ids in info_ids.values() for oid in ids.values())
+
+            log_ids = []
+            for example in group:
+                info_path = str(example.info_file)
+                oid = info_ids[example.slug].get(info_path)
+                if oid is None:
+                    continue
+                try:
+                    members = member_output_paths(loads(infos[oid]), info_path)
+                except ValueError:
+                    continue
+                log_ids.extend(repo.blob_ids(example.git.commit, members.values()).values())
+            repo.fetch_blobs(log_ids)
+
+
+def fetch_git_logs(
+    example: ExampleEntry,
+    log_dir: Path,
+    sources: GitSources,
+    force: bool = False
+) -> FetchedLog:
+    """Read an example's logs from its git source into the log directory.
+
+    Args:
+        example: Example entry with a git source
+        log_dir: Base directory for storing logs
+        sources: Clones to read through
+        force: If True, read again even if the files exist
+
+    Returns:
+        FetchedLog with the paths of the written files
+
+    Raises:
+        FileNotFoundError: If the info file or a log is not in the commit
+        GitError: If fetching from the repository fails
+    """
+    cached = cached_log_paths(example, log_dir)
+    if not force and all(p.exists() for p in cached.paths):
+        logger.info(f"Using cached logs for '{example.title}'")
+        return cached
+
+    logger.info(f"Reading logs for '{example.title}' from {example.git.url}")
+    repo = sources.repository(example.git.url)
+    contents = repo.read_logs(example.git.commit, str(example.info_file))
+
+    cached.info_json.parent.mkdir(parents=True, exist_ok=True)
+    with ExitStack() as stack:
+        for kind, path in zip(LOG_KINDS, cached.paths):
+            tmp_path = stack.enter_context(atomic_output(path))
+            if kind in contents:
+                tmp_path.write_bytes(contents[kind])
+    return cached._replace(bytes_downloaded=sum(map(len, contents.values())))
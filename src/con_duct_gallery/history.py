@@ -0,0 +1,339 @@
+"""SQLite history of example runs, queryable across builds.
+
+Every build records each example's execution summary, plus a few derived
+statistics and the quantiles sketched from its usage log, keyed by the
+content hash of its info file. A run is therefore stored once however many
+builds see it, and a new row appears whenever an example's logs are
+replaced by a newer run. Queries only read the database, never log files.
+"""
+
+import logging
+import re
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from .units import format_bytes, format_duration
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY = Path('.con-duct-gallery') / 'history.sqlite'
+
+SCHEMA_VERSION = 2
+
+# Columns copied from execution_summary
+SUMMARY_METRICS = (
+    'wall_clock_time',
+    'peak_rss', 'average_rss',
+    'peak_vsz', 'average_vsz',
+    'peak_pmem', 'average_pmem',
+    'peak_pcpu', 'average_pcpu',
+    'num_samples', 'num_reports',
+)
+
+# Columns computed from the summary and system info
+DERIVED_METRICS = ('cpu_seconds', 'memory_fraction')
+
+# Columns from the usage distribution (see quantiles.UsageDistribution)
+DISTRIBUTION_METRICS = tuple(
+    f'{metric}_{value}'
+    for metric in ('rss', 'pcpu')
+    for value in ('p50', 'p90', 'p99', 'time_above')
+)
+
+METRICS = SUMMARY_METRICS + DERIVED_METRICS + DISTRIBUTION_METRICS
+
+_BYTE_METRICS = frozenset((
+    'peak_rss', 'average_rss', 'peak_vsz', 'average_vsz', 'rss_p50', 'rss_p90', 'rss_p99',
+))
+_TIME_METRICS = frozenset((
+    'wall_clock_time', 'cpu_seconds', 'rss_time_above', 'pcpu_time_above',
+))
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL,
+    info_hash TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    start_time REAL,
+    end_time REAL,
+    exit_code INTEGER,
+    {', '.join(f'{metric} REAL' for metric in METRICS)},
+    UNIQUE (slug, info_hash)
+);
+CREATE INDEX IF NOT EXISTS runs_by_example ON runs (slug, recorded_at);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (recorded_at);
+CREATE TABLE IF NOT EXISTS examples (
+    slug TEXT PRIMARY KEY,
+    title TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    PRIMARY KEY (tag, slug)
+) WITHOUT ROWID;
+"""
+
+# Latest run of every example, optionally recorded no later than a time
+_LATEST = """
+SELECT * FROM runs WHERE id IN (
+    SELECT MAX(id) FROM runs WHERE recorded_at <= :before GROUP BY slug
+)
+"""
+
+_TAGGED = "AND (:tag IS NULL OR slug IN (SELECT slug FROM tags WHERE tag = :tag))"
+
+_SINCE = re.compile(r'^(\d+)([hdw])$')
+_SINCE_UNITS = {'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+
+class RunRow(NamedTuple):
+    """One line of a query result."""
+    slug: str
+    title: str
+    values: tuple
+
+
+def derived_metrics(summary: dict, system: dict) -> dict:
+    """Statistics derived from an execution summary and system info.
+
+    cpu_seconds is the CPU time implied by the average CPU share over the
+    wall clock time; memory_fraction is the peak RSS over the memory of
+    the machine the run used.
+    """
+    wall, pcpu = summary.get('wall_clock_time'), summary.get('average_pcpu')
+    peak, total = summary.get('peak_rss'), system.get('memory_total')
+    return {
+        'cpu_seconds': wall * pcpu / 100 if wall is not None and pcpu is not None else None,
+        'memory_fraction': peak / total if peak is not None and total else None,
+    }
+
+
+def distribution_metrics(distribution: Optional[dict]) -> dict:
+    """Distribution columns of a usage distribution (all None without one)."""
+    values = dict.fromkeys(DISTRIBUTION_METRICS)
+    for column in DISTRIBUTION_METRICS:
+        metric, _, value = column.partition('_')
+        if distribution and metric in distribution:
+            values[column] = distribution[metric].get(value)
+    return values
+
+
+def format_metric(metric: str, value) -> str:
+    """Human-readable value of a metric column."""
+    if value is None:
+        return '-'
+    if metric in _BYTE_METRICS:
+        return format_bytes(value)
+    if metric in _TIME_METRICS:
+        return format_duration(value)
+    return f"{value:.6g}"
+
+
+def parse_since(text: str, now: Optional[float] = None) -> float:
+    """Parse a relative age ('30d', '2w', '12h') or ISO date into a POSIX time.
+
+    Raises:
+        ValueError: If text is neither
+    """
+    match = _SINCE.match(text.strip())
+    if match:
+        now = time.time() if now is None else now
+        return now - int(match.group(1)) * _SINCE_UNITS[match.group(2)]
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid time '{text}', expected e.g. 30d, 2w or 2025-09-01")
+
+
+def _check_metric(metric: str) -> str:
+    # Metric names are interpolated into SQL, so only known columns pass
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}', expected one of: {', '.join(METRICS)}")
+    return metric
+
+
+class RunHistory:
+    """Connection to the run history database."""
+
+    def __init__(self, path: Path = DEFAULT_HISTORY):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version > SCHEMA_VERSION:
+            self.connection.close()
+            raise ValueError(f"{self.path} was written by a newer version (schema {version})")
+        with self.connection:
+            self.connection.executescript(_SCHEMA)
+            self._migrate()
+            self.connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def _migrate(self) -> None:
+        # Version 2 added the distribution columns
+        columns = {row[1] for row in self.connection.execute('PRAGMA table_info(runs)')}
+        for metric in DISTRIBUTION_METRICS:
+            if metric not in columns:
+                self.connection.execute(f'ALTER TABLE runs ADD COLUMN {metric} REAL')
+
+    def __enter__(self) -> 'RunHistory':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def record_run(
+        self,
+        slug: str,
+        info_hash: str,
+        summary: dict,
+        system: Optional[dict] = None,
+        recorded_at: Optional[float] = None,
+        distribution: Optional[dict] = None
+    ) -> bool:
+        """Store a run unless it is already recorded.
+
+        A run recorded without a distribution gets the distribution's
+        columns filled in when one is given later.
+
+        Args:
+            slug: Example slug
+            info_hash: Content hash of the run's info file
+            summary: execution_summary of the info file
+            system: system section of the info file
+            recorded_at: POSIX time of the build (default: now)
+            distribution: Usage distribution of the run's usage log
+
+        Returns:
+            True if the run was new
+        """
+        values = {metric: summary.get(metric) for metric in SUMMARY_METRICS}
+        values.update(derived_metrics(summary, system or {}))
+        values.update(distribution_metrics(distribution))
+        values.update(
+            slug=slug,
+            info_hash=info_hash,
+            recorded_at=time.time() if recorded_at is None else recorded_at,
+            start_time=summary.get('start_time'),
+            end_time=summary.get('end_time'),
+            exit_code=summary.get('exit_code'),
+        )
+        columns = ', '.join(values)
+        placeholders = ', '.join(f':{column}' for column in values)
+        with self.connection:
+            cursor = self.connection.execute(
+                f'INSERT OR IGNORE INTO runs ({columns}) VALUES ({placeholders})', values
+            )
+            added = cursor.rowcount == 1
+            if not added and distribution:
+                assignments = ', '.join(f'{metric} = :{metric}' for metric in DISTRIBUTION_METRICS)
+                self.connection.execute(
+                    f"""
+                    UPDATE runs SET {assignments}
+                    WHERE slug = :slug AND info_hash = :info_hash AND rss_p50 IS NULL
+                    """,
+                    values
+                )
+        return added
+
+    def set_examples(self, examples: list[tuple[str, str, list[str]]]) -> None:
+        """Replace the titles and tags of the configured examples.
+
+        Args:
+            examples: (slug, title, tags) of every configured example
+        """
+        with self.connection:
+            self.connection.execute('DELETE FROM tags')
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO examples (slug, title) VALUES (?, ?)',
+                [(slug, title) for slug, title, _ in examples]
+            )
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO tags (tag, slug) VALUES (?, ?)',
+                [(tag, slug) for slug, _, tags in examples for tag in tags]
+            )
+
+    def top(self, metric: str, limit: int = 20, tag: Optional[str] = None) -> list[RunRow]:
+        """Examples ranked by a metric of their latest run, highest first."""
+        metric = _check_metric(metric)
+        rows = self.connection.execute(
+            f"""
+            SELECT latest.slug, COALESCE(title, latest.slug), {metric}
+            FROM ({_LATEST}) AS latest LEFT JOIN examples USING (slug)
+            WHERE {metric} IS NOT NULL {_TAGGED}
+            ORDER BY {metric} DESC LIMIT :limit
+            """,
+            {'before': float('inf'), 'tag': tag, 'limit': limit}
+        )
+        return [RunRow(slug, title, (value,)) for slug, title, value in rows]
+
+    def growth(
+        self,
+        metric: str,
+        since: float,
+        threshold: float = 0.0,
+        tag: Optional[str] = None
+    ) -> list[RunRow]:
+        """Examples whose latest run grew in a metric compared to an earlier one.
+
+        The baseline of each example is its latest run recorded at or before
+        since; examples without one are left out.
+
+        Args:
+            metric: Metric column
+            since: POSIX time of the baseline
+            threshold: Minimum growth in percent
+            tag: Only consider examples with this tag
+
+        Returns:
+            Rows with (baseline, latest, growth %) values, largest growth first
+        """
+        metric = _check_metric(metric)
+        rows = self.connection.execute(
+            f"""
+            WITH baseline AS ({_LATEST.replace(':before', ':since')}),
+                 latest AS ({_LATEST})
+            SELECT slug, COALESCE(title, slug), baseline.{metric}, latest.{metric},
+                   (latest.{metric} - baseline.{metric}) * 100.0 / baseline.{metric} AS change
+            FROM latest JOIN baseline USING (slug) LEFT JOIN examples USING (slug)
+            WHERE baseline.{metric} > 0 AND change >= :threshold {_TAGGED}
+            ORDER BY change DESC
+            """,
+            {'before': float('inf'), 'since': since, 'threshold': threshold, 'tag': tag}
+        )
+        return [RunRow(slug, title, tuple(values)) for slug, title, *values in rows]
+
+
+def record_build(history: RunHistory, registry, results, manifest) -> int:
+    """Record the runs of a build's fetched examples.
+
+    Args:
+        history: Run history to append to
+        registry: Gallery configuration
+        results: ExampleResults of the build
+        manifest: Build manifest, used for (stat-cached) info file hashes
+
+    Returns:
+        Number of runs that were not recorded before
+    """
+    history.set_examples([(e.slug, e.title, e.tags) for e in registry.examples])
+    recorded_at = time.time()
+    added = 0
+    for result in results:
+        summary = result.summary.get('execution_summary') if result.summary else None
+        if result.log_paths is None or not summary:
+            continue
+        info_hash = manifest.hash_file(result.log_paths['info'])
+        if info_hash is None:
+            continue
+        added += history.record_run(
+            result.example.slug, info_hash, summary, result.summary.get('system'), recorded_at,
+            result.distribution
+        )
+    return added
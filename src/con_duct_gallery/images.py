@@ -0,0 +1,162 @@
+"""Content-addressed store of rendered images.
+
+Each image is stored once under ``objects/`` in the image directory, named
+by the SHA-256 of its bytes. The names the gallery links to
+(``<slug>.svg``, ``<slug>-processes.svg``) are regular files, hard links
+to the current object (copies where hard links are unavailable), so they
+stay stable while the content changes and check out the same everywhere.
+Identical renders (the same log under two titles, or a re-render producing
+the same bytes) are written once, and an alias that already has the
+content of the right object is not touched at all.
+"""
+
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Collection, Iterator, Optional
+
+from .atomic import atomic_output, fsync_file, temp_sibling
+from .manifest import hash_bytes, hash_file
+
+logger = logging.getLogger(__name__)
+
+OBJECTS_DIR = 'objects'
+
+
+def object_path(image_dir: Path, digest: str, suffix: str = '.svg') -> Path:
+    """Path of the object holding content with the given digest."""
+    return Path(image_dir) / OBJECTS_DIR / f"{digest}{suffix}"
+
+
+def resolve_alias(alias: Path) -> Optional[Path]:
+    """Object holding the content of an alias, or None if the store has none."""
+    alias = Path(alias)
+    if not alias.is_file():
+        return None
+    target = object_path(alias.parent, hash_file(alias), alias.suffix)
+    return target if target.exists() else None
+
+
+def link_alias(alias: Path, target: Path) -> bool:
+    """Give alias the content of an object, unless it has it already.
+
+    The alias is replaced by a hard link to the object, or by a copy of
+    it where hard links are unavailable.
+
+    Returns:
+        True if the alias changed
+    """
+    alias = Path(alias)
+    if alias.is_file() and not alias.is_symlink():
+        if os.path.samefile(alias, target):
+            return False
+        if alias.stat().st_size == target.stat().st_size and hash_file(alias) == target.stem:
+            return False
+    with atomic_output(alias) as tmp_path:
+        try:
+            os.link(target, tmp_path)
+        except OSError:
+            shutil.copyfile(target, tmp_path)
+    return True
+
+
+def store_file(path: Path, image_dir: Path, data: Optional[bytes] = None) -> Path:
+    """Move a rendered file into the store of image_dir.
+
+    If an object with the same content exists, it is kept as is (mtime
+    included) and path is removed.
+
+    Args:
+        path: Rendered file
+        image_dir: Directory of the store
+        data: Content of path, if already read
+
+    Returns:
+        Path of the object
+    """
+    path = Path(path)
+    digest = hash_bytes(data) if data is not None else hash_file(path)
+    target = object_path(image_dir, digest, path.suffix)
+    if target.exists():
+        path.unlink()
+        return target
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fsync_file(path)
+    os.replace(path, target)
+    return target
+
+
+@contextmanager
+def image_output(alias: Path, rendered: Optional[dict[Path, bytes]] = None) -> Iterator[Path]:
+    """Yield a temporary path to render an image to, then store it under alias.
+
+    Like atomic_output, the store and alias are left untouched if the
+    block raises or writes nothing. If rendered is given, the stored bytes
+    are put in it under alias.
+    """
+    alias = Path(alias)
+    # Rendered inside the store so moving it there is a rename
+    tmp_path = temp_sibling(alias.parent / OBJECTS_DIR / alias.name)
+    tmp_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        yield tmp_path
+        if tmp_path.exists():
+            data = None
+            if rendered is not None:
+                data = rendered[alias] = tmp_path.read_bytes()
+            target = store_file(tmp_path, alias.parent, data)
+            if link_alias(alias, target):
+                logger.debug(f"{alias} -> {target.name}")
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def prune_objects(image_dir: Path, aliases: Optional[Collection[str]] = None) -> list[Path]:
+    """Remove the objects that no alias in image_dir refers to.
+
+    Args:
+        image_dir: Directory of the aliases and the store
+        aliases: If given, names of the aliases still generated; other
+            aliases with a stored suffix (e.g. of a renamed example) are
+            removed first
+
+    Returns:
+        Removed alias and object paths
+    """
+    image_dir = Path(image_dir)
+    objects = image_dir / OBJECTS_DIR
+    if not objects.is_dir():
+        return []
+
+    removed = []
+    if aliases is not None:
+        suffixes = {path.suffix for path in objects.iterdir()}
+        for alias in image_dir.iterdir():
+            if (alias.is_file() and alias.suffix in suffixes and alias.name not in aliases
+                    and not alias.name.startswith('.')):
+                alias.unlink()
+                removed.append(alias)
+
+    linked = set()
+    referenced = set()
+    for alias in image_dir.iterdir():
+        if not alias.is_file():
+            continue
+        stat = alias.stat()
+        if stat.st_nlink > 1:
+            linked.add((stat.st_dev, stat.st_ino))
+        else:
+            # A copy, where hard links are unavailable
+            referenced.add(object_path(image_dir, hash_file(alias), alias.suffix))
+
+    for path in objects.iterdir():
+        # Dot files are renders in progress
+        if path in referenced or path.name.startswith('.'):
+            continue
+        stat = path.stat()
+        if (stat.st_dev, stat.st_ino) not in linked:
+            path.unlink()
+            removed.append(path)
+    return removed
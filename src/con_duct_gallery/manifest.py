@@ -0,0 +1,238 @@
+"""Persistent build manifest recording stage input and output hashes.
+
+The manifest is rewritten atomically at the end of a build. Until then,
+each completed stage is appended to a journal next to it, so a build that
+is killed partway resumes from its last completed stage instead of
+redoing (or wrongly trusting) earlier work. Entries reach the OS as soon
+as a stage completes and the disk once per example (see sync); a power
+loss can only drop the last entries, whose stages are then redone.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from .atomic import atomic_write
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+JOURNAL_SUFFIX = '.journal'
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the SHA-256 hex digest of raw bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_data(data) -> str:
+    """Return a stable hash of JSON-serializable data.
+
+    Args:
+        data: Any JSON-serializable value (non-serializable leaves are
+              converted with str())
+
+    Returns:
+        SHA-256 hex digest of the canonical JSON encoding
+    """
+    encoded = json.dumps(data, sort_keys=True, default=str, ensure_ascii=False)
+    return hash_bytes(encoded.encode('utf-8'))
+
+
+def hash_file(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class StageRecord(NamedTuple):
+    """What a stage consumed and produced the last time it ran."""
+    inputs: dict[str, str]
+    outputs: dict[str, str]
+    result: dict
+
+
+class BuildManifest:
+    """Persisted record of stage inputs/outputs, keyed by stage and example.
+
+    The manifest also remembers file stat signatures next to their hashes
+    so unchanged files are not re-read on every build. The signature
+    (size, mtime, ctime, inode) cannot be restored by tools that reset
+    mtimes, and atomic replaces get a new inode; a file rewritten in place
+    within the timestamp granularity of its filesystem is still trusted.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.records: dict[str, StageRecord] = {}
+        self._file_hashes: dict[str, tuple[int, int, int, int, str]] = {}
+        self._unjournaled_files: set[str] = set()
+        self._journal = None
+        self._lock = threading.Lock()
+        # Journal entries written and known to be on disk (see sync)
+        self._written = 0
+        self._synced = 0
+        self._sync_lock = threading.Lock()
+
+    @property
+    def journal_path(self) -> Optional[Path]:
+        """Location of the journal of stages completed since the last save."""
+        if self.path is None:
+            return None
+        return self.path.with_name(self.path.name + JOURNAL_SUFFIX)
+
+    @classmethod
+    def load(cls, path: Path) -> 'BuildManifest':
+        """Load manifest from disk, starting empty if missing or unreadable.
+
+        Stages recorded in the journal by an interrupted build are applied
+        on top of the saved manifest.
+        """
+        manifest = cls(path)
+        if path.exists():
+            manifest._read_snapshot()
+        manifest._replay_journal()
+        return manifest
+
+    def _read_snapshot(self) -> None:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable build manifest {self.path}: {e}")
+            return
+
+        if data.get('version') != MANIFEST_VERSION:
+            logger.info(f"Build manifest {self.path} has an old format, rebuilding")
+            return
+
+        for key, record in data.get('stages', {}).items():
+            self.records[key] = StageRecord(
+                record.get('inputs', {}),
+                record.get('outputs', {}),
+                record.get('result', {})
+            )
+        self._load_file_hashes(data.get('files', {}))
+
+    def _load_file_hashes(self, files: dict) -> None:
+        for file_path, entry in files.items():
+            # Entries with an older signature are dropped, and rehashed when used
+            if len(entry) == 5:
+                self._file_hashes[file_path] = tuple(entry)
+
+    def _replay_journal(self) -> None:
+        try:
+            lines = self.journal_path.read_text().splitlines()
+        except (OSError, ValueError):
+            return
+
+        replayed = 0
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                key, record = entry['stage'], StageRecord(**entry['record'])
+                files = entry.get('files', {})
+            except (ValueError, KeyError, TypeError):
+                # Torn write of the stage that was running when the build died
+                logger.debug(f"Skipping incomplete journal entry in {self.journal_path}")
+                continue
+            self.records[key] = record
+            self._load_file_hashes(files)
+            replayed += 1
+        if replayed:
+            logger.info(f"Resuming interrupted build: {replayed} stages recorded in {self.journal_path}")
+
+    def _append_journal(self, key: str, record: StageRecord) -> None:
+        """Append a completed stage (and newly hashed files) to the journal."""
+        if self._journal is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = open(self.journal_path, 'a+b')
+            self._journal.seek(0, os.SEEK_END)
+            if self._journal.tell():
+                self._journal.seek(-1, os.SEEK_END)
+                if self._journal.read(1) != b'\n':
+                    # Terminate a torn last entry so it cannot swallow the next one
+                    self._journal.write(b'\n')
+        files = {p: self._file_hashes[p] for p in sorted(self._unjournaled_files)}
+        self._unjournaled_files.clear()
+        entry = {'stage': key, 'record': record._asdict(), 'files': files}
+        self._journal.write(json.dumps(entry, sort_keys=True).encode('utf-8') + b'\n')
+        self._journal.flush()
+        self._written += 1
+
+    def sync(self) -> None:
+        """Flush the journal to disk, covering every stage recorded so far.
+
+        The fsync runs outside the lock stages are recorded under, so
+        other workers keep recording meanwhile, and callers arriving
+        while one is in progress share the next one (group commit).
+        """
+        with self._sync_lock:
+            with self._lock:
+                journal, written = self._journal, self._written
+            if journal is None or written == self._synced:
+                return
+            os.fsync(journal.fileno())
+            self._synced = written
+
+    def save(self) -> None:
+        """Atomically write the manifest to its path and clear the journal."""
+        if self.path is None:
+            return
+
+        with self._sync_lock, self._lock:
+            data = {
+                'version': MANIFEST_VERSION,
+                'stages': {
+                    key: record._asdict()
+                    for key, record in sorted(self.records.items())
+                },
+                'files': dict(sorted(self._file_hashes.items())),
+            }
+            atomic_write(self.path, json.dumps(data, indent=1, sort_keys=True))
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            self.journal_path.unlink(missing_ok=True)
+            self._unjournaled_files.clear()
+
+    def get(self, key: str) -> Optional[StageRecord]:
+        """Get the record for a stage key, if any."""
+        return self.records.get(key)
+
+    def record(self, key: str, record: StageRecord) -> None:
+        """Store the record for a stage key and journal it."""
+        with self._lock:
+            self.records[key] = record
+            if self.path is not None:
+                self._append_journal(key, record)
+
+    def hash_file(self, path: Path) -> Optional[str]:
+        """Hash a file, reusing the cached digest if its stat is unchanged.
+
+        Returns:
+            Hex digest, or None if the file does not exist
+        """
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+
+        key = str(path)
+        signature = (st.st_size, st.st_mtime_ns, st.st_ctime_ns, st.st_ino)
+        cached = self._file_hashes.get(key)
+        if cached and cached[:4] == signature:
+            return cached[4]
+
+        digest = hash_file(path)
+        with self._lock:
+            self._file_hashes[key] = (*signature, digest)
+            self._unjournaled_files.add(key)
+        return digest
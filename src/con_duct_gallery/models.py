@@ -2,9 +2,52 @@
 
 import re
 from pathlib import Path
-from typing import Optional, Union
+from typing import Literal, Optional, Union
 import yaml
-from pydantic import BaseModel, HttpUrl, field_validator
+from pydantic import BaseModel, Field, HttpUrl, field_validator, model_validator
+
+from .validation import check_info_file, check_tags, check_title, check_titles
+
+# Archives whose members an info_file can name as <archive>#<member>
+ARCHIVE_SUFFIXES = ('.tar.gz', '.tgz', '.tar.zst', '.tzst', '.zip')
+
+
+class ProcessOptions(BaseModel):
+    """Settings of an example's per-process breakdown."""
+
+    top: int = Field(default=8, ge=1, le=9)
+    group: Optional[str] = None
+    rank: Literal['rss', 'cpu'] = 'rss'
+
+    @field_validator('group')
+    @classmethod
+    def validate_group(cls, v: Optional[str]) -> Optional[str]:
+        """Validate group is a regular expression with at most one capture group."""
+        if v is None:
+            return v
+        try:
+            pattern = re.compile(v)
+        except re.error as e:
+            raise ValueError(f'Invalid group pattern: {e}')
+        if pattern.groups > 1:
+            raise ValueError('Group pattern must have at most one capture group')
+        return v
+
+
+class GitSource(BaseModel):
+    """A git repository at a commit, where an example's info_file is a path."""
+
+    url: str
+    commit: str
+
+    @field_validator('commit')
+    @classmethod
+    def validate_commit(cls, v: str) -> str:
+        """Validate commit is a full object name, so the logs behind it cannot change."""
+        v = v.strip().lower()
+        if len(v) not in (40, 64) or not re.fullmatch(r'[0-9a-f]+', v):
+            raise ValueError('commit must be a full (40 or 64 character) hexadecimal object name')
+        return v
 
 
 class ExampleEntry(BaseModel):
@@ -16,40 +59,35 @@ class ExampleEntry(BaseModel):
     tags: list[str] = []
     plot_options: list[str] = []
     description: str = ""
+    renderer: Optional[Literal["con-duct", "native"]] = None
+    processes: Optional[ProcessOptions] = None
+    git: Optional[GitSource] = None
 
     @field_validator('title')
     @classmethod
     def validate_title(cls, v: str) -> str:
         """Validate title is non-empty and under 100 characters."""
-        v = v.strip()
-        if not v:
-            raise ValueError('Title cannot be empty')
-        if len(v) > 100:
-            raise ValueError('Title must be ≤100 characters')
-        return v
+        return check_title(v)
 
     @field_validator('info_file')
     @classmethod
     def validate_info_file(cls, v: Union[HttpUrl, str]) -> Union[HttpUrl, str]:
         """Validate info_file ends with .json."""
-        if not str(v).endswith('.json'):
-            raise ValueError('info_file must end with .json')
-        return v
+        return check_info_file(v)
 
     @field_validator('tags')
     @classmethod
     def validate_tags(cls, v: list[str]) -> list[str]:
         """Validate tags are lowercase alphanumeric + hyphens only."""
-        validated = []
-        for tag in v:
-            tag_lower = tag.lower()
-            # Check alphanumeric + hyphens only
-            if not tag_lower.replace('-', '').isalnum():
-                raise ValueError(
-                    f'Tag "{tag}" must be alphanumeric + hyphens only'
-                )
-            validated.append(tag_lower)
-        return validated
+        return check_tags(v)
+
+    @model_validator(mode='after')
+    def validate_git_path(self) -> 'ExampleEntry':
+        """Validate info_file is a relative path inside the repository of a git source."""
+        path = str(self.info_file)
+        if self.git is not None and (path.startswith(('http', '/')) or '..' in path.split('/')):
+            raise ValueError('info_file of a git source must be a path inside the repository')
+        return self
 
     @property
     def slug(self) -> str:
@@ -64,9 +102,22 @@ class ExampleEntry(BaseModel):
         slug = slug.strip('-')
         return slug
 
+    @property
+    def archive(self) -> Optional[tuple[str, str]]:
+        """(archive, member) if info_file names a member of an archive as <archive>#<member>."""
+        archive, sep, member = str(self.info_file).partition('#')
+        if sep and member and archive.lower().endswith(ARCHIVE_SUFFIXES):
+            return archive, member
+        return None
+
     @property
     def is_local(self) -> bool:
-        """Check if info_file is a local path."""
+        """Check if info_file is a local path used in place.
+
+        URLs, paths in a git source and members of archives are not.
+        """
+        if self.git is not None or self.archive is not None:
+            return False
         return not str(self.info_file).startswith('http')
 
 
@@ -79,16 +130,7 @@ class ExampleRegistry(BaseModel):
     @classmethod
     def validate_examples(cls, v: list[ExampleEntry]) -> list[ExampleEntry]:
         """Validate at least one example and no duplicate titles."""
-        if not v:
-            raise ValueError('At least one example required')
-
-        # Check for duplicate titles (case-insensitive)
-        titles_lower = [e.title.lower() for e in v]
-        if len(titles_lower) != len(set(titles_lower)):
-            duplicates = [t for t in titles_lower if titles_lower.count(t) > 1]
-            unique_dupes = list(set(duplicates))
-            raise ValueError(f'Duplicate titles found: {unique_dupes}')
-
+        check_titles([e.title for e in v])
         return v
 
     @classmethod
@@ -98,6 +140,11 @@ class ExampleRegistry(BaseModel):
             data = yaml.safe_load(f)
         return cls(**data)
 
+    @classmethod
+    def from_yaml_text(cls, text: str) -> 'ExampleRegistry':
+        """Load and validate registry from YAML content (e.g. from git show)."""
+        return cls(**yaml.safe_load(text))
+
     def get_all_tags(self) -> set[str]:
         """Extract unique tags across all examples."""
         tags = set()
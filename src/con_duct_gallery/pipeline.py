@@ -0,0 +1,839 @@
+"""Stage pipeline for gallery builds: fetch → parse → plot → render.
+
+Each stage declares its inputs (as content hashes) and outputs (as paths).
+A stage only runs when the build manifest shows that its inputs changed or
+its outputs are missing or were modified since it last ran.
+"""
+
+import json
+import logging
+import queue
+import threading
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+from .archives import ArchiveDownloads, fetch_archive_logs
+from .atomic import atomic_output, atomic_write
+from .cache import DEFAULT_CACHE_SIZE, ContentCache
+from .fetcher import (
+    HOST_FAILURES,
+    LOG_KINDS,
+    PREVIEW_LINES,
+    FetchGuard,
+    cached_log_paths,
+    fetch_log_files,
+    is_mutable_url,
+    log_previews,
+    revalidate,
+    tail_links,
+)
+from .generator import (
+    assemble_gallery,
+    generate_example_section,
+    generate_leaderboards,
+    generate_tag_index,
+    slugify,
+)
+from .gitsource import GitError, GitSources, fetch_git_logs
+from .images import image_output, prune_objects
+from .manifest import BuildManifest, StageRecord, hash_data
+from .models import ExampleEntry, ExampleRegistry
+from .plotter import DEFAULT_RENDERER, generate_plot
+from .profiling import BuildProfile
+from .quantiles import usage_distribution
+from .records import loads, read_info
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MANIFEST = Path('.con-duct-gallery') / 'manifest.json'
+
+UP_TO_DATE = 'up to date'
+
+
+class Stage(NamedTuple):
+    """A unit of build work with declared inputs and outputs.
+
+    The action receives the reason the stage is running and returns a small
+    JSON-serializable result that is persisted in the manifest.
+    """
+    name: str
+    key: str
+    inputs: dict[str, Optional[str]]
+    outputs: list[Path]
+    action: Callable[[str], Optional[dict]]
+
+    @property
+    def id(self) -> str:
+        """Manifest key for this stage."""
+        return f"{self.name}:{self.key}"
+
+
+class StageOutcome(NamedTuple):
+    """Result of asking the runner to bring a stage up to date."""
+    name: str
+    key: str
+    ran: bool
+    reason: str
+    result: dict
+
+
+class PipelineRunner:
+    """Make-style executor that runs stages only when they are out of date."""
+
+    def __init__(
+        self,
+        manifest: BuildManifest,
+        force: bool = False,
+        profile: Optional[BuildProfile] = None
+    ):
+        self.manifest = manifest
+        self.force = force
+        self.profile = profile
+        self.outcomes: list[StageOutcome] = []
+
+    def outdated_reason(self, stage: Stage) -> Optional[str]:
+        """Explain why a stage must run, or return None if it is up to date."""
+        if self.force:
+            return 'forced'
+
+        record = self.manifest.get(stage.id)
+        if record is None:
+            return 'never built'
+
+        changed = sorted(
+            name for name in set(stage.inputs) | set(record.inputs)
+            if stage.inputs.get(name) != record.inputs.get(name)
+        )
+        if changed:
+            return f"inputs changed: {', '.join(changed)}"
+
+        for path in stage.outputs:
+            digest = self.manifest.hash_file(path)
+            if digest is None:
+                return f"output missing: {path}"
+            if digest != record.outputs.get(str(path)):
+                return f"output modified: {path}"
+
+        return None
+
+    def run(self, stage: Stage) -> StageOutcome:
+        """Run a stage if it is out of date and record the outcome.
+
+        Raises:
+            Any exception raised by the stage action; nothing is recorded
+            in the manifest for a failed stage.
+        """
+        if self.profile is None:
+            return self._run(stage)
+
+        with self.profile.time_stage(stage.name, stage.key) as status:
+            outcome = self._run(stage)
+            status['ran'] = outcome.ran
+        return outcome
+
+    def _run(self, stage: Stage) -> StageOutcome:
+        reason = self.outdated_reason(stage)
+        if reason is None:
+            logger.debug(f"{stage.id}: {UP_TO_DATE}")
+            outcome = StageOutcome(
+                stage.name, stage.key, False, UP_TO_DATE,
+                self.manifest.get(stage.id).result
+            )
+        else:
+            logger.info(f"{stage.id}: running ({reason})")
+            result = stage.action(reason) or {}
+            outputs = {str(p): self.manifest.hash_file(p) for p in stage.outputs}
+            self.manifest.record(stage.id, StageRecord(dict(stage.inputs), outputs, result))
+            outcome = StageOutcome(stage.name, stage.key, True, reason, result)
+
+        self.outcomes.append(outcome)
+        return outcome
+
+
+class BuildOptions(NamedTuple):
+    """Locations and switches for a gallery build."""
+    output: Path = Path('README.md')
+    log_dir: Path = Path('logs')
+    image_dir: Path = Path('images')
+    manifest: Optional[Path] = DEFAULT_MANIFEST
+    force: bool = False
+    repo_root: Optional[Path] = None
+    revalidate: bool = False
+    preview_lines: int = PREVIEW_LINES
+    renderer: str = DEFAULT_RENDERER
+    deadline: Optional[float] = None
+    host_failures: int = HOST_FAILURES
+    cache_dir: Optional[Path] = None
+    cache_size: int = DEFAULT_CACHE_SIZE
+
+
+class ExampleResult(NamedTuple):
+    """Outcome of fetching, parsing and plotting a single example."""
+    example: ExampleEntry
+    log_paths: Optional[dict[str, Path]]
+    summary: dict
+    svg_path: Optional[Path]
+    fetch_error: Optional[str] = None
+    plot_error: Optional[str] = None
+    section: Optional[str] = None
+    previews: Optional[dict[str, str]] = None
+    processes: Optional[list[dict]] = None
+    distribution: Optional[dict] = None
+
+
+def _log_paths_result(fetched) -> dict:
+    """Convert a FetchedLog into a JSON-serializable manifest result."""
+    result = {
+        'info': str(fetched.info_json),
+        'usage': str(fetched.usage_json),
+        'stdout': str(fetched.stdout),
+        'stderr': str(fetched.stderr),
+    }
+    if fetched.validators:
+        result['upstream'] = fetched.validators
+    return result
+
+
+def upstream_input(
+    example: ExampleEntry,
+    manifest: BuildManifest,
+    check: bool = True,
+    guard: Optional[FetchGuard] = None
+) -> Optional[str]:
+    """Fetch stage input that changes whenever a remote example's upstream files do.
+
+    With check, the files recorded by the last fetch are revalidated with
+    conditional HEAD requests (through guard, if given); otherwise the
+    recorded value is kept. Unreachable upstreams are logged and treated
+    as unchanged.
+    """
+    record = manifest.get(f"fetch:{example.slug}")
+    if record is None:
+        return None
+    previous = record.inputs.get('upstream')
+    if not check:
+        return previous
+
+    validators = record.result.get('upstream')
+    if not validators:
+        # Fetched before validators were recorded; pinned URLs cannot change
+        if not is_mutable_url(str(example.info_file)):
+            return previous
+        changed = ['info']
+    else:
+        try:
+            changed = revalidate(validators, session=guard)
+        except Exception as e:
+            logger.warning(f"Could not revalidate '{example.title}': {e}")
+            return previous
+    if not changed:
+        return previous
+    logger.info(f"Upstream changed for '{example.title}': {', '.join(changed)}")
+    return hash_data([previous, changed])
+
+
+def _restore_logs(cache: ContentCache, key: str, paths) -> bool:
+    """Copy an example's logs from the cache if all of them are there."""
+    if any(cache.get('logs', key, f'.{kind}') is None for kind in LOG_KINDS):
+        return False
+    with ExitStack() as stack:
+        for kind, path in zip(LOG_KINDS, paths.paths):
+            cache.restore('logs', key, stack.enter_context(atomic_output(path)), f'.{kind}')
+    return True
+
+
+def fetch_stage(
+    example: ExampleEntry,
+    options: BuildOptions,
+    manifest: BuildManifest,
+    profile: Optional[BuildProfile] = None,
+    guard: Optional[FetchGuard] = None,
+    cache: Optional[ContentCache] = None,
+    git: Optional[GitSources] = None,
+    archives: Optional[ArchiveDownloads] = None
+) -> Stage:
+    """Build the stage that fetches (or locates) an example's log files.
+
+    When a refetch fails (e.g. its host is down or the run deadline has
+    passed), the previously fetched logs are kept if they are intact.
+    Logs behind URLs pinned to a commit cannot change, so they are
+    restored from the cache, if given, instead of downloaded. Examples with
+    a git source are read through git (the clones of git, or temporary
+    ones); being pinned to a commit, they are cached the same way. Logs
+    in an archive are copied out of it; a remote archive is downloaded
+    once for all the examples in it (through archives, if given).
+    """
+    repo_root = options.repo_root or Path.cwd()
+    if example.git is not None:
+        source = [example.git.url, example.git.commit, str(example.info_file)]
+        inputs = {'source': hash_data(source)}
+    else:
+        inputs = {'source': hash_data(str(example.info_file))}
+
+    if example.is_local:
+        # Local logs are used in place; track the info file they hang off
+        inputs['info'] = manifest.hash_file(repo_root / example.info_file)
+        outputs = []
+    elif example.archive is not None and not example.archive[0].startswith('http'):
+        inputs['archive'] = manifest.hash_file(repo_root / example.archive[0])
+        outputs = cached_log_paths(example, options.log_dir).paths
+    else:
+        outputs = cached_log_paths(example, options.log_dir).paths
+        # A git source is pinned to a commit, so there is no upstream to revalidate
+        if example.git is None:
+            inputs['upstream'] = upstream_input(example, manifest, options.revalidate, guard)
+
+    cacheable = cache is not None and not example.is_local and (
+        example.git is not None or not is_mutable_url(str(example.info_file))
+    )
+    key = inputs['source']
+
+    def action(reason: str) -> dict:
+        if cacheable and reason != 'forced':
+            paths = cached_log_paths(example, options.log_dir)
+            if _restore_logs(cache, key, paths):
+                logger.info(f"Using logs from the cache for '{example.title}'")
+                return _log_paths_result(paths)
+
+        # Files left by a manifest-less run are trusted, anything else is refetched
+        force = reason != 'never built'
+        try:
+            if example.git is not None:
+                fetched = fetch_git_logs(example, options.log_dir, git or GitSources(), force)
+            elif example.archive is not None:
+                fetched = fetch_archive_logs(
+                    example, options.log_dir, repo_root, archives, session=guard, force=force
+                )
+            else:
+                fetched = fetch_log_files(example, options.log_dir, force, repo_root, session=guard)
+        except Exception as e:
+            cached = cached_log_paths(example, options.log_dir)
+            record = manifest.get(f"fetch:{example.slug}")
+            stale_ok = reason in ('inputs changed: upstream', 'forced') and record is not None
+            if not stale_ok or not all(
+                manifest.hash_file(p) == record.outputs.get(str(p)) for p in cached.paths
+            ):
+                raise
+            # Keep serving the previous copy; the upstream input retries next time
+            logger.warning(f"⚠️ Could not refetch '{example.title}', serving stale cached logs: {e}")
+            return record.result
+        if profile is not None:
+            profile.add_download(fetched.bytes_downloaded)
+        if cacheable and (fetched.bytes_downloaded or cache.get('logs', key, '.info') is None):
+            for kind, path in zip(LOG_KINDS, fetched.paths):
+                cache.put('logs', key, path, f'.{kind}')
+        return _log_paths_result(fetched)
+
+    return Stage('fetch', example.slug, inputs, outputs, action)
+
+
+def parse_stage(example: ExampleEntry, info_path: Path, manifest: BuildManifest) -> Stage:
+    """Build the stage that extracts run metadata from an example's info JSON."""
+    def action(reason: str) -> dict:
+        info = read_info(info_path)
+        return {
+            'execution_summary': info.execution_summary._asdict() if info.execution_summary else {},
+            'system': info.system._asdict() if info.system else {},
+        }
+
+    inputs = {'info': manifest.hash_file(info_path)}
+    return Stage('parse', example.slug, inputs, [], action)
+
+
+def plot_stage(
+    example: ExampleEntry,
+    usage_path: Path,
+    svg_path: Path,
+    manifest: BuildManifest,
+    profile: Optional[BuildProfile] = None,
+    renderer: str = DEFAULT_RENDERER,
+    cache: Optional[ContentCache] = None,
+    rendered: Optional[dict[Path, bytes]] = None
+) -> Stage:
+    """Build the stage that renders an example's usage plot.
+
+    With a cache, plots are stored under the hash of the stage inputs and
+    restored from there instead of rendered again. If rendered is given,
+    the bytes of the plot are put in it when the stage runs.
+    """
+    renderer = example.renderer or renderer
+    inputs = {
+        'usage': manifest.hash_file(usage_path),
+        'plot_options': hash_data(example.plot_options),
+        # Left out for the default so existing manifests stay valid
+        'renderer': None if renderer == DEFAULT_RENDERER else renderer,
+    }
+    key = hash_data(inputs) if cache is not None and inputs['usage'] else None
+
+    def action(reason: str) -> dict:
+        rusage = None if profile is None else {}
+        with image_output(svg_path, rendered) as tmp_svg:
+            if key is not None and cache.restore('plots', key, tmp_svg, '.svg'):
+                logger.debug(f"  Plot of '{example.title}' restored from the cache")
+                return {}
+            generate_plot(
+                usage_path, tmp_svg, example.plot_options, rusage=rusage, renderer=renderer
+            )
+            if key is not None:
+                cache.put('plots', key, tmp_svg, '.svg')
+        if rusage:
+            profile.add_plot(example.slug, rusage)
+        return {}
+
+    return Stage('plot', example.slug, inputs, [svg_path], action)
+
+
+def processes_stage(
+    example: ExampleEntry,
+    usage_path: Path,
+    svg_path: Path,
+    manifest: BuildManifest,
+    cache: Optional[ContentCache] = None,
+    rendered: Optional[dict[Path, bytes]] = None
+) -> Stage:
+    """Build the stage that renders an example's per-process breakdown.
+
+    With a cache, the chart and its groups are stored and restored, and
+    rendered filled, like plots (see plot_stage).
+    """
+    options = example.processes
+    inputs = {
+        'usage': manifest.hash_file(usage_path),
+        'options': hash_data(options.model_dump()),
+    }
+    key = hash_data(inputs) if cache is not None and inputs['usage'] else None
+
+    def action(reason: str) -> dict:
+        # Imported here so builds without breakdowns do not load NumPy
+        from .processes import write_breakdown
+
+        with image_output(svg_path, rendered) as tmp_svg:
+            cached = cache.get('plots', key, '.json') if key is not None else None
+            if cached is not None and cache.restore('plots', key, tmp_svg, '.svg'):
+                return {'groups': loads(cached.read_bytes())}
+            groups = [group._asdict() for group in write_breakdown(
+                usage_path, tmp_svg, options.group, options.top,
+                title=f"{example.title}: memory by process", rank=options.rank
+            )]
+            if key is not None:
+                cache.put('plots', key, tmp_svg, '.svg')
+                cache.put('plots', key, json.dumps(groups).encode('utf-8'), '.json')
+        return {'groups': groups}
+
+    return Stage('processes', example.slug, inputs, [svg_path], action)
+
+
+def distribution_stage(example: ExampleEntry, usage_path: Path, manifest: BuildManifest) -> Stage:
+    """Build the stage that sketches the RSS and CPU distributions of a usage log."""
+    def action(reason: str) -> dict:
+        return usage_distribution(usage_path).to_dict()
+
+    inputs = {'usage': manifest.hash_file(usage_path)}
+    return Stage('distribution', example.slug, inputs, [], action)
+
+
+def entry_fingerprint(example: ExampleEntry) -> str:
+    """Hash of an example's configuration, used to tell changed entries apart.
+
+    Unset optional settings are left out, so adding one to the model does
+    not change the fingerprints of the entries that do not use it.
+    """
+    return hash_data(example.model_dump(mode='json', exclude_none=True))
+
+
+def log_links(example: ExampleEntry, info_path: Path, local: dict) -> dict:
+    """Link targets of an example's logs: local ones, or the upstream copies of tails.
+
+    Args:
+        example: Example entry
+        info_path: Its fetched info file
+        local: Link targets of the fetched files by log kind
+    """
+    try:
+        upstream = tail_links(example, info_path)
+    except (OSError, ValueError) as e:
+        logger.debug(f"  No upstream log links for '{example.title}': {e}")
+        upstream = {}
+    return {**local, **upstream}
+
+
+def section_stage(result: ExampleResult, image_dir: Path) -> Stage:
+    """Build the stage that renders an example's markdown section.
+
+    The configuration fingerprint is an input of its own, so the manifest
+    records which configuration every section was rendered from.
+    """
+    example = result.example
+    svg_exists = result.svg_path is not None and result.svg_path.exists()
+    links = log_links(example, result.log_paths['info'], result.log_paths)
+
+    def action(reason: str) -> dict:
+        return {'section': generate_example_section(
+            example,
+            svg_exists,
+            log_paths=links,
+            image_dir=str(image_dir),
+            previews=result.previews,
+            processes=result.processes,
+            distribution=result.distribution
+        )}
+
+    inputs = {
+        'config': entry_fingerprint(example),
+        'content': hash_data([
+            {kind: str(path) for kind, path in links.items()},
+            svg_exists, str(image_dir), result.previews, result.processes,
+            result.distribution,
+        ]),
+    }
+    return Stage('section', example.slug, inputs, [], action)
+
+
+def render_stage(
+    registry: ExampleRegistry,
+    sections: list[str],
+    output: Path,
+    leaderboards: str = ""
+) -> Stage:
+    """Build the stage that writes the gallery markdown."""
+    def action(reason: str) -> dict:
+        atomic_write(output, assemble_gallery(registry, sections, leaderboards=leaderboards))
+        return {}
+
+    inputs = {
+        'tag_index': hash_data(generate_tag_index(registry)),
+        'leaderboards': hash_data(leaderboards),
+        'sections': hash_data(sections),
+    }
+    return Stage('render', 'gallery', inputs, [output], action)
+
+
+class GalleryPipeline:
+    """Builds the gallery by running its stages through a PipelineRunner."""
+
+    def __init__(
+        self,
+        options: BuildOptions,
+        manifest: Optional[BuildManifest] = None,
+        profile: Optional[BuildProfile] = None,
+        git: Optional[GitSources] = None,
+        session=None,
+        rendered: Optional[dict[Path, bytes]] = None
+    ):
+        """
+        Args:
+            options: Locations and switches of the build
+            manifest: Manifest to record stages in (by default, loaded from
+                      options.manifest)
+            profile: Optional profile to record stage timings in
+            git: Clones of git sources shared with other builds (by default,
+                 kept under the cache directory)
+            session: Optional requests session to reuse connections
+            rendered: If given, filled with the bytes of every image this
+                      build renders, by path
+        """
+        self.options = options
+        self.profile = profile
+        self.rendered = rendered
+        if manifest is None:
+            if options.manifest is not None:
+                manifest = BuildManifest.load(options.manifest)
+            else:
+                manifest = BuildManifest()
+        self.manifest = manifest
+        self.runner = PipelineRunner(manifest, options.force, profile)
+        # Shared by all fetches of the build, so a dead host is only waited on a few times
+        self.guard = FetchGuard.with_budget(options.deadline, options.host_failures, session)
+        self.cache = None
+        if options.cache_dir is not None:
+            self.cache = ContentCache(options.cache_dir, options.cache_size)
+        # Clones of git sources are kept next to the cache entries, outside eviction
+        if git is None:
+            git = GitSources(options.cache_dir / 'git' if options.cache_dir is not None else None)
+        self.git = git
+        self.archives = ArchiveDownloads()
+
+    def _run_before_deadline(self, stage: Stage) -> Optional[StageOutcome]:
+        """Run a stage, unless it is out of date and the build deadline has passed.
+
+        Returns:
+            The outcome, or None if the stage was skipped (its previous
+            outputs, if any, are kept and it runs again next build)
+        """
+        if self.guard.expired:
+            reason = self.runner.outdated_reason(stage)
+            if reason is not None:
+                logger.warning(f"  ⏱ Deadline reached, not running {stage.id} ({reason})")
+                return None
+        return self.runner.run(stage)
+
+    def fetch_example(self, example: ExampleEntry) -> ExampleResult:
+        """Bring the fetch and parse stages of one example up to date."""
+        try:
+            fetched = self.runner.run(
+                fetch_stage(
+                    example, self.options, self.manifest, self.profile, self.guard, self.cache,
+                    self.git, self.archives
+                )
+            )
+        except Exception as e:
+            logger.warning(f"✗ Failed to fetch '{example.title}': {e}")
+            return ExampleResult(example, None, {}, None, fetch_error=str(e))
+
+        log_paths = {name: Path(fetched.result[name]) for name in LOG_KINDS}
+        # Tails are read on every build (cheaply, from the end of each file)
+        # so they follow local logs that change without their info file
+        previews = log_previews(
+            log_paths, fetched.result.get('upstream'), self.options.preview_lines, self.guard
+        )
+
+        try:
+            parsed = self.runner.run(parse_stage(example, log_paths['info'], self.manifest))
+            summary = parsed.result
+        except Exception as e:
+            logger.warning(f"  ✗ Could not parse info for '{example.title}': {e}")
+            summary = {}
+
+        return ExampleResult(example, log_paths, summary, None, previews=previews)
+
+    def plot_example(self, fetched: ExampleResult) -> ExampleResult:
+        """Bring the plot stage of a fetched example up to date and render its section."""
+        if fetched.log_paths is None:
+            return fetched
+
+        example = fetched.example
+        svg_path = self.options.image_dir / f"{slugify(example.title)}.svg"
+        result = fetched._replace(svg_path=svg_path)
+        try:
+            plotted = self._run_before_deadline(
+                plot_stage(
+                    example, fetched.log_paths['usage'], svg_path, self.manifest,
+                    self.profile, self.options.renderer, self.cache, self.rendered
+                )
+            )
+            if plotted is not None and plotted.ran:
+                logger.info(f"  ✓ Plot saved: {svg_path}")
+        except Exception as e:
+            logger.warning(f"  ✗ Plot generation failed for '{example.title}': {e}")
+            result = result._replace(plot_error=str(e))
+
+        stage = distribution_stage(example, fetched.log_paths['usage'], self.manifest)
+        try:
+            sketched = self._run_before_deadline(stage)
+            record = sketched or self.manifest.get(stage.id)
+            if record is not None:
+                result = result._replace(distribution=record.result)
+        except Exception as e:
+            logger.warning(f"  ✗ Resource distribution failed for '{example.title}': {e}")
+
+        if example.processes is not None:
+            processes_svg = self.options.image_dir / f"{slugify(example.title)}-processes.svg"
+            stage = processes_stage(
+                example, fetched.log_paths['usage'], processes_svg, self.manifest, self.cache,
+                self.rendered
+            )
+            try:
+                broken_down = self._run_before_deadline(stage)
+                # Past the deadline, show the previous breakdown if there is one
+                record = broken_down or self.manifest.get(stage.id)
+                if record is not None:
+                    result = result._replace(processes=record.result['groups'])
+            except Exception as e:
+                logger.warning(f"  ✗ Process breakdown failed for '{example.title}': {e}")
+
+        rendered = self.runner.run(section_stage(result, self.options.image_dir))
+        return result._replace(section=rendered.result['section'])
+
+    def cached_example(self, example: ExampleEntry) -> Optional[ExampleResult]:
+        """Result of an example as recorded by a previous build, without running stages.
+
+        Returns:
+            None unless the example's logs and section are recorded and
+            the section was rendered from its current configuration
+        """
+        fetched = self.manifest.get(f'fetch:{example.slug}')
+        section = self.manifest.get(f'section:{example.slug}')
+        if fetched is None or section is None:
+            return None
+        if section.inputs.get('config') != entry_fingerprint(example):
+            return None
+
+        parsed = self.manifest.get(f'parse:{example.slug}')
+        processes = self.manifest.get(f'processes:{example.slug}')
+        distribution = self.manifest.get(f'distribution:{example.slug}')
+        return ExampleResult(
+            example,
+            {name: Path(fetched.result[name]) for name in LOG_KINDS},
+            parsed.result if parsed is not None else {},
+            self.options.image_dir / f"{slugify(example.title)}.svg",
+            section=section.result['section'],
+            processes=processes.result['groups'] if processes is not None else None,
+            distribution=distribution.result if distribution is not None else None
+        )
+
+    def build_example(self, example: ExampleEntry) -> ExampleResult:
+        """Bring all per-example stages of one example up to date."""
+        try:
+            return self.plot_example(self.fetch_example(example))
+        finally:
+            self.manifest.sync()
+
+    def build_examples(self, examples: list[ExampleEntry], jobs: int = 1) -> list[ExampleResult]:
+        """Build all examples, streaming them through worker threads if jobs > 1.
+
+        Returns:
+            Example results in the same order as examples
+        """
+        self.prefetch_git(examples)
+        if jobs <= 1:
+            return [self.build_example(example) for example in examples]
+        return self._build_streaming(examples, jobs)
+
+    def prefetch_git(self, examples: list[ExampleEntry]) -> None:
+        """Fetch the logs of the git examples to be fetched, a few requests per repository.
+
+        Examples whose fetch stage is up to date, or whose logs are in the
+        cache, are left out. Failures are only logged; they surface again
+        when the examples are fetched one by one.
+        """
+        todo = []
+        for example in examples:
+            if example.git is None:
+                continue
+            stage = fetch_stage(example, self.options, self.manifest, git=self.git)
+            if self.runner.outdated_reason(stage) is None:
+                continue
+            if self.cache is not None and self.cache.get('logs', stage.inputs['source'], '.info'):
+                continue
+            todo.append(example)
+        if not todo:
+            return
+        try:
+            self.git.prefetch(todo)
+        except (GitError, OSError) as e:
+            logger.warning(f"Could not prefetch git sources: {e}")
+
+    def _build_streaming(self, examples: list[ExampleEntry], jobs: int) -> list[ExampleResult]:
+        """Overlap fetching and plotting through a bounded producer/consumer queue.
+
+        Fetch workers (I/O bound) hand each example to plot workers (which
+        wait on con-duct subprocesses) as soon as its logs are available.
+        The bounded queue keeps fetchers from running far ahead of plotting.
+        """
+        todo: queue.Queue = queue.Queue()
+        fetched_queue: queue.Queue = queue.Queue(maxsize=2 * jobs)
+        results: list[Optional[ExampleResult]] = [None] * len(examples)
+
+        for index, example in enumerate(examples):
+            todo.put((index, example))
+
+        def fetch_worker():
+            while True:
+                try:
+                    index, example = todo.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    fetched = self.fetch_example(example)
+                except Exception as e:
+                    fetched = ExampleResult(example, None, {}, None, fetch_error=str(e))
+                fetched_queue.put((index, fetched))
+
+        def plot_worker():
+            while True:
+                item = fetched_queue.get()
+                if item is None:
+                    return
+                index, fetched = item
+                try:
+                    results[index] = self.plot_example(fetched)
+                except Exception as e:
+                    results[index] = fetched._replace(plot_error=str(e))
+                finally:
+                    self.manifest.sync()
+
+        fetchers = [threading.Thread(target=fetch_worker, name=f'fetch-{i}') for i in range(jobs)]
+        plotters = [threading.Thread(target=plot_worker, name=f'plot-{i}') for i in range(jobs)]
+        for thread in fetchers + plotters:
+            thread.start()
+
+        for thread in fetchers:
+            thread.join()
+        for _ in plotters:
+            fetched_queue.put(None)
+        for thread in plotters:
+            thread.join()
+
+        return results
+
+    def build_changed(
+        self,
+        examples: list[ExampleEntry],
+        changed: set[str],
+        jobs: int = 1
+    ) -> list[ExampleResult]:
+        """Build only the examples whose slug is in changed.
+
+        The others are taken from the manifest as recorded by the last
+        build (see cached_example), and built only if they are not there.
+
+        Returns:
+            Example results in the same order as examples
+        """
+        results = {}
+        todo = []
+        for example in examples:
+            cached = None if example.slug in changed else self.cached_example(example)
+            if cached is None:
+                todo.append(example)
+            else:
+                results[example.slug] = cached
+        logger.info(f"Building {len(todo)} of {len(examples)} examples")
+        for example, result in zip(todo, self.build_examples(todo, jobs)):
+            results[example.slug] = result
+        return [results[example.slug] for example in examples]
+
+    def render(self, registry: ExampleRegistry, results: list[ExampleResult]) -> StageOutcome:
+        """Bring the gallery markdown up to date with the example results.
+
+        Examples whose logs could not be fetched are left out of the gallery.
+        Leaderboards are ranked from the parsed info files alone.
+        """
+        shown = [r for r in results if r.section is not None]
+        leaderboards = generate_leaderboards([(r.example, r.summary) for r in shown])
+        sections = [r.section for r in shown]
+        return self.runner.run(
+            render_stage(registry, sections, self.options.output, leaderboards)
+        )
+
+    def prune_images(self, examples: list[ExampleEntry]) -> list[Path]:
+        """Remove images that no plot or breakdown of examples links to any more.
+
+        Plots of examples no longer configured (or renamed) go too.
+
+        Returns:
+            Removed image paths
+        """
+        aliases = set()
+        for example in examples:
+            slug = slugify(example.title)
+            aliases.add(f"{slug}.svg")
+            if example.processes is not None:
+                aliases.add(f"{slug}-processes.svg")
+        removed = prune_objects(self.options.image_dir, aliases)
+        for path in removed:
+            logger.debug(f"  Removed unused image {path}")
+        return removed
+
+    def save(self) -> None:
+        """Persist the build manifest."""
+        self.manifest.save()
+
+    def report(self) -> None:
+        """Log a summary of which stages ran and why."""
+        ran = [o for o in self.runner.outcomes if o.ran]
+        skipped = len(self.runner.outcomes) - len(ran)
+        logger.info(f"✓ {len(ran)} stages ran, {skipped} up to date")
+        for outcome in ran:
+            logger.debug(f"  {outcome.name}:{outcome.key} ({outcome.reason})")
@@ -1,11 +1,25 @@
 """Module for generating SVG plots from con/duct logs."""
 
 import logging
+import os
 import subprocess
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator, Optional
+
+from .atomic import atomic_output
+from .usage import write_window
 
 logger = logging.getLogger(__name__)
 
+# 'con-duct' runs `con-duct plot` (matplotlib); 'native' writes SVG directly
+RENDERERS = ('con-duct', 'native')
+DEFAULT_RENDERER = 'con-duct'
+
+# Salt of the ids matplotlib gives SVG elements, random unless set
+SVG_HASHSALT = 'con-duct-gallery'
+
 
 def should_regenerate_plot(
     svg_path: Path,
@@ -39,17 +53,103 @@ def should_regenerate_plot(
     return False
 
 
+@contextmanager
+def reproducible_env() -> Iterator[dict]:
+    """Yield an environment under which con-duct renders identical SVGs.
+
+    matplotlib stamps each SVG with the current date and gives its
+    elements random ids, so every render of the same log differed and
+    was stored as a new image. SOURCE_DATE_EPOCH fixes the date (unless
+    already set) and a matplotlibrc with a fixed svg.hashsalt the ids.
+    The rc file replaces any other matplotlibrc for the con-duct process.
+    """
+    with tempfile.TemporaryDirectory(prefix='con-duct-gallery-mpl-') as rc_dir:
+        rc_file = Path(rc_dir) / 'matplotlibrc'
+        rc_file.write_text(f"svg.hashsalt: {SVG_HASHSALT}\n")
+        env = dict(os.environ, MATPLOTLIBRC=str(rc_file))
+        env.setdefault('SOURCE_DATE_EPOCH', '0')
+        yield env
+
+
+def run_measured(cmd: list[str], env: Optional[dict] = None) -> dict:
+    """Run a command and report the resources used by that child alone.
+
+    Unlike resource.getrusage(RUSAGE_CHILDREN), which accumulates over every
+    child the process ever waited for, the rusage returned by os.wait4 covers
+    just this child, so measurements stay exact with concurrent plot workers.
+
+    Args:
+        cmd: Command to run
+        env: Environment of the command (defaults to ours)
+
+    Returns:
+        Dictionary with 'cpu_user', 'cpu_system' (seconds) and 'max_rss' (bytes)
+
+    Raises:
+        FileNotFoundError: If the command is not found
+        subprocess.CalledProcessError: If the command exits non-zero
+    """
+    with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(cmd, stdout=stdout, stderr=stderr, env=env)
+        _, status, rusage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+
+        if proc.returncode != 0:
+            stderr.seek(0)
+            raise subprocess.CalledProcessError(
+                proc.returncode, cmd,
+                stderr=stderr.read().decode(errors='replace')
+            )
+
+    return {
+        'cpu_user': rusage.ru_utime,
+        'cpu_system': rusage.ru_stime,
+        # ru_maxrss is reported in kilobytes on Linux
+        'max_rss': rusage.ru_maxrss * 1024,
+    }
+
+
+def split_window_option(plot_options: list[str]) -> tuple[Optional[str], list[str]]:
+    """Separate the gallery's own --window option from options for con-duct plot.
+
+    Returns:
+        (window, remaining options); window is None if not given
+    """
+    window = None
+    remaining = []
+    options = iter(plot_options)
+    for option in options:
+        if option == '--window':
+            window = next(options, None)
+            if window is None:
+                raise ValueError("--window requires a value such as 02:00-03:00")
+        elif option.startswith('--window='):
+            window = option.split('=', 1)[1]
+        else:
+            remaining.append(option)
+    return window, remaining
+
+
 def generate_plot(
     usage_json: Path,
     output_svg: Path,
-    plot_options: list[str] = None
+    plot_options: list[str] = None,
+    rusage: Optional[dict] = None,
+    renderer: str = DEFAULT_RENDERER
 ) -> Path:
-    """Generate SVG plot using con-duct plot command.
+    """Generate SVG plot using con-duct plot command or the native renderer.
 
     Args:
         usage_json: Path to usage JSON file
         output_svg: Path for output SVG file
-        plot_options: Additional options to pass to con-duct plot
+        plot_options: Additional options to pass to con-duct plot. A
+                      `--window START-END` option (HH:MM[:SS] or 2h-3h style
+                      from the run start, see usage.parse_window) plots only
+                      the reports in that time window.
+        rusage: If given, filled with the CPU time and max RSS of the
+                con-duct process (see run_measured)
+        renderer: 'con-duct' or 'native' (see svgplot; ignores other
+                  con-duct plot options and leaves rusage empty)
 
     Returns:
         Path to generated SVG file
@@ -57,27 +157,56 @@ def generate_plot(
     Raises:
         FileNotFoundError: If con-duct command not found
         subprocess.CalledProcessError: If plot generation fails
+        ValueError: If the --window option is invalid or selects no reports
     """
-    if plot_options is None:
-        plot_options = []
+    window, plot_options = split_window_option(plot_options or [])
 
     # Ensure output directory exists
     output_svg.parent.mkdir(parents=True, exist_ok=True)
 
-    # Build command
-    cmd = ['con-duct', 'plot', '--output', str(output_svg)]
-    cmd.extend(plot_options)
-    cmd.append(str(usage_json))
-
-    logger.debug(f"Running: {' '.join(cmd)}")
+    if window is not None:
+        # Plot a slice of the log read through its byte-offset index
+        fd, window_path = tempfile.mkstemp(
+            prefix=f'.{output_svg.stem}-', suffix='_usage.json', dir=output_svg.parent
+        )
+        os.close(fd)
+        try:
+            write_window(usage_json, window, Path(window_path))
+            return generate_plot(Path(window_path), output_svg, plot_options, rusage, renderer)
+        finally:
+            os.unlink(window_path)
+
+    if renderer == 'native':
+        from .svgplot import render_usage_svg
+
+        if plot_options:
+            logger.debug(f"Native renderer ignores plot options: {' '.join(plot_options)}")
+        render_usage_svg(usage_json, output_svg)
+        logger.debug(f"Plot generated: {output_svg}")
+        return output_svg
+    if renderer != 'con-duct':
+        raise ValueError(f"Unknown renderer '{renderer}', expected one of {', '.join(RENDERERS)}")
 
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        # con-duct writes the SVG in place; render to a temporary sibling
+        # so an interrupted plot never leaves a truncated image behind
+        with atomic_output(output_svg) as tmp_svg, reproducible_env() as env:
+            cmd = ['con-duct', 'plot', '--output', str(tmp_svg)]
+            cmd.extend(plot_options)
+            cmd.append(str(usage_json))
+
+            logger.debug(f"Running: {' '.join(cmd)}")
+
+            if rusage is not None:
+                rusage.update(run_measured(cmd, env))
+            else:
+                subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    env=env
+                )
         logger.debug(f"Plot generated: {output_svg}")
         return output_svg
     except FileNotFoundError:
@@ -0,0 +1,170 @@
+"""Diff-only gallery previews for pull requests.
+
+A preview compares the configured examples against a base, either a
+build manifest (which records the configuration every section was
+rendered from) or the configuration file at a git ref, so only added and
+changed examples need to be fetched and plotted. Besides the full README,
+a compact preview of just those examples is written for review.
+"""
+
+import html
+import logging
+import shutil
+import subprocess
+from pathlib import Path
+from typing import NamedTuple
+
+from .atomic import atomic_write
+from .generator import slugify
+from .manifest import BuildManifest
+from .models import ExampleEntry, ExampleRegistry
+from .pipeline import ExampleResult, entry_fingerprint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREVIEW_DIR = Path('preview')
+
+THUMBNAIL_WIDTH = 320
+
+
+class ExampleDiff(NamedTuple):
+    """Examples of a configuration compared to a base."""
+    added: list[ExampleEntry]
+    changed: list[ExampleEntry]
+    unchanged: list[ExampleEntry]
+    removed: list[str]
+
+    @property
+    def rebuild(self) -> set[str]:
+        """Slugs of the examples that need building."""
+        return {example.slug for example in self.added + self.changed}
+
+
+def manifest_fingerprints(manifest: BuildManifest) -> dict[str, str]:
+    """Configuration fingerprint of every example section recorded in a manifest."""
+    fingerprints = {}
+    for key, record in manifest.records.items():
+        name, _, slug = key.partition(':')
+        if name == 'section' and record.inputs.get('config'):
+            fingerprints[slug] = record.inputs['config']
+    return fingerprints
+
+
+def registry_fingerprints(registry: ExampleRegistry) -> dict[str, str]:
+    """Configuration fingerprint of every example of a registry."""
+    return {example.slug: entry_fingerprint(example) for example in registry.examples}
+
+
+def base_fingerprints(base: str, config: Path) -> dict[str, str]:
+    """Example fingerprints of a base given as a manifest, config file or git ref.
+
+    Args:
+        base: Path to a build manifest (.json) or configuration file, or
+              a git ref at which to read config
+        config: Configuration file of the current build
+
+    Raises:
+        ValueError: If the base cannot be read
+    """
+    path = Path(base)
+    if path.is_file():
+        if path.suffix == '.json':
+            manifest = BuildManifest.load(path)
+            if not manifest.records:
+                raise ValueError(f"No build records in manifest {path}")
+            return manifest_fingerprints(manifest)
+        return registry_fingerprints(ExampleRegistry.from_yaml(path))
+
+    config = Path(config)
+    try:
+        # ./ makes the path relative to -C rather than to the repository root
+        text = subprocess.run(
+            ['git', '-C', str(config.parent.resolve()), 'show', f'{base}:./{config.name}'],
+            capture_output=True, text=True, check=True
+        ).stdout
+    except FileNotFoundError:
+        raise ValueError("git is not installed") from None
+    except subprocess.CalledProcessError as e:
+        raise ValueError(f"Cannot read {config.name} at '{base}': {e.stderr.strip()}") from None
+    return registry_fingerprints(ExampleRegistry.from_yaml_text(text))
+
+
+def diff_examples(registry: ExampleRegistry, base: dict[str, str]) -> ExampleDiff:
+    """Compare the examples of a registry with base fingerprints (by slug)."""
+    diff = ExampleDiff([], [], [], [])
+    for example in registry.examples:
+        fingerprint = base.get(example.slug)
+        if fingerprint is None:
+            diff.added.append(example)
+        elif fingerprint != entry_fingerprint(example):
+            diff.changed.append(example)
+        else:
+            diff.unchanged.append(example)
+    current = {example.slug for example in registry.examples}
+    diff.removed.extend(slug for slug in base if slug not in current)
+    return diff
+
+
+def write_preview(
+    diff: ExampleDiff,
+    results: list[ExampleResult],
+    preview_dir: Path,
+    image_dir: Path
+) -> Path:
+    """Write the preview of added and changed examples.
+
+    The preview directory gets a README.md with a summary, a thumbnail
+    per example and the examples' sections, and an images/ directory with
+    copies of their images so it can be shared as a standalone artifact.
+
+    Returns:
+        Path of the preview markdown
+    """
+    preview_dir = Path(preview_dir)
+    preview_images = preview_dir / 'images'
+    shutil.rmtree(preview_images, ignore_errors=True)
+    preview_images.mkdir(parents=True)
+
+    by_slug = {result.example.slug: result for result in results}
+    shown = [by_slug[e.slug] for e in diff.added + diff.changed if e.slug in by_slug]
+    added = {example.slug for example in diff.added}
+
+    lines = ["# Gallery Preview", ""]
+    lines.append(
+        f"{len(diff.added)} added, {len(diff.changed)} changed, {len(diff.removed)} removed, "
+        f"{len(diff.unchanged)} unchanged examples."
+    )
+    lines.append("")
+    for slug in diff.removed:
+        lines.append(f"- ➖ Removed `{slug}`")
+    for result in shown:
+        status = '➕ Added' if result.example.slug in added else '✏️ Changed'
+        error = result.fetch_error or result.plot_error
+        note = f" ⚠️ {error}" if error else ""
+        lines.append(f"- {status} [{result.example.title}](#{result.example.slug}){note}")
+    lines.append("")
+
+    # Thumbnails, then the full sections with links into the copied images
+    thumbnails = []
+    for result in shown:
+        for suffix in ('', '-processes'):
+            name = f"{slugify(result.example.title)}{suffix}.svg"
+            source = Path(image_dir) / name
+            if source.exists():
+                shutil.copyfile(source, preview_images / name)
+                if not suffix:
+                    thumbnails.append(
+                        f'<a href="#{result.example.slug}"><img src="images/{name}" '
+                        f'width="{THUMBNAIL_WIDTH}" alt="{html.escape(result.example.title)}"></a>'
+                    )
+    if thumbnails:
+        lines.extend(thumbnails)
+        lines.append("")
+
+    for result in shown:
+        if result.section is not None:
+            lines.append(result.section.replace(f"]({image_dir}/", "](images/"))
+
+    path = preview_dir / 'README.md'
+    atomic_write(path, "\n".join(lines))
+    return path
@@ -0,0 +1,248 @@
+"""Per-process breakdown of usage logs.
+
+Every usage report carries a ``processes`` map keyed by PID. The log is
+read once into flat (report, process, rss, pcpu) sample arrays, i.e. a
+sparse process × time matrix in coordinate form; grouping processes by
+command, aggregating each group over time and ranking the groups are then
+array operations whose cost does not grow with the number of PIDs.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from .atomic import atomic_write
+from .records import loads
+from .usage import line_timestamp
+
+DEFAULT_TOP = 8
+
+# Keys the groups can be ranked by: peak memory or CPU time
+RANKINGS = ('rss', 'cpu')
+
+OTHER = '(other)'
+
+_INTERPRETERS = re.compile(r'^(?:python[\d.]*|perl|ruby|node|Rscript|java)$')
+_SHELLS = re.compile(r'^(?:sh|bash|dash|zsh|ksh|tcsh|csh)$')
+_SHELL_KEYWORDS = frozenset(('for', 'if', 'while', 'until', 'case', 'exec', '{', '(', '!'))
+
+
+class ProcessSamples(NamedTuple):
+    """Process samples of a usage log in coordinate (sparse matrix) form.
+
+    A process is a (PID, command) pair, so a PID reused by another command
+    counts as a separate process.
+    """
+    seconds: np.ndarray
+    pids: list[str]
+    commands: list[str]
+    report: np.ndarray
+    process: np.ndarray
+    rss: np.ndarray
+    pcpu: np.ndarray
+
+
+class ProcessGroup(NamedTuple):
+    """Aggregated usage of the processes sharing a group name."""
+    name: str
+    processes: int
+    peak_rss: float
+    cpu_seconds: float
+
+
+class ProcessBreakdown(NamedTuple):
+    """Top process groups and their memory over time.
+
+    rss has one row per entry of groups (in rank order, possibly followed
+    by the OTHER remainder) and one column per report.
+    """
+    seconds: np.ndarray
+    groups: list[ProcessGroup]
+    rss: np.ndarray
+
+
+def load_process_samples(usage_path: Path) -> ProcessSamples:
+    """Read the per-process samples of every report in a usage log.
+
+    Raises:
+        ValueError: If the log contains no reports
+    """
+    timestamps = []
+    index: dict[tuple[str, str], int] = {}
+    report, process, rss, pcpu = [], [], [], []
+    with open(usage_path, 'rb') as f:
+        for line in f:
+            timestamp = line_timestamp(line)
+            if timestamp is None:
+                continue
+            try:
+                processes = loads(line).get('processes') or {}
+            except ValueError:
+                # Report still being written
+                continue
+            row = len(timestamps)
+            timestamps.append(timestamp)
+            for pid, sample in processes.items():
+                key = (pid, sample.get('cmd') or '')
+                column = index.setdefault(key, len(index))
+                report.append(row)
+                process.append(column)
+                rss.append(sample.get('rss') or 0)
+                pcpu.append(sample.get('pcpu') or 0)
+
+    if not timestamps:
+        raise ValueError(f"No usage reports in {usage_path}")
+    return ProcessSamples(
+        seconds=np.asarray(timestamps) - timestamps[0],
+        pids=[pid for pid, _ in index],
+        commands=[cmd for _, cmd in index],
+        report=np.asarray(report, dtype=np.int64),
+        process=np.asarray(process, dtype=np.int64),
+        rss=np.asarray(rss, dtype=np.float64),
+        pcpu=np.asarray(pcpu, dtype=np.float64),
+    )
+
+
+def command_name(cmd: str) -> str:
+    """Short name of a command line, looking through interpreters and shells.
+
+    '/opt/conda/bin/python3.11 /opt/conda/bin/mriqc ...' is 'mriqc',
+    '/bin/sh -c 3dvolreg ...' is '3dvolreg', and 'python -m pytest' is
+    'pytest'.
+    """
+    tokens = cmd.split()
+    if not tokens:
+        return OTHER
+    name = os.path.basename(tokens[0])
+    shell = _SHELLS.match(name) is not None
+    if not shell and _INTERPRETERS.match(name) is None:
+        return name
+
+    args = tokens[1:]
+    for i, arg in enumerate(args):
+        if arg in ('-c', '-m', '-e'):
+            if i + 1 < len(args) and (shell or arg == '-m'):
+                target = args[i + 1]
+                return name if target in _SHELL_KEYWORDS else os.path.basename(target)
+            return name
+        if not arg.startswith('-'):
+            return os.path.basename(arg)
+    return name
+
+
+def group_processes(commands: list[str], pattern: Optional[str] = None) -> tuple[list[str], np.ndarray]:
+    """Assign every process to a named group.
+
+    Args:
+        commands: Command line of each process
+        pattern: Regular expression searched in the command line; the group
+            is its first capture group (or the whole match). Processes it
+            does not match go to OTHER. By default groups are command_name.
+
+    Returns:
+        (group names, group index of each process)
+    """
+    regex = re.compile(pattern) if pattern else None
+    names: dict[str, int] = {}
+    by_command: dict[str, int] = {}
+    codes = np.empty(len(commands), dtype=np.int64)
+    for i, cmd in enumerate(commands):
+        code = by_command.get(cmd)
+        if code is None:
+            if regex is None:
+                name = command_name(cmd)
+            else:
+                match = regex.search(cmd)
+                name = OTHER if match is None else (match.group(1) if regex.groups else match.group(0))
+            code = by_command[cmd] = names.setdefault(name or OTHER, len(names))
+        codes[i] = code
+    return list(names), codes
+
+
+def breakdown(
+    samples: ProcessSamples,
+    pattern: Optional[str] = None,
+    top: int = DEFAULT_TOP,
+    rank: str = 'rss'
+) -> ProcessBreakdown:
+    """Aggregate process samples by group and rank the groups.
+
+    CPU time integrates each sample's CPU share over the time since the
+    previous report. The groups beyond the top ones are merged into OTHER.
+
+    Args:
+        samples: Process samples (see load_process_samples)
+        pattern: Grouping regular expression (see group_processes)
+        top: Number of groups to keep
+        rank: 'rss' to rank by peak memory (then CPU time), as the memory
+            breakdown shows, or 'cpu' to rank by CPU time (then peak memory)
+
+    Returns:
+        ProcessBreakdown of at most top + 1 groups
+    """
+    names, codes = group_processes(samples.commands, pattern)
+    n_groups, n_reports = len(names), len(samples.seconds)
+    group = codes[samples.process]
+
+    # Dense group × time memory matrix from the sparse samples
+    cells = np.bincount(
+        group * n_reports + samples.report, weights=samples.rss, minlength=n_groups * n_reports
+    ).reshape(n_groups, n_reports)
+    interval = np.diff(samples.seconds, prepend=samples.seconds[0])
+    cpu = np.bincount(
+        group, weights=samples.pcpu / 100 * interval[samples.report], minlength=n_groups
+    )
+    counts = np.bincount(codes, minlength=n_groups)
+    peak = cells.max(axis=1, initial=0)
+
+    if rank not in RANKINGS:
+        raise ValueError(f"Unknown ranking '{rank}', expected one of {', '.join(RANKINGS)}")
+    # lexsort sorts by its last key first
+    keys = (-cpu, -peak) if rank == 'rss' else (-peak, -cpu)
+    ranked = [i for i in np.lexsort(keys) if names[i] != OTHER]
+    kept, rest = ranked[:top], ranked[top:]
+    if OTHER in names:
+        rest.append(names.index(OTHER))
+
+    groups = [
+        ProcessGroup(names[i], int(counts[i]), float(peak[i]), float(cpu[i]))
+        for i in kept
+    ]
+    rows = [cells[i] for i in kept]
+    if rest:
+        other = cells[rest].sum(axis=0)
+        groups.append(ProcessGroup(
+            OTHER, int(counts[rest].sum()), float(other.max(initial=0)), float(cpu[rest].sum())
+        ))
+        rows.append(other)
+    rss = np.vstack(rows) if rows else np.zeros((0, n_reports))
+    return ProcessBreakdown(samples.seconds, groups, rss)
+
+
+def write_breakdown(
+    usage_path: Path,
+    output_svg: Path,
+    pattern: Optional[str] = None,
+    top: int = DEFAULT_TOP,
+    title: str = '',
+    rank: str = 'rss'
+) -> list[ProcessGroup]:
+    """Render the process breakdown of a usage log as a stacked-area SVG.
+
+    Returns:
+        The ranked process groups
+
+    Raises:
+        ValueError: If the log contains no reports
+    """
+    from .svgplot import render_stacked_svg
+
+    result = breakdown(load_process_samples(usage_path), pattern, top, rank)
+    svg = render_stacked_svg(
+        result.seconds, [(g.name, row) for g, row in zip(result.groups, result.rss)], title
+    )
+    atomic_write(output_svg, svg)
+    return result.groups
@@ -0,0 +1,149 @@
+"""Per-stage timing and resource instrumentation for gallery builds."""
+
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from .units import format_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class StageTiming(NamedTuple):
+    """Wall time spent bringing one stage of one example up to date."""
+    stage: str
+    key: str
+    seconds: float
+    ran: bool
+
+
+class PlotUsage(NamedTuple):
+    """Resources used by a single con-duct plot child process."""
+    key: str
+    cpu_user: float
+    cpu_system: float
+    max_rss: int
+
+
+class BuildProfile:
+    """Collects structured measurements during a build.
+
+    Safe to share between pipeline worker threads.
+    """
+
+    def __init__(self):
+        self.timings: list[StageTiming] = []
+        self.plots: list[PlotUsage] = []
+        self.bytes_downloaded = 0
+        self.cache_hits: dict[str, int] = defaultdict(int)
+        self.cache_misses: dict[str, int] = defaultdict(int)
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def time_stage(self, stage: str, key: str):
+        """Time a stage; the yielded dict's 'ran' flag marks a cache miss."""
+        status = {'ran': True}
+        start = time.perf_counter()
+        try:
+            yield status
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self.timings.append(StageTiming(stage, key, seconds, status['ran']))
+                if status['ran']:
+                    self.cache_misses[stage] += 1
+                else:
+                    self.cache_hits[stage] += 1
+
+    def add_download(self, nbytes: int) -> None:
+        """Account for downloaded bytes."""
+        with self._lock:
+            self.bytes_downloaded += nbytes
+
+    def add_plot(self, key: str, rusage: dict) -> None:
+        """Record the resources used by a con-duct plot process."""
+        with self._lock:
+            self.plots.append(PlotUsage(
+                key, rusage['cpu_user'], rusage['cpu_system'], rusage['max_rss']
+            ))
+
+    def finish(self) -> None:
+        """Mark the end of the build."""
+        self._finished = time.perf_counter()
+
+    @property
+    def total_seconds(self) -> float:
+        """Wall time from creation until finish() (or now)."""
+        end = self._finished if self._finished is not None else time.perf_counter()
+        return end - self._started
+
+    def stage_totals(self) -> dict[str, float]:
+        """Total wall time per stage name."""
+        totals: dict[str, float] = defaultdict(float)
+        for timing in self.timings:
+            totals[timing.stage] += timing.seconds
+        return dict(totals)
+
+    def to_dict(self) -> dict:
+        """Return the report as JSON-serializable data."""
+        per_example: dict[str, dict[str, float]] = defaultdict(dict)
+        for timing in self.timings:
+            per_example[timing.key][timing.stage] = round(timing.seconds, 6)
+
+        return {
+            'total_seconds': round(self.total_seconds, 6),
+            'stage_seconds': {k: round(v, 6) for k, v in self.stage_totals().items()},
+            'examples': dict(per_example),
+            'timings': [t._asdict() for t in self.timings],
+            'bytes_downloaded': self.bytes_downloaded,
+            'cache': {
+                stage: {
+                    'hits': self.cache_hits.get(stage, 0),
+                    'misses': self.cache_misses.get(stage, 0),
+                }
+                for stage in sorted(set(self.cache_hits) | set(self.cache_misses))
+            },
+            'plots': [p._asdict() for p in self.plots],
+        }
+
+    def write(self, path: Path) -> None:
+        """Write the report as JSON."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+
+    def summary_lines(self, top: int = 5) -> list[str]:
+        """Human-readable summary of the report."""
+        lines = [f"Build took {self.total_seconds:.2f}s"]
+
+        totals = self.stage_totals()
+        width = max(map(len, totals), default=0)
+        for stage, seconds in sorted(totals.items(), key=lambda kv: -kv[1]):
+            hits = self.cache_hits.get(stage, 0)
+            misses = self.cache_misses.get(stage, 0)
+            lines.append(f"  {stage:<{width}} {seconds:8.2f}s  ({misses} ran, {hits} cached)")
+
+        slowest = sorted((t for t in self.timings if t.ran), key=lambda t: -t.seconds)[:top]
+        if slowest:
+            lines.append("  Slowest stages:")
+            for timing in slowest:
+                lines.append(f"    {timing.seconds:8.2f}s  {timing.stage}:{timing.key}")
+
+        if self.bytes_downloaded:
+            lines.append(f"  Downloaded {format_bytes(self.bytes_downloaded)}")
+
+        if self.plots:
+            cpu = sum(p.cpu_user + p.cpu_system for p in self.plots)
+            peak = max(self.plots, key=lambda p: p.max_rss)
+            lines.append(
+                f"  con-duct plot: {cpu:.2f}s CPU over {len(self.plots)} runs, "
+                f"max RSS {format_bytes(peak.max_rss)} ({peak.key})"
+            )
+
+        return lines
@@ -0,0 +1,193 @@
+"""Streaming quantiles of the resource usage of a run.
+
+Peak and average hide the shape of a run, so each usage log is also
+summarized by quantiles of its per-report RSS and CPU totals, and by the
+time spent near the peak. They are computed in one pass with KLL sketches
+(Karnin, Lang & Liberty, "Optimal Quantile Approximation in Streams"),
+whose memory depends on the requested accuracy but not on the length of
+the log.
+"""
+
+import random
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from .usage import iter_totals
+
+DEFAULT_K = 200
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Share of the peak above which a report counts as high usage
+HIGH_USAGE = 0.9
+
+DISTRIBUTION_METRICS = ('rss', 'pcpu')
+
+
+class KLLSketch:
+    """Approximate quantiles of a stream of numbers in bounded memory.
+
+    Values are kept in a hierarchy of compactors where an item at level h
+    stands for 2**h values. When the sketch is full, the lowest compactor
+    over its capacity is sorted and every other item (starting at a random
+    offset) is promoted to the next level. Capacities shrink geometrically
+    towards the bottom, so the sketch holds about 3k items plus two per
+    level. Rank errors are around 1.7/k of the number of values.
+
+    The offsets are drawn from a generator seeded at creation, so the same
+    stream always gives the same quantiles.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, seed: int = 0):
+        if k < 2:
+            raise ValueError(f"k must be at least 2, got {k}")
+        self.k = k
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.compactors: list[list[float]] = [[]]
+        self._random = random.Random(seed)
+        self._size = 0
+        self._max_size = self._capacity(0)
+
+    def __len__(self) -> int:
+        """Number of values seen."""
+        return self.count
+
+    @property
+    def retained(self) -> int:
+        """Number of items held, which bounds the memory used."""
+        return self._size
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return int(self.k * (2 / 3) ** depth) + 2
+
+    def update(self, value: float) -> None:
+        """Add a value to the sketch."""
+        if self.count == 0:
+            self.min = self.max = value
+        elif value < self.min:
+            self.min = value
+        elif value > self.max:
+            self.max = value
+        self.count += 1
+        self.compactors[0].append(value)
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def _compress(self) -> None:
+        for level, items in enumerate(self.compactors):
+            if len(items) < self._capacity(level):
+                continue
+            if level + 1 == len(self.compactors):
+                self.compactors.append([])
+            items.sort()
+            # An odd item out stays behind, so weights still add up to count
+            kept = [items.pop()] if len(items) % 2 else []
+            self.compactors[level + 1].extend(items[self._random.getrandbits(1)::2])
+            self._size -= len(items) - len(items) // 2
+            items[:] = kept
+            break
+        self._max_size = sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def _weighted(self) -> list[tuple[float, int]]:
+        """Retained items with their weights, in increasing order."""
+        return sorted(
+            (item, 1 << level)
+            for level, items in enumerate(self.compactors)
+            for item in items
+        )
+
+    def quantile(self, q: float) -> float:
+        """Approximate value below which a fraction q of the values lie.
+
+        Raises:
+            ValueError: If the sketch is empty or q is not in [0, 1]
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be between 0 and 1, got {q}")
+        if self.count == 0:
+            raise ValueError("Quantile of an empty sketch")
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+        target = q * self.count
+        seen = 0
+        for item, weight in self._weighted():
+            seen += weight
+            if seen >= target:
+                return item
+        return self.max
+
+    def fraction_at_least(self, value: float) -> float:
+        """Approximate fraction of the values greater than or equal to value."""
+        if self.count == 0:
+            return 0.0
+        weight = sum(w for item, w in self._weighted() if item >= value)
+        return weight / self.count
+
+
+class MetricDistribution(NamedTuple):
+    """Quantiles of one metric over a run, and the time spent near its peak."""
+    p50: float
+    p90: float
+    p99: float
+    peak: float
+    time_above: float  # seconds at or above HIGH_USAGE of the peak
+
+
+class UsageDistribution(NamedTuple):
+    """Distributions of the per-report totals of a usage log."""
+    reports: int
+    duration: float
+    rss: MetricDistribution
+    pcpu: MetricDistribution
+
+    def to_dict(self) -> dict:
+        """JSON-serializable form, as stored in build manifests."""
+        return {
+            'reports': self.reports,
+            'duration': self.duration,
+            **{metric: getattr(self, metric)._asdict() for metric in DISTRIBUTION_METRICS},
+        }
+
+
+def _distribution(sketch: KLLSketch, duration: float) -> MetricDistribution:
+    peak = sketch.max
+    # Reports come at a fixed interval, so the share of reports is the share of time
+    high = sketch.fraction_at_least(HIGH_USAGE * peak) if peak > 0 else 0.0
+    return MetricDistribution(
+        *(sketch.quantile(q) for q in QUANTILES), peak, high * duration
+    )
+
+
+def usage_distribution(usage_path: Path, k: int = DEFAULT_K) -> UsageDistribution:
+    """Summarize the RSS and CPU totals of a usage log in one streaming pass.
+
+    Args:
+        usage_path: Usage JSON Lines log
+        k: Sketch size, trading memory for accuracy
+
+    Raises:
+        ValueError: If the log contains no reports
+    """
+    sketches = {metric: KLLSketch(k) for metric in DISTRIBUTION_METRICS}
+    first = last = None
+    for timestamp, totals in iter_totals(usage_path):
+        if first is None:
+            first = timestamp
+        last = timestamp
+        for metric, sketch in sketches.items():
+            sketch.update(totals.get(metric) or 0)
+
+    if first is None:
+        raise ValueError(f"No usage reports in {usage_path}")
+    duration = last - first
+    return UsageDistribution(
+        sketches['rss'].count,
+        duration,
+        *(_distribution(sketches[metric], duration) for metric in DISTRIBUTION_METRICS)
+    )
@@ -0,0 +1,141 @@
+"""Typed records of duct's info files, and the JSON decoder used to read duct output.
+
+JSON is decoded with orjson or msgspec when one of them is installed, and
+with the standard library otherwise. Records are NamedTuples, so values
+are kept in tuples rather than per-key dicts, and fields missing from a
+file (e.g. one written by an older duct) are None. Usage logs are read
+by their own streaming parsers (usage, processes), which copy values
+straight into arrays without a record per report.
+"""
+
+import json
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+if orjson is not None:
+    JSON_BACKEND = 'orjson'
+    loads = orjson.loads
+elif msgspec is not None:
+    JSON_BACKEND = 'msgspec'
+    _decoder = msgspec.json.Decoder()
+
+    def loads(data):
+        """Decode a JSON document (str or bytes).
+
+        Raises:
+            ValueError: If data is not valid JSON
+        """
+        try:
+            return _decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from None
+else:
+    JSON_BACKEND = 'json'
+    loads = json.loads
+
+
+def _fields(cls, data) -> tuple:
+    """Values of a record's fields in a decoded JSON object (None if missing)."""
+    if not isinstance(data, dict):
+        return (None,) * len(cls._fields)
+    return tuple(map(data.get, cls._fields))
+
+
+class ExecutionSummary(NamedTuple):
+    """The execution_summary section of an info file."""
+    exit_code: Optional[int]
+    command: Optional[str]
+    wall_clock_time: Optional[float]
+    peak_rss: Optional[float]
+    average_rss: Optional[float]
+    peak_vsz: Optional[float]
+    average_vsz: Optional[float]
+    peak_pmem: Optional[float]
+    average_pmem: Optional[float]
+    peak_pcpu: Optional[float]
+    average_pcpu: Optional[float]
+    num_samples: Optional[int]
+    num_reports: Optional[int]
+    start_time: Optional[float]
+    end_time: Optional[float]
+    working_directory: Optional[str]
+    logs_prefix: Optional[str]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ExecutionSummary':
+        return cls._make(_fields(cls, data))
+
+
+class SystemInfo(NamedTuple):
+    """The system section of an info file."""
+    cpu_total: Optional[int]
+    memory_total: Optional[int]
+    hostname: Optional[str]
+    uid: Optional[int]
+    user: Optional[str]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SystemInfo':
+        return cls._make(_fields(cls, data))
+
+
+class OutputPaths(NamedTuple):
+    """The output_paths section of an info file."""
+    stdout: Optional[str]
+    stderr: Optional[str]
+    usage: Optional[str]
+    info: Optional[str]
+    prefix: Optional[str]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'OutputPaths':
+        return cls._make(_fields(cls, data))
+
+
+class DuctInfo(NamedTuple):
+    """An info file; sections missing from it are None."""
+    command: Optional[str]
+    duct_version: Optional[str]
+    schema_version: Optional[str]
+    working_directory: Optional[str]
+    execution_summary: Optional[ExecutionSummary]
+    system: Optional[SystemInfo]
+    output_paths: Optional[OutputPaths]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'DuctInfo':
+        def section(record, key):
+            value = data.get(key)
+            return record.from_dict(value) if value else None
+
+        return cls(
+            data.get('command'),
+            data.get('duct_version'),
+            data.get('schema_version'),
+            data.get('working_directory'),
+            section(ExecutionSummary, 'execution_summary'),
+            section(SystemInfo, 'system'),
+            section(OutputPaths, 'output_paths'),
+        )
+
+
+def read_info(path: Path) -> DuctInfo:
+    """Decode an info file.
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If it is not valid JSON
+    """
+    return DuctInfo.from_dict(loads(Path(path).read_bytes()))
+
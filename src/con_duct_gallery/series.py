@@ -0,0 +1,76 @@
+"""Usage logs as NumPy time series of the per-report totals."""
+
+import io
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from .manifest import hash_file
+from .usage import iter_totals
+
+SERIES_METRICS = ('rss', 'vsz', 'pcpu', 'pmem')
+
+
+class UsageSeries(NamedTuple):
+    """Per-report totals of a usage log as arrays aligned on seconds."""
+    seconds: np.ndarray
+    rss: np.ndarray
+    vsz: np.ndarray
+    pcpu: np.ndarray
+    pmem: np.ndarray
+
+
+def load_series(usage_path: Path, cache=None) -> UsageSeries:
+    """Load the totals of every report in a usage log.
+
+    Args:
+        usage_path: Usage JSON Lines log
+        cache: Optional ContentCache keeping parsed series by log content
+
+    Returns:
+        UsageSeries with seconds relative to the first report
+
+    Raises:
+        ValueError: If the log contains no reports
+    """
+    if cache is None:
+        return _read_series(usage_path)
+
+    key = hash_file(usage_path)
+    series = _cached_series(cache, key)
+    if series is None:
+        series = _read_series(usage_path)
+        data = io.BytesIO()
+        np.savez(data, **series._asdict())
+        cache.put('series', key, data.getvalue(), '.npz')
+    return series
+
+
+def _cached_series(cache, key: str) -> Optional[UsageSeries]:
+    entry = cache.get('series', key, '.npz')
+    if entry is None:
+        return None
+    try:
+        with np.load(entry) as arrays:
+            return UsageSeries(*(arrays[field] for field in UsageSeries._fields))
+    except (OSError, ValueError, KeyError):
+        # Truncated or from an incompatible version; parsed again and replaced
+        return None
+
+
+def _read_series(usage_path: Path) -> UsageSeries:
+    timestamps = []
+    columns = {metric: [] for metric in SERIES_METRICS}
+    for timestamp, totals in iter_totals(usage_path):
+        timestamps.append(timestamp)
+        for metric, values in columns.items():
+            values.append(totals.get(metric) or 0)
+
+    if not timestamps:
+        raise ValueError(f"No usage reports in {usage_path}")
+    seconds = np.asarray(timestamps, dtype=np.float64)
+    return UsageSeries(
+        seconds - seconds[0],
+        *(np.asarray(columns[metric], dtype=np.float64) for metric in SERIES_METRICS)
+    )
@@ -0,0 +1,306 @@
+"""Local preview server rendering gallery pages and plots on demand."""
+
+import hashlib
+import html
+import logging
+import re
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import NamedTuple, Optional
+from urllib.parse import quote, unquote
+
+from .fetcher import LOG_KINDS
+from .generator import generate_example_section, slugify
+from .models import ExampleRegistry
+from .pipeline import BuildOptions, ExampleResult, GalleryPipeline, log_links
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse(NamedTuple):
+    """A rendered response body with its validator."""
+    body: bytes
+    content_type: str
+    etag: str
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache bounded by total body size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old.body)
+            self._entries[key] = entry
+            self._size += len(entry.body)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def make_response(body: bytes, content_type: str) -> CachedResponse:
+    """Wrap a body with a strong ETag derived from its content."""
+    return CachedResponse(body, content_type, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+def markdown_to_html(markdown: str) -> str:
+    """Convert the small markdown subset used by example sections to HTML."""
+    def inline(text: str) -> str:
+        text = html.escape(text, quote=False)
+        text = re.sub(r'!\[([^\]]*)\]\(([^)]+)\)', r'<img alt="\1" src="\2">', text)
+        text = re.sub(r'\[([^\]]*)\]\(([^)]+)\)', r'<a href="\2">\1</a>', text)
+        text = re.sub(r'\*\*([^*]+)\*\*', r'<strong>\1</strong>', text)
+        text = re.sub(r'`([^`]+)`', r'<code>\1</code>', text)
+        return text
+
+    def cells(line: str) -> list[str]:
+        row = re.split(r'(?<!\\)\|', line.strip().strip('|'))
+        return [c.strip().replace('\\|', '|') for c in row]
+
+    out = []
+    in_list = False
+    in_table = False
+    fence = None
+    for line in markdown.splitlines():
+        if fence is not None:
+            if line == fence:
+                out.append('</code></pre>')
+                fence = None
+            else:
+                out.append(html.escape(line, quote=False))
+            continue
+        if line.startswith('```'):
+            fence = line[:len(line) - len(line.lstrip('`'))]
+            out.append('<pre><code>')
+            continue
+        if line.startswith('- '):
+            if not in_list:
+                out.append('<ul>')
+                in_list = True
+            out.append(f'<li>{inline(line[2:])}</li>')
+            continue
+        if in_list:
+            out.append('</ul>')
+            in_list = False
+        if line.startswith('|'):
+            row = cells(line)
+            if not in_table:
+                out.append('<table>')
+                out.append('<tr>' + ''.join(f'<th>{inline(c)}</th>' for c in row) + '</tr>')
+                in_table = True
+            elif not all(re.fullmatch(r':?-+:?', c) for c in row):
+                out.append('<tr>' + ''.join(f'<td>{inline(c)}</td>' for c in row) + '</tr>')
+            continue
+        if in_table:
+            out.append('</table>')
+            in_table = False
+
+        heading = re.match(r'(#{1,6}) (.*)', line)
+        if heading:
+            level = len(heading.group(1))
+            out.append(f'<h{level}>{inline(heading.group(2))}</h{level}>')
+        elif line.startswith('<') and line.endswith('>'):
+            # Raw HTML emitted by the generator (<details>, <summary>)
+            out.append(line)
+        elif line.startswith('> '):
+            out.append(f'<blockquote>{inline(line[2:])}</blockquote>')
+        elif line.strip():
+            out.append(f'<p>{inline(line)}</p>')
+    if in_list:
+        out.append('</ul>')
+    if in_table:
+        out.append('</table>')
+    return '\n'.join(out)
+
+
+def html_page(title: str, body: str) -> bytes:
+    """Wrap an HTML fragment in a minimal page."""
+    return (
+        '<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+        f'<title>{html.escape(title)}</title>'
+        '<style>body{font-family:sans-serif;max-width:60em;margin:auto}'
+        'img{max-width:100%}</style>'
+        f'</head><body>\n{body}\n</body></html>\n'
+    ).encode('utf-8')
+
+
+class GalleryServer:
+    """Renders gallery pages lazily and keeps them in an in-memory LRU.
+
+    Plots and log files come from the same on-disk caches and build manifest
+    as `generate`, so anything already built is served without rework.
+    """
+
+    def __init__(self, registry: ExampleRegistry, options: BuildOptions, cache_bytes: int):
+        self.registry = registry
+        self.pipeline = GalleryPipeline(options)
+        self.cache = LRUCache(cache_bytes)
+        self.examples = {slugify(e.title): e for e in registry.examples}
+        self._results: dict[str, ExampleResult] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, slug: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(slug, threading.Lock())
+
+    def build(self, slug: str) -> ExampleResult:
+        """Fetch and plot one example, at most once concurrently per example."""
+        with self._lock_for(slug):
+            result = self._results.get(slug)
+            if result is None:
+                result = self.pipeline.build_example(self.examples[slug])
+                self.pipeline.save()
+                if result.fetch_error is None:
+                    self._results[slug] = result
+            return result
+
+    def index(self) -> CachedResponse:
+        """Example list grouped by tag; needs no logs or plots."""
+        parts = ['<h1>con/duct Examples Gallery</h1>', '<h2>Examples</h2>', '<ul>']
+        for slug, example in self.examples.items():
+            tags = ' '.join(f'<code>{html.escape(t)}</code>' for t in example.tags)
+            parts.append(
+                f'<li><a href="/examples/{quote(slug)}">{html.escape(example.title)}</a> {tags}</li>'
+            )
+        parts.append('</ul>')
+        page = html_page('con/duct Examples Gallery', '\n'.join(parts))
+        return make_response(page, 'text/html; charset=utf-8')
+
+    def example_page(self, slug: str) -> CachedResponse:
+        """Render an example section with links served by this server."""
+        result = self.build(slug)
+        example = result.example
+        if result.log_paths is None:
+            body = (
+                f'<h3>{html.escape(example.title)}</h3>'
+                f'<p>⚠️ Logs could not be fetched: {html.escape(result.fetch_error or "")}</p>'
+            )
+        else:
+            links = log_links(
+                example, result.log_paths['info'],
+                {kind: f'/logs/{slug}/{kind}' for kind in LOG_KINDS}
+            )
+            svg_path = self.pipeline.options.image_dir / f'{slug}.svg'
+            section = generate_example_section(
+                example, svg_path.exists(), links, '/images', result.previews,
+                result.processes, distribution=result.distribution
+            )
+            body = markdown_to_html(section)
+        return make_response(html_page(example.title, body), 'text/html; charset=utf-8')
+
+    def plot(self, slug: str, name: str) -> Optional[CachedResponse]:
+        """Render (or reuse) an example's plot or process breakdown image."""
+        self.build(slug)
+        svg_path = self.pipeline.options.image_dir / name
+        if not svg_path.exists():
+            return None
+        return make_response(svg_path.read_bytes(), 'image/svg+xml')
+
+    def log_file(self, slug: str, kind: str) -> Optional[CachedResponse]:
+        """Serve one of an example's log files as text."""
+        result = self.build(slug)
+        if result.log_paths is None or kind not in result.log_paths:
+            return None
+        path = Path(result.log_paths[kind])
+        if not path.exists():
+            return None
+        content_type = 'application/json' if kind in ('info', 'usage') else 'text/plain; charset=utf-8'
+        return make_response(path.read_bytes(), content_type)
+
+    def resolve(self, path: str) -> Optional[CachedResponse]:
+        """Map a request path to a (possibly cached) response."""
+        cached = self.cache.get(path)
+        if cached is not None:
+            return cached
+
+        parts = [unquote(p) for p in path.strip('/').split('/')] if path.strip('/') else []
+        response = None
+        # Example the response was built from, if any
+        slug = None
+        if not parts:
+            response = self.index()
+        elif len(parts) == 2 and parts[0] == 'examples' and parts[1] in self.examples:
+            slug = parts[1]
+            response = self.example_page(slug)
+        elif len(parts) == 2 and parts[0] == 'images' and parts[1].endswith('.svg'):
+            stem = parts[1][:-4]
+            if stem in self.examples:
+                slug = stem
+            elif stem.endswith('-processes') and stem[:-10] in self.examples:
+                slug = stem[:-10]
+            if slug is not None:
+                response = self.plot(slug, parts[1])
+        elif (len(parts) == 3 and parts[0] == 'logs' and parts[1] in self.examples
+              and parts[2] in LOG_KINDS):
+            slug = parts[1]
+            response = self.log_file(slug, parts[2])
+
+        # Pages of a failed fetch are rebuilt on the next request, like the example
+        if response is not None and (slug is None or slug in self._results):
+            self.cache.put(path, response)
+        return response
+
+
+def make_handler(gallery: GalleryServer):
+    """Create a request handler class bound to a GalleryServer."""
+
+    class GalleryRequestHandler(BaseHTTPRequestHandler):
+        server_version = 'con-duct-gallery'
+
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            try:
+                response = gallery.resolve(path)
+            except Exception as e:
+                logger.error(f"Failed to render {path}: {e}")
+                self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+                return
+
+            if response is None:
+                self.send_error(HTTPStatus.NOT_FOUND)
+                return
+
+            if self.headers.get('If-None-Match') == response.etag:
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header('ETag', response.etag)
+                self.end_headers()
+                return
+
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', response.content_type)
+            self.send_header('Content-Length', str(len(response.body)))
+            self.send_header('ETag', response.etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.wfile.write(response.body)
+
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} {format % args}")
+
+    return GalleryRequestHandler
+
+
+def make_server(gallery: GalleryServer, host: str = '127.0.0.1', port: int = 8000) -> ThreadingHTTPServer:
+    """Create (but do not start) an HTTP server for the gallery."""
+    return ThreadingHTTPServer((host, port), make_handler(gallery))
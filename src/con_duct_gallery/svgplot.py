@@ -0,0 +1,306 @@
+"""Lightweight SVG charts of usage logs, written directly from NumPy arrays.
+
+An alternative to `con-duct plot` for simple resource-over-time charts:
+memory (RSS, VSZ) on the left axis and CPU on the right, drawn as SVG
+polylines with axes, ticks and a legend. Long series are reduced to the
+minimum and maximum per two-pixel column first, so output size depends
+on the chart width rather than the number of reports. Stacked-area charts
+(e.g. memory per process group) are drawn the same way.
+"""
+
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from .atomic import atomic_write
+from .series import UsageSeries, load_series
+from .units import byte_unit
+
+WIDTH, HEIGHT = 800, 360
+MARGIN_LEFT, MARGIN_RIGHT, MARGIN_TOP, MARGIN_BOTTOM = 70, 70, 40, 50
+
+# (field, legend label, color, axis)
+LINES = (
+    ('rss', 'RSS', '#1f77b4', 'memory'),
+    ('vsz', 'VSZ', '#2ca02c', 'memory'),
+    ('pcpu', 'CPU', '#d62728', 'cpu'),
+)
+
+# Stacked layers, bottom first
+PALETTE = (
+    '#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+    '#8c564b', '#e377c2', '#bcbd22', '#17becf', '#7f7f7f',
+)
+LEGEND_WIDTH = 170
+
+_TIME_UNITS = ((3600, 'h'), (60, 'min'), (1, 's'))
+
+
+def nice_ticks(low: float, high: float, count: int = 5, cover: bool = True) -> np.ndarray:
+    """Round tick positions (multiples of 1, 2 or 5 × 10^k) for [low, high].
+
+    With cover, the last tick is at or above high so it can serve as the
+    axis maximum; otherwise no tick exceeds high.
+    """
+    if high <= low:
+        high = low + 1
+    raw = (high - low) / count
+    magnitude = 10 ** np.floor(np.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw)
+    first = np.ceil(low / step) * step
+    last = (np.ceil if cover else np.floor)(high / step - 1e-9) * step
+    return np.arange(first, last + step / 2, step)
+
+
+def decimate(x: np.ndarray, y: np.ndarray, columns: int) -> tuple[np.ndarray, np.ndarray]:
+    """Keep the minimum and maximum of y in each of `columns` equal-width x buckets.
+
+    The kept samples stay at their own x, in their original order, so the
+    line still passes through the series' actual points. Returns the
+    series unchanged when it already has few enough points.
+    """
+    if len(x) <= 2 * columns:
+        return x, y
+    span = x[-1] - x[0] or 1.0
+    buckets = np.minimum(((x - x[0]) / span * columns).astype(np.int64), columns - 1)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    counts = np.diff(np.r_[starts, len(x)])
+    # Index of the first minimum and last maximum in each bucket
+    positions = np.arange(len(x))
+    lows = np.where(y == np.repeat(np.minimum.reduceat(y, starts), counts), positions, len(x))
+    highs = np.where(y == np.repeat(np.maximum.reduceat(y, starts), counts), positions, -1)
+    keep = np.sort(np.column_stack([
+        np.minimum.reduceat(lows, starts), np.maximum.reduceat(highs, starts)
+    ]), axis=1).ravel()
+    return x[keep], y[keep]
+
+
+def _unit(value: float, units) -> tuple[float, str]:
+    for factor, name in units:
+        if value >= factor:
+            return factor, name
+    return units[-1]
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.6g}"
+
+
+def _polyline(xs: np.ndarray, ys: np.ndarray, color: str) -> str:
+    points = ' '.join(f"{x:.1f},{y:.1f}" for x, y in zip(xs, ys))
+    return (
+        f'<polyline fill="none" stroke="{color}" stroke-width="1.5" '
+        f'stroke-linejoin="round" points="{points}"/>'
+    )
+
+
+def _svg_open(title: str) -> list[str]:
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}" '
+        f'viewBox="0 0 {WIDTH} {HEIGHT}" font-family="sans-serif" font-size="11">',
+        f'<rect width="{WIDTH}" height="{HEIGHT}" fill="white"/>',
+    ]
+    if title:
+        parts.append(
+            f'<text x="{WIDTH / 2:.0f}" y="20" text-anchor="middle" font-size="13">'
+            f'{escape(title)}</text>'
+        )
+    return parts
+
+
+def _frame(
+    left: float, right: float, top: float, bottom: float,
+    x_ticks: np.ndarray, sx, y_ticks: np.ndarray, sy,
+    x_label: str, y_label: str
+) -> list[str]:
+    """Grid, tick labels, box and axis labels of a chart's time and left axes."""
+    parts = []
+    grid = []
+    for tick in x_ticks:
+        x = sx(tick)
+        grid.append(f'M{x:.1f} {top}V{bottom}')
+        parts.append(
+            f'<text x="{x:.1f}" y="{bottom + 16}" text-anchor="middle">{_fmt(tick)}</text>'
+        )
+    for tick in y_ticks:
+        y = sy(tick)
+        grid.append(f'M{left} {y:.1f}H{right}')
+        parts.append(
+            f'<text x="{left - 6}" y="{y + 4:.1f}" text-anchor="end">{_fmt(tick)}</text>'
+        )
+    parts.append(f'<path d="{"".join(grid)}" stroke="#e5e5e5" fill="none"/>')
+    parts.append(
+        f'<path d="M{left} {top}V{bottom}H{right}V{top}" stroke="#333" fill="none"/>'
+    )
+    parts.append(
+        f'<text x="{(left + right) / 2:.0f}" y="{HEIGHT - 12}" text-anchor="middle">'
+        f'{x_label}</text>'
+    )
+    parts.append(
+        f'<text transform="translate(16 {(top + bottom) / 2:.0f}) rotate(-90)" '
+        f'text-anchor="middle">{y_label}</text>'
+    )
+    return parts
+
+
+def render_series_svg(series: UsageSeries, title: str = '') -> str:
+    """Render a usage series as an SVG document.
+
+    Args:
+        series: Usage series
+        title: Optional chart title
+
+    Returns:
+        SVG markup
+    """
+    left, right = MARGIN_LEFT, WIDTH - MARGIN_RIGHT
+    top, bottom = MARGIN_TOP, HEIGHT - MARGIN_BOTTOM
+    plot_width = right - left
+
+    seconds = series.seconds
+    duration = float(seconds[-1]) if len(seconds) else 0.0
+    time_factor, time_unit = _unit(duration, _TIME_UNITS)
+    x_max = duration / time_factor or 1.0
+    x_ticks = nice_ticks(0, x_max, cover=False)
+
+    memory_peak = float(max(series.rss.max(initial=0), series.vsz.max(initial=0)))
+    memory_factor, memory_unit = byte_unit(memory_peak)
+    memory_ticks = nice_ticks(0, memory_peak / memory_factor)
+    memory_max = float(memory_ticks[-1]) or 1.0
+
+    cpu_ticks = nice_ticks(0, float(series.pcpu.max(initial=0)) or 100.0)
+    cpu_max = float(cpu_ticks[-1]) or 1.0
+
+    def sx(values):
+        return left + values / x_max * plot_width
+
+    def sy(values, maximum):
+        return bottom - values / maximum * (bottom - top)
+
+    parts = _svg_open(title)
+    parts.extend(_frame(
+        left, right, top, bottom,
+        x_ticks, sx, memory_ticks, lambda v: sy(v, memory_max),
+        f'Elapsed time ({time_unit})', f'Memory ({memory_unit})'
+    ))
+    for tick in cpu_ticks:
+        y = sy(tick, cpu_max)
+        parts.append(f'<text x="{right + 6}" y="{y + 4:.1f}">{_fmt(tick)}</text>')
+    parts.append(
+        f'<text transform="translate({WIDTH - 14} {(top + bottom) / 2:.0f}) rotate(90)" '
+        f'text-anchor="middle">CPU (%)</text>'
+    )
+
+    # Data
+    x_values = seconds / time_factor
+    for field, _, color, axis in LINES:
+        values = getattr(series, field)
+        if axis == 'memory':
+            values, maximum = values / memory_factor, memory_max
+        else:
+            maximum = cpu_max
+        xs, ys = decimate(x_values, values, plot_width // 2)
+        parts.append(_polyline(sx(xs), sy(ys, maximum), color))
+
+    # Legend
+    for i, (_, label, color, _) in enumerate(LINES):
+        x = left + 10 + i * 70
+        parts.append(f'<path d="M{x} {top + 12}h18" stroke="{color}" stroke-width="2"/>')
+        parts.append(f'<text x="{x + 22}" y="{top + 16}">{label}</text>')
+
+    parts.append('</svg>')
+    return '\n'.join(parts) + '\n'
+
+
+def peak_columns(x: np.ndarray, total: np.ndarray, columns: int) -> np.ndarray:
+    """Indices of the reports to draw for stacked series, one per x bucket.
+
+    Each of `columns` equal-width buckets is represented by its report with
+    the largest total, so every layer is sampled at the same x positions
+    and the envelope keeps its peaks. Returns all indices when the series
+    already has few enough points.
+    """
+    if len(x) <= columns:
+        return np.arange(len(x))
+    span = x[-1] - x[0] or 1.0
+    buckets = np.minimum(((x - x[0]) / span * columns).astype(np.int64), columns - 1)
+    order = np.lexsort((-total, buckets))
+    starts = np.flatnonzero(np.r_[True, buckets[order][1:] != buckets[order][:-1]])
+    return np.sort(order[starts])
+
+
+def render_stacked_svg(
+    seconds: np.ndarray,
+    layers: list[tuple[str, np.ndarray]],
+    title: str = ''
+) -> str:
+    """Render memory series stacked on top of each other as an SVG document.
+
+    Args:
+        seconds: Report times relative to the first report
+        layers: (legend label, memory in bytes per report), bottom layer first
+        title: Optional chart title
+
+    Returns:
+        SVG markup
+    """
+    left, right = MARGIN_LEFT, WIDTH - LEGEND_WIDTH
+    top, bottom = MARGIN_TOP, HEIGHT - MARGIN_BOTTOM
+    plot_width = right - left
+
+    duration = float(seconds[-1]) if len(seconds) else 0.0
+    time_factor, time_unit = _unit(duration, _TIME_UNITS)
+    x_max = duration / time_factor or 1.0
+    x_ticks = nice_ticks(0, x_max, cover=False)
+
+    stacked = np.cumsum(np.vstack([values for _, values in layers]), axis=0) if layers else None
+    peak = float(stacked[-1].max(initial=0)) if layers else 0.0
+    memory_factor, memory_unit = byte_unit(peak)
+    memory_ticks = nice_ticks(0, peak / memory_factor)
+    memory_max = float(memory_ticks[-1]) or 1.0
+
+    def sx(values):
+        return left + values / x_max * plot_width
+
+    def sy(values):
+        return bottom - values / memory_max * (bottom - top)
+
+    parts = _svg_open(title)
+    parts.extend(_frame(
+        left, right, top, bottom, x_ticks, sx, memory_ticks, sy,
+        f'Elapsed time ({time_unit})', f'Memory ({memory_unit})'
+    ))
+
+    if layers:
+        keep = peak_columns(seconds, stacked[-1], plot_width // 4)
+        xs = sx(seconds[keep] / time_factor)
+        lower = np.full(len(keep), float(bottom))
+        for i, (label, _) in enumerate(layers):
+            upper = sy(stacked[i][keep] / memory_factor)
+            points = ' '.join(
+                f"{x:.1f},{y:.1f}"
+                for x, y in zip(np.r_[xs, xs[::-1]], np.r_[upper, lower[::-1]])
+            )
+            color = PALETTE[i % len(PALETTE)]
+            parts.append(f'<polygon fill="{color}" fill-opacity="0.85" points="{points}"/>')
+            lower = upper
+
+            y = top + 6 + i * 18
+            parts.append(
+                f'<rect x="{right + 12}" y="{y}" width="12" height="12" fill="{color}"/>'
+            )
+            parts.append(f'<text x="{right + 30}" y="{y + 10}">{escape(label[:24])}</text>')
+
+    parts.append('</svg>')
+    return '\n'.join(parts) + '\n'
+
+
+def render_usage_svg(usage_json: Path, output_svg: Path, title: str = '') -> Path:
+    """Render a usage log to an SVG file without matplotlib.
+
+    Raises:
+        ValueError: If the log contains no reports
+    """
+    atomic_write(output_svg, render_series_svg(load_series(usage_json), title))
+    return output_svg
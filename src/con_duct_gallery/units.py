@@ -0,0 +1,33 @@
+"""Human-readable formatting of byte sizes and durations."""
+
+_BYTE_UNITS = ((1 << 40, 'TiB'), (1 << 30, 'GiB'), (1 << 20, 'MiB'), (1 << 10, 'KiB'))
+
+
+def byte_unit(value: float) -> tuple[int, str]:
+    """Largest binary unit not exceeding a byte count, as (factor, name), e.g. (1 << 30, 'GiB').
+
+    Plot axes scale by the unit of their peak, so they read like format_bytes.
+    """
+    for factor, unit in _BYTE_UNITS:
+        if value >= factor:
+            return factor, unit
+    return 1, 'B'
+
+
+def format_bytes(value: float) -> str:
+    """Format a byte count with a binary unit, e.g. '1.5 GiB'."""
+    factor, unit = byte_unit(value)
+    if factor == 1:
+        return f"{value:.0f} B"
+    return f"{value / factor:.1f} {unit}"
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration with its two largest units, e.g. '2h 03m'."""
+    minutes, secs = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    if minutes:
+        return f"{minutes}m {secs:02d}s"
+    return f"{seconds:.1f}s"
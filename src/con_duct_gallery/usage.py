@@ -0,0 +1,276 @@
+"""Random access to con/duct usage logs (JSON Lines) by report time.
+
+A sidecar index (``<usage>.idx``) maps each report's timestamp to the byte
+offset of its line. It is built in one streaming pass, extended in place
+when the log grows, and lets a time window be sliced out of the log via
+mmap without decoding the lines outside it.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .atomic import atomic_output
+from .records import loads
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = '.idx'
+
+# magic, indexed size of the log in bytes, number of entries, mtime of the
+# log when indexed (ns), digest of the last indexed bytes
+_HEADER = struct.Struct('<8sQQq16s')
+_MAGIC = b'DUCTIDX2'
+
+# The end of the indexed bytes is hashed to notice a log rewritten in place
+_TAIL_BYTES = 4096
+
+# duct writes the report timestamp as the first key of every line
+_TIMESTAMP = re.compile(rb'"timestamp":\s*"([^"]+)"')
+
+# The totals object is flat, so it can be cut out without decoding the
+# (potentially large) processes map that precedes it
+_TOTALS = re.compile(rb'"totals":\s*(\{[^{}]*\})')
+
+# HH:MM[:SS], or durations with units such as 2h, 90m, 1h30m, 45.5s
+_WINDOW_CLOCK = re.compile(r'^(\d+):(\d+)(?::(\d+(?:\.\d*)?))?$')
+_WINDOW_UNITS = re.compile(r'^(?:(\d+(?:\.\d*)?)h)?(?:(\d+(?:\.\d*)?)m)?(?:(\d+(?:\.\d*)?)s)?$')
+
+
+def line_timestamp(line: bytes) -> Optional[float]:
+    """Return the POSIX timestamp of a usage report line, if it has one."""
+    match = _TIMESTAMP.search(line, 0, 256)
+    if match is None:
+        return None
+    try:
+        return datetime.fromisoformat(match.group(1).decode()).timestamp()
+    except ValueError:
+        return None
+
+
+def iter_totals(usage_path: Path) -> Iterator[tuple[float, dict]]:
+    """Stream the POSIX timestamp and totals of every report in a usage log.
+
+    Lines without a timestamp, and a partially written last report, are skipped.
+    """
+    with open(usage_path, 'rb') as f:
+        for line in f:
+            timestamp = line_timestamp(line)
+            if timestamp is None:
+                continue
+            match = _TOTALS.search(line)
+            try:
+                if match is not None:
+                    totals = loads(match.group(1))
+                else:
+                    totals = loads(line).get('totals') or {}
+            except ValueError:
+                # Report still being written
+                continue
+            yield timestamp, totals
+
+
+class UsageIndex:
+    """Report timestamps and the byte offsets of their lines in a usage log."""
+
+    def __init__(self, usage_path: Path):
+        self.usage_path = Path(usage_path)
+        self.timestamps = array('d')
+        self.offsets = array('q')
+        self.size = 0
+        self.mtime_ns = 0
+        self.tail_digest = b''
+
+    @property
+    def path(self) -> Path:
+        """Location of the sidecar index file."""
+        return self.usage_path.with_name(self.usage_path.name + INDEX_SUFFIX)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def _tail(self, f) -> bytes:
+        """Digest of the last indexed bytes of the open log."""
+        start = max(0, self.size - _TAIL_BYTES)
+        f.seek(start)
+        return hashlib.blake2b(f.read(self.size - start), digest_size=16).digest()
+
+    def _scan(self, start: int) -> None:
+        """Index complete lines from byte offset start to the end of the log."""
+        with open(self.usage_path, 'rb') as f:
+            self.mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Partially written report; index it once it is complete
+                    break
+                timestamp = line_timestamp(line)
+                if timestamp is not None:
+                    self.timestamps.append(timestamp)
+                    self.offsets.append(offset)
+                offset += len(line)
+            self.size = offset
+            self.tail_digest = self._tail(f)
+
+    def _is_prefix_of_log(self) -> bool:
+        """Check that the indexed bytes are still the beginning of the log.
+
+        A log not modified since it was indexed is trusted as is. Otherwise
+        its first report time and the end of the indexed bytes must match,
+        so only a log that was appended to keeps its offsets.
+        """
+        try:
+            st = self.usage_path.stat()
+        except FileNotFoundError:
+            return False
+        if st.st_size < self.size:
+            return False
+        if st.st_size == self.size and st.st_mtime_ns == self.mtime_ns:
+            return True
+        if self.size == 0:
+            return True
+        with open(self.usage_path, 'rb') as f:
+            first = f.readline()
+            f.seek(self.size - 1)
+            boundary = f.read(1)
+            tail = self._tail(f)
+        if self.offsets and line_timestamp(first) != self.timestamps[0]:
+            return False
+        return boundary == b'\n' and tail == self.tail_digest
+
+    @classmethod
+    def load(cls, usage_path: Path) -> Optional['UsageIndex']:
+        """Read the sidecar index of a usage log, or None if missing or invalid."""
+        index = cls(usage_path)
+        try:
+            data = index.path.read_bytes()
+            magic, size, count, mtime_ns, tail_digest = _HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        if magic != _MAGIC or len(data) != _HEADER.size + 16 * count:
+            return None
+        index.size = size
+        index.mtime_ns = mtime_ns
+        index.tail_digest = tail_digest
+        index.timestamps.frombytes(data[_HEADER.size:_HEADER.size + 8 * count])
+        index.offsets.frombytes(data[_HEADER.size + 8 * count:])
+        return index
+
+    def save(self) -> None:
+        """Write the sidecar index next to the usage log."""
+        with atomic_output(self.path) as tmp_path, open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, self.size, len(self), self.mtime_ns, self.tail_digest))
+            f.write(self.timestamps.tobytes())
+            f.write(self.offsets.tobytes())
+
+    @classmethod
+    def build(cls, usage_path: Path) -> 'UsageIndex':
+        """Index a usage log and save the sidecar, reusing a valid existing one.
+
+        A log that only grew since it was indexed is scanned from where the
+        previous scan stopped; any other change (including a rewrite of the
+        same size) triggers a full rescan.
+        """
+        index = cls.load(usage_path)
+        if index is None or not index._is_prefix_of_log():
+            index = cls(usage_path)
+        elif index.size == index.usage_path.stat().st_size:
+            return index
+
+        previous = index.size
+        index._scan(index.size)
+        logger.debug(
+            f"Indexed {index.size - previous} bytes of {usage_path} ({len(index)} reports)"
+        )
+        try:
+            index.save()
+        except OSError as e:
+            logger.warning(f"Could not save usage index {index.path}: {e}")
+        return index
+
+    def window(self, start: Optional[float], end: Optional[float]) -> tuple[int, int]:
+        """Byte range of the reports whose time from the first report is in [start, end].
+
+        Args:
+            start: Seconds after the first report (None for the beginning)
+            end: Seconds after the first report (None for the end)
+
+        Returns:
+            (begin, end) byte offsets into the log
+        """
+        if not self.offsets:
+            return (0, 0)
+        origin = self.timestamps[0]
+        lo = 0 if start is None else bisect_left(self.timestamps, origin + start)
+        hi = len(self) if end is None else bisect_right(self.timestamps, origin + end)
+        if lo >= hi:
+            return (0, 0)
+        end_offset = self.offsets[hi] if hi < len(self) else self.size
+        return (self.offsets[lo], end_offset)
+
+
+def _parse_bound(text: str) -> Optional[float]:
+    text = text.strip()
+    if not text:
+        return None
+    match = _WINDOW_CLOCK.match(text) or _WINDOW_UNITS.match(text)
+    if match is None or not any(match.groups()):
+        raise ValueError(f"Invalid time '{text}', expected HH:MM[:SS] or e.g. 2h, 90m, 1h30m")
+    hours, minutes, seconds = match.groups()
+    return float(hours or 0) * 3600 + float(minutes or 0) * 60 + float(seconds or 0)
+
+
+def parse_window(spec: str) -> tuple[Optional[float], Optional[float]]:
+    """Parse a window such as '02:00-03:00' into seconds from the run start.
+
+    Either bound may be omitted ('-0:10', '1:00-'). Times are HH:MM or
+    HH:MM:SS, so '02:00-03:00' is the third hour of the run, or durations
+    with h/m/s units ('2h-3h', '90s-150s', '1h30m-').
+
+    Raises:
+        ValueError: If the window is malformed or empty
+    """
+    begin, sep, end = spec.partition('-')
+    if not sep:
+        raise ValueError(f"Invalid window '{spec}', expected START-END")
+    start, stop = _parse_bound(begin), _parse_bound(end)
+    if start is not None and stop is not None and stop < start:
+        raise ValueError(f"Invalid window '{spec}': end is before start")
+    return (start, stop)
+
+
+def write_window(usage_path: Path, window: str, dest: Path) -> int:
+    """Copy the reports of a usage log that fall in a time window to dest.
+
+    Only the window's bytes are read from the log (via mmap); the index is
+    built or extended first if needed.
+
+    Args:
+        usage_path: Usage JSON Lines log
+        window: Window specification (see parse_window)
+        dest: File to write the selected reports to
+
+    Returns:
+        Number of bytes written
+
+    Raises:
+        ValueError: If the window is malformed or contains no reports
+    """
+    start, end = parse_window(window)
+    index = UsageIndex.build(usage_path)
+    begin, stop = index.window(start, end)
+    if begin == stop:
+        raise ValueError(f"No usage reports in window {window} of {usage_path}")
+
+    with open(usage_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        dest.write_bytes(mm[begin:stop])
+    return stop - begin
@@ -0,0 +1,88 @@
+"""Rules of the gallery configuration, in plain Python.
+
+The pydantic models apply these to each field; ``generate --dry-run``
+applies them to the parsed YAML directly, so it validates a configuration
+the same way without importing pydantic.
+"""
+
+from typing import Any
+
+
+def check_title(title: str) -> str:
+    """Validate a title is non-empty and at most 100 characters, returning it stripped."""
+    title = title.strip()
+    if not title:
+        raise ValueError('Title cannot be empty')
+    if len(title) > 100:
+        raise ValueError('Title must be ≤100 characters')
+    return title
+
+
+def check_info_file(info_file: Any) -> Any:
+    """Validate an info file (path or URL) ends with .json."""
+    if not str(info_file).endswith('.json'):
+        raise ValueError('info_file must end with .json')
+    return info_file
+
+
+def check_tags(tags: list[str]) -> list[str]:
+    """Validate tags are alphanumeric + hyphens only, returning them lowercased."""
+    validated = []
+    for tag in tags:
+        tag_lower = tag.lower()
+        # Check alphanumeric + hyphens only
+        if not tag_lower.replace('-', '').isalnum():
+            raise ValueError(
+                f'Tag "{tag}" must be alphanumeric + hyphens only'
+            )
+        validated.append(tag_lower)
+    return validated
+
+
+def check_titles(titles: list[str]) -> None:
+    """Validate there is at least one title and none repeats (case-insensitive)."""
+    if not titles:
+        raise ValueError('At least one example required')
+
+    titles_lower = [t.lower() for t in titles]
+    if len(titles_lower) != len(set(titles_lower)):
+        duplicates = [t for t in titles_lower if titles_lower.count(t) > 1]
+        unique_dupes = list(set(duplicates))
+        raise ValueError(f'Duplicate titles found: {unique_dupes}')
+
+
+def check_config(data: Any) -> list[dict]:
+    """Validate parsed YAML as a gallery configuration.
+
+    Covers the rules above for every example; values the models would
+    coerce or look up later (URLs, renderers, git sources) are not checked.
+
+    Returns:
+        The examples
+
+    Raises:
+        ValueError: With the first problem found, naming its example
+    """
+    if not isinstance(data, dict) or not isinstance(data.get('examples'), list):
+        raise ValueError("'examples' must be a list")
+
+    titles = []
+    for index, example in enumerate(data['examples']):
+        try:
+            if not isinstance(example, dict):
+                raise ValueError('must be a mapping')
+            for field in ('title', 'info_file'):
+                if field not in example:
+                    raise ValueError(f"'{field}' is required")
+            if not isinstance(example['title'], str):
+                raise ValueError('title must be a string')
+            tags = example.get('tags', [])
+            if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+                raise ValueError('tags must be a list of strings')
+            titles.append(check_title(example['title']))
+            check_info_file(example['info_file'])
+            check_tags(tags)
+        except ValueError as e:
+            raise ValueError(f"examples[{index}]: {e}") from None
+    check_titles(titles)
+    return data['examples']
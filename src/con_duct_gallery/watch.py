@@ -0,0 +1,273 @@
+"""Watch the gallery configuration and local logs and rebuild incrementally."""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Optional
+
+from .models import ExampleEntry, ExampleRegistry
+from .pipeline import BuildOptions, ExampleResult, GalleryPipeline
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Report changes to a set of files using Linux inotify.
+
+    Directories containing the files are watched rather than the files
+    themselves, so editors that save by renaming a new file into place
+    are noticed too.
+    """
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+        self._dirs: dict[int, Path] = {}
+        self._watched_dirs: dict[Path, int] = {}
+        self._files: set[Path] = set()
+
+    def watch(self, paths: set[Path]) -> None:
+        """Replace the set of watched files."""
+        self._files = {Path(p).absolute() for p in paths}
+        for directory in {p.parent for p in self._files} - set(self._watched_dirs):
+            if not directory.is_dir():
+                continue
+            wd = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(directory), _WATCH_MASK
+            )
+            if wd < 0:
+                logger.warning(f"Cannot watch {directory}: {os.strerror(ctypes.get_errno())}")
+                continue
+            self._dirs[wd] = directory
+            self._watched_dirs[directory] = wd
+
+    def wait(self, timeout: Optional[float]) -> set[Path]:
+        """Block up to timeout seconds (forever if None) for changes.
+
+        Returns:
+            Watched files that changed (empty on timeout)
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        data = os.read(self._fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped; treat everything as changed
+                return set(self._files)
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if path in self._files:
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        """Release the inotify descriptor."""
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Report changes to a set of files by periodically comparing stat results."""
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self._snapshot: dict[Path, Optional[tuple[int, int]]] = {}
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[tuple[int, int]]:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def watch(self, paths: set[Path]) -> None:
+        """Replace the set of watched files."""
+        previous = self._snapshot
+        self._snapshot = {}
+        for path in {Path(p).absolute() for p in paths}:
+            self._snapshot[path] = previous.get(path, self._signature(path))
+
+    def wait(self, timeout: Optional[float]) -> set[Path]:
+        """Block up to timeout seconds (forever if None) for changes.
+
+        Returns:
+            Watched files that changed (empty on timeout)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path, signature in self._snapshot.items():
+                current = self._signature(path)
+                if current != signature:
+                    self._snapshot[path] = current
+                    changed.add(path)
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            sleep = self.interval
+            if deadline is not None:
+                sleep = min(sleep, max(deadline - time.monotonic(), 0))
+            time.sleep(sleep)
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+def make_watcher(polling: bool = False, interval: float = 0.25):
+    """Create an inotify watcher, falling back to polling where unavailable."""
+    if not polling:
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify unavailable ({e}), polling for changes instead")
+    return PollingWatcher(interval)
+
+
+def wait_for_changes(watcher, debounce: float) -> set[Path]:
+    """Wait for changes, then keep collecting until debounce seconds pass quietly."""
+    changed = set()
+    while not changed:
+        # Unrelated files in watched directories wake us up with nothing
+        changed = watcher.wait(None)
+    while True:
+        more = watcher.wait(debounce)
+        if not more:
+            return changed
+        changed |= more
+
+
+class GalleryWatcher:
+    """Keeps the registry and build state in memory and rebuilds what changed."""
+
+    def __init__(
+        self,
+        config: Path,
+        options: BuildOptions,
+        repo_root: Optional[Path] = None,
+        jobs: int = 1
+    ):
+        self.config = config.absolute()
+        self.options = options
+        self.jobs = jobs
+        self.repo_root = repo_root or options.repo_root or Path.cwd()
+        self.pipeline = GalleryPipeline(options._replace(repo_root=self.repo_root))
+        self.registry: Optional[ExampleRegistry] = None
+        self.results: dict[str, ExampleResult] = {}
+
+    def _local_files(self, result: ExampleResult) -> set[Path]:
+        """Files a local example is built from (empty for remote examples)."""
+        if not result.example.is_local:
+            return set()
+        files = {(self.repo_root / str(result.example.info_file)).absolute()}
+        if result.log_paths:
+            files.update(Path(p).absolute() for p in result.log_paths.values())
+        return files
+
+    def watched_files(self) -> set[Path]:
+        """The config plus every local log file the current examples read."""
+        files = {self.config}
+        for result in self.results.values():
+            files |= self._local_files(result)
+        return files
+
+    def _affected_by_logs(self, changed: set[Path]) -> list[ExampleEntry]:
+        return [
+            result.example for result in self.results.values()
+            if self._local_files(result) & changed
+        ]
+
+    def _reload_registry(self) -> list[ExampleEntry]:
+        """Reload the config and return added or changed examples."""
+        registry = ExampleRegistry.from_yaml(self.config)
+        previous = {r.example.title: r.example for r in self.results.values()}
+        self.registry = registry
+
+        titles = {e.title for e in registry.examples}
+        for title in list(self.results):
+            if title not in titles:
+                logger.info(f"Example removed: '{title}'")
+                del self.results[title]
+
+        return [e for e in registry.examples if previous.get(e.title) != e]
+
+    def rebuild(self, changed: Optional[set[Path]] = None) -> list[ExampleEntry]:
+        """Rebuild the examples affected by changed files and re-render the gallery.
+
+        Args:
+            changed: Changed files (None rebuilds everything)
+
+        Returns:
+            The examples that were rebuilt
+        """
+        self.pipeline.runner.outcomes.clear()
+
+        if changed is None or self.config in changed:
+            affected = self._reload_registry()
+        else:
+            affected = []
+        if changed is not None:
+            affected += [e for e in self._affected_by_logs(changed) if e not in affected]
+
+        for result in self.pipeline.build_examples(affected, jobs=self.jobs):
+            self.results[result.example.title] = result
+
+        ordered = [self.results[e.title] for e in self.registry.examples if e.title in self.results]
+        self.pipeline.render(self.registry, ordered)
+        self.pipeline.save()
+        return affected
+
+    def run(self, watcher, debounce: float = 0.2) -> None:
+        """Build once, then rebuild on every debounced batch of changes."""
+        start = time.perf_counter()
+        self.rebuild()
+        logger.info(f"✓ Initial build took {time.perf_counter() - start:.2f}s")
+
+        while True:
+            watcher.watch(self.watched_files())
+            logger.info("Watching for changes (Ctrl+C to stop)")
+            changed = wait_for_changes(watcher, debounce)
+            logger.info(f"Changed: {', '.join(str(p) for p in sorted(changed))}")
+
+            start = time.perf_counter()
+            try:
+                rebuilt = self.rebuild(changed)
+            except Exception as e:
+                logger.error(f"Rebuild failed: {e}")
+                continue
+            ran = sum(1 for o in self.pipeline.runner.outcomes if o.ran)
+            logger.info(
+                f"✓ Rebuilt {len(rebuilt)} examples ({ran} stages ran) "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
@@ -0,0 +1,35 @@
+"""Integration tests for the synthetic benchmark log generators."""
+
+import json
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "benchmarks"))
+
+
+@pytest.mark.integration
+def test_synthetic_registry_is_valid(tmp_path):
+    """Test that synthetic logs load as a registry and resolve like real logs."""
+    from synthetic import PROFILES, write_registry
+    from con_duct_gallery.fetcher import fetch_log_files
+    from con_duct_gallery.models import ExampleRegistry
+
+    config = write_registry(tmp_path, 3, mix={"short": 1, "long": 1, "many-pids": 1})
+    registry = ExampleRegistry.from_yaml(config)
+    assert len(registry.examples) == 3
+
+    for example in registry.examples:
+        fetched = fetch_log_files(example, tmp_path / "logs", repo_root=tmp_path)
+        info = json.loads(fetched.info_json.read_text())
+        lines = fetched.usage_json.read_text().splitlines()
+        reports = [json.loads(line) for line in lines]
+        assert info["execution_summary"]["num_reports"] == len(reports)
+        assert info["execution_summary"]["num_samples"] == sum(r["num_samples"] for r in reports)
+        assert all(r["processes"] for r in reports)
+
+    long_run = next(e for e in registry.examples if "(long)" in e.title)
+    info = json.loads(fetch_log_files(long_run, tmp_path / "logs", repo_root=tmp_path).info_json.read_text())
+    assert info["execution_summary"]["num_reports"] == 446
+    assert info["execution_summary"]["num_samples"] > 25000
+    assert info["execution_summary"]["exit_code"] == 137
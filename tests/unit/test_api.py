@@ -0,0 +1,202 @@
+"""Unit tests for api module."""
+
+import io
+import json
+import tarfile
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+
+def _write_local_example(root: Path) -> Path:
+    """Write a minimal local duct log set and return its info path."""
+    logs = root / "logs" / "run"
+    logs.mkdir(parents=True)
+    info = {
+        "execution_summary": {"exit_code": 0, "peak_rss": 1024},
+        "system": {"cpu_total": 4},
+        "output_paths": {
+            "usage": ".duct/logs/run_usage.json",
+            "stdout": ".duct/logs/run_stdout",
+            "stderr": ".duct/logs/run_stderr",
+            "info": ".duct/logs/run_info.json",
+        },
+    }
+    (logs / "run_info.json").write_text(json.dumps(info))
+    (logs / "run_usage.json").write_text('{"timestamp": "2024-01-01T00:00:00"}\n')
+    (logs / "run_stdout").write_text("hello\n")
+    (logs / "run_stderr").write_text("")
+    return logs / "run_info.json"
+
+
+def _fake_plot(usage, svg, opts, **kwargs):
+    svg.write_text("<svg/>")
+
+
+def _registry():
+    from con_duct_gallery.models import ExampleEntry, ExampleRegistry
+
+    return ExampleRegistry(examples=[
+        ExampleEntry(title="Local Run", info_file="logs/run/run_info.json"),
+        ExampleEntry(title="Missing Run", info_file="logs/missing/info.json"),
+    ])
+
+
+@patch('con_duct_gallery.pipeline.generate_plot', side_effect=_fake_plot)
+def test_build_gallery_writes_all_sinks(mock_plot, tmp_path):
+    """Test one build returns structured results and feeds every sink."""
+    from con_duct_gallery.api import (
+        DirectorySink,
+        LogSources,
+        MemorySink,
+        TarballSink,
+        build_gallery,
+    )
+
+    repo = tmp_path / "repo"
+    _write_local_example(repo)
+    memory = MemorySink()
+    tarball = tmp_path / "gallery.tar.gz"
+    sinks = [memory, DirectorySink(tmp_path / "site"), TarballSink(tarball)]
+    build = build_gallery(_registry(), LogSources(repo), sinks)
+
+    local, missing = build.examples
+    assert local.plot == b"<svg/>"
+    assert local.summary["execution_summary"]["peak_rss"] == 1024
+    assert local.error is None
+    # Links point into the gallery output, not the workspace or the repository
+    assert "](images/local-run.svg)" in local.section
+    assert "](logs/run/run_info.json)" in local.section
+    assert str(tmp_path) not in build.markdown
+    assert missing.section is None and "not found" in missing.error
+    assert build.metrics["examples"] == 2
+    assert build.metrics["fetch_failures"] == 1
+
+    assert set(build.files) == {
+        "README.md", "images/local-run.svg", "logs/run/run_info.json",
+        "logs/run/run_usage.json", "logs/run/run_stdout", "logs/run/run_stderr",
+    }
+    assert memory.files == build.files
+    assert (tmp_path / "site" / "README.md").read_text() == build.markdown
+    with tarfile.open(tarball) as tar:
+        assert tar.extractfile("images/local-run.svg").read() == b"<svg/>"
+        assert sorted(tar.getnames()) == sorted(build.files)
+
+
+@patch('con_duct_gallery.pipeline.generate_plot', side_effect=_fake_plot)
+def test_build_gallery_reuses_workspace(mock_plot, tmp_path):
+    """Test a kept workspace makes the next build skip up-to-date stages."""
+    from con_duct_gallery.api import LogSources, build_gallery
+
+    repo = tmp_path / "repo"
+    _write_local_example(repo)
+    sources = LogSources(repo)
+
+    first = build_gallery(_registry(), sources, workspace=tmp_path / "work", include_logs=False)
+    second = build_gallery(_registry(), sources, workspace=tmp_path / "work", include_logs=False)
+
+    assert mock_plot.call_count == 1
+    assert second.metrics["stages_run"] == 0
+    assert second.examples[0].section == first.examples[0].section
+    assert set(second.files) == {"README.md", "images/local-run.svg"}
+
+
+@patch('con_duct_gallery.pipeline.generate_plot', side_effect=_fake_plot)
+def test_rendered_plots_are_not_read_back(mock_plot, tmp_path):
+    """Test plots rendered by a build go to the sinks without another read."""
+    from con_duct_gallery.api import LogSources, build_gallery
+
+    repo = tmp_path / "repo"
+    _write_local_example(repo)
+    alias = (tmp_path / "work" / "images" / "local-run.svg").resolve()
+    read = []
+    read_bytes = Path.read_bytes
+
+    def recording_read_bytes(path):
+        read.append(path)
+        return read_bytes(path)
+
+    with patch.object(Path, "read_bytes", recording_read_bytes):
+        build = build_gallery(_registry(), LogSources(repo), workspace=tmp_path / "work")
+    assert build.files["images/local-run.svg"] == b"<svg/>"
+    assert alias not in read
+    assert repo / "logs" / "run" / "run_stdout" in read
+
+    # Plots that were already up to date come from the workspace
+    build = build_gallery(_registry(), LogSources(repo), workspace=tmp_path / "work")
+    assert mock_plot.call_count == 1
+    assert build.files["images/local-run.svg"] == b"<svg/>"
+
+
+@patch('con_duct_gallery.pipeline.generate_plot', side_effect=_fake_plot)
+def test_concurrent_builds(mock_plot, tmp_path):
+    """Test builds sharing sources run side by side in one process."""
+    from con_duct_gallery.api import LogSources, MemorySink, build_gallery
+
+    repo = tmp_path / "repo"
+    _write_local_example(repo)
+    sources = LogSources(repo, cache_dir=tmp_path / "cache")
+    sinks = [MemorySink() for _ in range(4)]
+    threads = [
+        threading.Thread(target=build_gallery, args=(_registry(), sources, [sink]))
+        for sink in sinks
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    sections = {sink.files["README.md"].decode().split("## 📊 Examples")[1] for sink in sinks}
+    assert len(sections) == 1
+    assert all(sink.files["images/local-run.svg"] == b"<svg/>" for sink in sinks)
+
+
+@patch('con_duct_gallery.pipeline.generate_plot', side_effect=_fake_plot)
+def test_failed_sink_aborts_the_others(mock_plot, tmp_path):
+    """Test a failing sink leaves no partial tarball and every sink is closed or aborted."""
+    import pytest
+    from con_duct_gallery.api import LogSources, MemorySink, TarballSink, build_gallery
+
+    class FailingSink(MemorySink):
+        def write(self, name, data):
+            raise OSError("disk full")
+
+    repo = tmp_path / "repo"
+    _write_local_example(repo)
+    memory = MemorySink()
+    tarball = tmp_path / "out" / "gallery.tar.gz"
+    with pytest.raises(OSError, match="disk full"):
+        build_gallery(_registry(), LogSources(repo), [memory, TarballSink(tarball), FailingSink()])
+    assert memory.files == {}
+    assert list(tarball.parent.iterdir()) == []
+
+    # A build failing before the sinks are written aborts them too
+    tarball_sink = TarballSink(tarball)
+    with patch('con_duct_gallery.api.GalleryPipeline', side_effect=RuntimeError("boom")):
+        with pytest.raises(RuntimeError, match="boom"):
+            build_gallery(_registry(), LogSources(repo), [tarball_sink])
+    assert list(tarball.parent.iterdir()) == []
+
+
+def test_tarball_sink_to_file_object():
+    """Test a tarball can be written to an open file object."""
+    from con_duct_gallery.api import TarballSink
+
+    buffer = io.BytesIO()
+    sink = TarballSink(buffer, mtime=0)
+    sink.write("README.md", b"# Gallery")
+    sink.close()
+
+    with tarfile.open(fileobj=io.BytesIO(buffer.getvalue())) as tar:
+        member = tar.getmember("README.md")
+        assert member.mtime == 0
+        assert tar.extractfile(member).read() == b"# Gallery"
+
+
+def test_package_exports_api_lazily():
+    """Test the API is importable from the package without loading it at import."""
+    import con_duct_gallery
+    from con_duct_gallery import api
+
+    assert con_duct_gallery.build_gallery is api.build_gallery
+    assert "build_gallery" in con_duct_gallery.__all__
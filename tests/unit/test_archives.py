@@ -0,0 +1,168 @@
+"""Unit tests for archives module."""
+
+import io
+import json
+import sys
+import tarfile
+import zipfile
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+RUNS = ("one", "two")
+
+
+def _run_files(prefix="./.duct/logs/") -> dict[str, bytes]:
+    """Logs of two runs as archive members, plus an unrelated large file."""
+    files = {f"{prefix}../big.bin": b"x" * 100000}
+    for name in RUNS:
+        info = {"output_paths": {
+            "usage": f".duct/logs/{name}_usage.json",
+            "stdout": f".duct/logs/{name}_stdout",
+            "stderr": f".duct/logs/{name}_stderr",
+        }}
+        files[f"{prefix}{name}_info.json"] = json.dumps(info).encode()
+        usage = {"timestamp": "2024-01-01T00:00:00", "run": name}
+        files[f"{prefix}{name}_usage.json"] = (json.dumps(usage) + "\n").encode()
+        files[f"{prefix}{name}_stdout"] = f"{name} out\n".encode()
+        files[f"{prefix}{name}_stderr"] = b""
+    return files
+
+
+def _write_tar(path: Path, files: dict[str, bytes]) -> Path:
+    with tarfile.open(path, "w:gz") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return path
+
+
+def _write_zip(path: Path, files: dict[str, bytes]) -> Path:
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, data in files.items():
+            zf.writestr(name.removeprefix("./"), data)
+    return path
+
+
+@pytest.mark.parametrize("write", [_write_tar, _write_zip])
+def test_copy_members(tmp_path, write):
+    """Test members are streamed to files and missing ones left out."""
+    from con_duct_gallery.archives import copy_members
+
+    suffix = ".tar.gz" if write is _write_tar else ".zip"
+    archive = write(tmp_path / f"logs{suffix}", _run_files())
+    copied = copy_members(archive, {
+        ".duct/logs/two_stdout": tmp_path / "stdout",
+        "./.duct/logs/one_usage.json": tmp_path / "usage",
+        ".duct/logs/missing": tmp_path / "missing",
+    })
+    assert sorted(copied) == [".duct/logs/one_usage.json", ".duct/logs/two_stdout"]
+    assert copied[".duct/logs/two_stdout"] == 8
+    assert (tmp_path / "stdout").read_text() == "two out\n"
+    assert not (tmp_path / "missing").exists()
+
+    (tmp_path / f"broken{suffix}").write_bytes(b"not an archive")
+    with pytest.raises(ValueError, match="Cannot read archive"):
+        copy_members(tmp_path / f"broken{suffix}", {"a": tmp_path / "a"})
+
+
+def test_zstd_archives(tmp_path, monkeypatch):
+    """Test .tar.zst archives are read with zstandard, or fail with a hint without it."""
+    from con_duct_gallery.archives import copy_members
+
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    (tmp_path / "logs.tar.zst").write_bytes(b"")
+    with pytest.raises(ValueError, match="zstandard package"):
+        copy_members(tmp_path / "logs.tar.zst", {"a": tmp_path / "a"})
+    monkeypatch.undo()
+
+    zstandard = pytest.importorskip("zstandard")
+    tar = _write_tar(tmp_path / "logs.tar.gz", _run_files())
+    with tarfile.open(tar) as source, io.BytesIO() as plain:
+        with tarfile.open(fileobj=plain, mode="w") as dest:
+            for info in source:
+                dest.addfile(info, source.extractfile(info))
+        compressed = zstandard.ZstdCompressor().compress(plain.getvalue())
+    (tmp_path / "logs.tar.zst").write_bytes(compressed)
+    copy_members(tmp_path / "logs.tar.zst", {".duct/logs/one_stdout": tmp_path / "stdout"})
+    assert (tmp_path / "stdout").read_text() == "one out\n"
+
+
+def test_fetch_local_archive_logs(tmp_path):
+    """Test an example's logs are copied out of a local archive."""
+    from con_duct_gallery.archives import fetch_archive_logs
+    from con_duct_gallery.models import ExampleEntry
+
+    _write_tar(tmp_path / "runs.tar.gz", _run_files())
+    example = ExampleEntry(title="Run Two", info_file="runs.tar.gz#.duct/logs/two_info.json")
+    fetched = fetch_archive_logs(example, tmp_path / "logs", tmp_path)
+    assert fetched.stdout == tmp_path / "logs" / "run-two" / "example_output_stdout"
+    assert fetched.stdout.read_text() == "two out\n"
+    assert '"run": "two"' in fetched.usage_json.read_text()
+    assert fetched.validators is None
+
+    missing = ExampleEntry(title="Run Three", info_file="runs.tar.gz#.duct/logs/three_info.json")
+    with pytest.raises(FileNotFoundError, match="three_info.json not found"):
+        fetch_archive_logs(missing, tmp_path / "logs", tmp_path)
+    gone = ExampleEntry(title="Gone", info_file="gone.zip#info.json")
+    with pytest.raises(FileNotFoundError, match="Local archive not found"):
+        fetch_archive_logs(gone, tmp_path / "logs", tmp_path)
+
+
+def test_tar_archive_is_read_once(tmp_path, monkeypatch):
+    """Test logs stored before their info member come out of a single tar pass."""
+    from con_duct_gallery import archives
+    from con_duct_gallery.archives import fetch_archive_logs
+    from con_duct_gallery.models import ExampleEntry
+
+    files = _run_files()
+    # Logs first, info last, as tar stores files in directory order
+    ordered = dict(sorted(files.items(), key=lambda item: item[0].endswith("_info.json")))
+    _write_tar(tmp_path / "runs.tar.gz", ordered)
+    opened = []
+    open_tar = archives._open_tar
+
+    def counting_open_tar(path):
+        opened.append(path)
+        return open_tar(path)
+
+    monkeypatch.setattr(archives, "_open_tar", counting_open_tar)
+    example = ExampleEntry(title="Run One", info_file="runs.tar.gz#.duct/logs/one_info.json")
+    fetched = fetch_archive_logs(example, tmp_path / "logs", tmp_path)
+
+    assert len(opened) == 1
+    assert fetched.stdout.read_text() == "one out\n"
+    assert '"run": "one"' in fetched.usage_json.read_text()
+    assert fetched.stderr.read_bytes() == b""
+    # A local archive is not downloaded
+    assert fetched.bytes_downloaded == 0
+
+
+def test_remote_archive_is_downloaded_once(tmp_path):
+    """Test examples sharing a remote archive download it once per build."""
+    from con_duct_gallery.archives import ArchiveDownloads, fetch_archive_logs
+    from con_duct_gallery.models import ExampleEntry
+
+    data = _write_zip(tmp_path / "runs.zip", _run_files()).read_bytes()
+    response = MagicMock(status_code=200, headers={"ETag": '"v1"'})
+    response.iter_content.side_effect = lambda size: iter([data[:1000], data[1000:]])
+    session = MagicMock()
+    session.get.return_value = response
+
+    url = "https://example.com/jobs/runs.zip"
+    downloads = ArchiveDownloads()
+    downloaded = []
+    for name in RUNS:
+        example = ExampleEntry(title=f"Run {name}", info_file=f"{url}#.duct/logs/{name}_info.json")
+        fetched = fetch_archive_logs(
+            example, tmp_path / "logs", downloads=downloads, session=session
+        )
+        assert fetched.stdout.read_text() == f"{name} out\n"
+        assert fetched.validators == {"info": {"url": url, "etag": '"v1"'}}
+        downloaded.append(fetched.bytes_downloaded)
+    # The archive counts as downloaded once, at its own size
+    assert downloaded == [len(data), 0]
+    session.get.assert_called_once()
+    assert session.get.call_args.kwargs["stream"] is True
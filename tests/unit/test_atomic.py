@@ -0,0 +1,35 @@
+"""Unit tests for atomic module."""
+
+import pytest
+
+
+def test_atomic_write_replaces_content(tmp_path):
+    """Test writing new files and replacing existing ones."""
+    from con_duct_gallery.atomic import atomic_write
+
+    path = tmp_path / "images" / "plot.svg"
+    atomic_write(path, "<svg>é</svg>")
+    assert path.read_text(encoding="utf-8") == "<svg>é</svg>"
+    atomic_write(path, b"<svg/>")
+    assert path.read_bytes() == b"<svg/>"
+    assert [p.name for p in path.parent.iterdir()] == ["plot.svg"]
+
+
+def test_atomic_output_keeps_old_file_on_failure(tmp_path):
+    """Test that an interrupted write leaves the previous content."""
+    from con_duct_gallery.atomic import atomic_output
+
+    path = tmp_path / "usage.json"
+    path.write_text("complete")
+    with pytest.raises(RuntimeError):
+        with atomic_output(path) as tmp:
+            assert tmp.suffix == ".json" and tmp.parent == tmp_path
+            tmp.write_text("partial")
+            raise RuntimeError("killed")
+    assert path.read_text() == "complete"
+    assert [p.name for p in tmp_path.iterdir()] == ["usage.json"]
+
+    # Nothing written: target untouched
+    with atomic_output(path):
+        pass
+    assert path.read_text() == "complete"
@@ -0,0 +1,126 @@
+"""Unit tests for cache module."""
+
+import json
+import os
+from unittest.mock import patch
+
+
+def test_put_get_restore(tmp_path):
+    """Test entries are stored by kind and key and copied back out."""
+    from con_duct_gallery.cache import ContentCache
+
+    cache = ContentCache(tmp_path / "cache")
+    assert cache.get("plots", "abcd", ".svg") is None
+
+    source = tmp_path / "plot.svg"
+    source.write_text("<svg/>")
+    path = cache.put("plots", "abcd", source, ".svg")
+    assert path.relative_to(cache.root).parts[1:] == ("plots", "ab", "abcd.svg")
+    cache.put("plots", "abce", b"raw", ".json")
+
+    dest = tmp_path / "restored.svg"
+    assert cache.restore("plots", "abcd", dest, ".svg")
+    assert dest.read_text() == "<svg/>"
+    assert not cache.restore("plots", "ffff", dest, ".svg")
+    assert cache.usage() == (2, len("<svg/>") + len("raw"))
+
+
+def test_evict_least_recently_used(tmp_path):
+    """Test eviction removes the entries read or written longest ago."""
+    from con_duct_gallery.cache import ContentCache
+
+    cache = ContentCache(tmp_path, max_bytes=250)
+    for i, key in enumerate(("aa01", "aa02", "aa03")):
+        path = cache.put("logs", key, b"x" * 100)
+        os.utime(path, (1000 + i, 1000 + i))
+    # Reading the oldest entry makes it the most recently used
+    assert cache.get("logs", "aa01") is not None
+
+    removed = cache.evict()
+    assert [p.name for p in removed] == ["aa02"]
+    assert cache.usage().bytes == 200
+    assert [p.name for p in cache.evict(max_bytes=0)] == ["aa03", "aa01"]
+
+
+def test_default_cache_dir_and_key(tmp_path, monkeypatch):
+    """Test the XDG location and that the CI key follows the configuration."""
+    from con_duct_gallery.cache import cache_key, default_cache_dir
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert default_cache_dir() == tmp_path / "xdg" / "con-duct-gallery"
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    monkeypatch.setenv("HOME", str(tmp_path))
+    assert default_cache_dir() == tmp_path / ".cache" / "con-duct-gallery"
+
+    config = tmp_path / "gallery.yaml"
+    config.write_text("examples: []\n")
+    key = cache_key(config)
+    assert key.startswith("con-duct-gallery-v1-") and key == cache_key(config)
+    config.write_text("examples: [1]\n")
+    assert cache_key(config) != key
+
+
+def test_series_cache(tmp_path):
+    """Test parsed series are cached by log content."""
+    from con_duct_gallery.cache import ContentCache
+    from con_duct_gallery.series import load_series
+
+    usage = tmp_path / "usage.json"
+    usage.write_text("".join(
+        json.dumps({"timestamp": f"2024-01-01T00:00:0{i}", "totals": {"rss": i * 10}}) + "\n"
+        for i in range(3)
+    ))
+    cache = ContentCache(tmp_path / "cache")
+    first = load_series(usage, cache)
+    assert cache.usage().files == 1
+
+    with patch("con_duct_gallery.series._read_series") as read:
+        second = load_series(usage, cache)
+    read.assert_not_called()
+    assert list(second.rss) == list(first.rss) == [0, 10, 20]
+    assert list(second.seconds) == [0, 1, 2]
+
+
+@patch("con_duct_gallery.pipeline.generate_plot")
+@patch("con_duct_gallery.pipeline.fetch_log_files")
+def test_fresh_checkout_starts_warm(mock_fetch, mock_plot, tmp_path):
+    """Test a build in a new checkout reuses logs and plots of an earlier one."""
+    from con_duct_gallery.fetcher import cached_log_paths
+    from con_duct_gallery.models import ExampleEntry
+    from con_duct_gallery.pipeline import BuildOptions, GalleryPipeline
+
+    example = ExampleEntry(
+        title="Pinned Run",
+        info_file="https://raw.githubusercontent.com/o/r/" + "a" * 40 + "/run_info.json"
+    )
+
+    def fake_fetch(example, log_dir, force, repo_root, session=None):
+        paths = cached_log_paths(example, log_dir)
+        paths.info_json.parent.mkdir(parents=True, exist_ok=True)
+        for path in paths.paths:
+            path.write_text(f"{path.name} content\n")
+        return paths._replace(bytes_downloaded=100)
+
+    mock_fetch.side_effect = fake_fetch
+    mock_plot.side_effect = lambda usage, svg, opts, **kwargs: svg.write_text("<svg/>")
+
+    def build(checkout):
+        options = BuildOptions(
+            output=checkout / "README.md",
+            log_dir=checkout / "logs",
+            image_dir=checkout / "images",
+            manifest=checkout / "manifest.json",
+            repo_root=checkout,
+            cache_dir=tmp_path / "cache"
+        )
+        result = GalleryPipeline(options).build_example(example)
+        assert result.fetch_error is None and result.plot_error is None
+        return result
+
+    build(tmp_path / "first")
+    result = build(tmp_path / "second")
+
+    assert mock_fetch.call_count == 1
+    assert mock_plot.call_count == 1
+    assert result.log_paths["usage"].read_text() == "example_output_usage.json content\n"
+    assert result.svg_path.read_text() == "<svg/>"
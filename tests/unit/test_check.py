@@ -0,0 +1,177 @@
+"""Unit tests for check module."""
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+
+def _write_local_example(root: Path, name: str) -> str:
+    """Write a minimal local duct log set and return its info path relative to root."""
+    logs = root / "logs" / name
+    logs.mkdir(parents=True)
+    info = {
+        "execution_summary": {"exit_code": 0, "peak_rss": 1024},
+        "output_paths": {
+            "usage": f".duct/{name}_usage.json",
+            "stdout": f".duct/{name}_stdout",
+            "stderr": f".duct/{name}_stderr",
+        },
+    }
+    (logs / f"{name}_info.json").write_text(json.dumps(info))
+    (logs / f"{name}_usage.json").write_text('{"timestamp": "2024-01-01T00:00:00"}\n')
+    (logs / f"{name}_stdout").write_text("")
+    (logs / f"{name}_stderr").write_text("")
+    return f"logs/{name}/{name}_info.json"
+
+
+def _fake_plot(usage, svg, opts, **kwargs):
+    svg.parent.mkdir(parents=True, exist_ok=True)
+    svg.write_text("<svg/>")
+
+
+@patch('con_duct_gallery.pipeline.generate_plot')
+def test_check_gallery_reports_outdated_stages(mock_plot, tmp_path):
+    """Test that check finds exactly what generate would rebuild, running nothing."""
+    from con_duct_gallery.check import check_gallery
+    from con_duct_gallery.models import ExampleEntry, ExampleRegistry
+    from con_duct_gallery.pipeline import BuildOptions, GalleryPipeline
+
+    mock_plot.side_effect = _fake_plot
+    registry = ExampleRegistry(examples=[
+        ExampleEntry(title="Run One", info_file=_write_local_example(tmp_path, "one")),
+        ExampleEntry(title="Run Two", info_file=_write_local_example(tmp_path, "two")),
+    ])
+    options = BuildOptions(
+        output=tmp_path / "README.md",
+        log_dir=tmp_path / "logs",
+        image_dir=tmp_path / "images",
+        manifest=tmp_path / "manifest.json",
+        repo_root=tmp_path
+    )
+
+    assert [o.name for o in check_gallery(registry, options)] == ["fetch", "fetch"]
+
+    pipeline = GalleryPipeline(options)
+    pipeline.render(registry, pipeline.build_examples(registry.examples))
+    pipeline.save()
+    assert check_gallery(registry, options) == []
+
+    with open(tmp_path / "logs" / "two" / "two_usage.json", "a") as f:
+        f.write('{"timestamp": "2024-01-01T00:00:01"}\n')
+    outdated = check_gallery(registry, options)
+    assert [(o.name, o.key, o.reason) for o in outdated] == [
+        ("plot", "run-two", "inputs changed: usage"),
+        ("distribution", "run-two", "inputs changed: usage"),
+    ]
+
+    described = ExampleRegistry(examples=[
+        registry.examples[0].model_copy(update={"description": "New words"})
+    ])
+    outdated = check_gallery(described, options._replace(manifest=None))
+    assert [o.name for o in outdated] == ["fetch"]  # empty manifest
+    outdated = check_gallery(described, options)
+    assert [(o.name, o.reason) for o in outdated] == [
+        ("render", "inputs changed: leaderboards, sections")
+    ]
+    assert mock_plot.call_count == 2
+
+
+def _run_check(root: Path, monkeypatch, *args: str) -> int:
+    """Run the check command on the gallery under root, returning its exit code."""
+    import sys
+    from con_duct_gallery.__main__ import main
+
+    monkeypatch.chdir(root)
+    monkeypatch.setattr(sys, 'argv', [
+        'con-duct-gallery', 'check', '--config', 'gallery.yaml', '--output', 'README.md',
+        '--log-dir', 'logs', '--image-dir', 'images', '--manifest', 'manifest.json', *args
+    ])
+    return main()
+
+
+def _build(root: Path, monkeypatch) -> None:
+    """Build the gallery under root as `generate` would."""
+    from con_duct_gallery.models import ExampleRegistry
+    from con_duct_gallery.pipeline import BuildOptions, GalleryPipeline
+
+    monkeypatch.chdir(root)
+    registry = ExampleRegistry.from_yaml(root / "gallery.yaml")
+    pipeline = GalleryPipeline(BuildOptions(
+        output=Path("README.md"),
+        log_dir=Path("logs"),
+        image_dir=Path("images"),
+        manifest=Path("manifest.json"),
+        repo_root=root
+    ))
+    pipeline.render(registry, pipeline.build_examples(registry.examples))
+    pipeline.save()
+
+
+@patch('con_duct_gallery.pipeline.generate_plot', side_effect=_fake_plot)
+def test_check_exit_codes(mock_plot, tmp_path, monkeypatch):
+    """Test check exits 1 while a stage is outdated and 0 once the gallery is built."""
+    info_file = _write_local_example(tmp_path, "one")
+    (tmp_path / "gallery.yaml").write_text(
+        f"examples:\n  - title: Run One\n    info_file: {info_file}\n"
+    )
+
+    assert _run_check(tmp_path, monkeypatch) == 1
+    _build(tmp_path, monkeypatch)
+    assert _run_check(tmp_path, monkeypatch) == 0
+
+    with open(tmp_path / "logs" / "one" / "one_usage.json", "a") as f:
+        f.write('{"timestamp": "2024-01-01T00:00:01"}\n')
+    assert _run_check(tmp_path, monkeypatch) == 1
+
+    (tmp_path / "gallery.yaml").write_text("examples: [{title: Run One}]\n")
+    assert _run_check(tmp_path, monkeypatch) == 1
+    assert mock_plot.call_count == 1
+
+
+@patch('con_duct_gallery.pipeline.generate_plot', side_effect=_fake_plot)
+def test_check_revalidates_remote_logs(mock_plot, tmp_path, monkeypatch, caplog):
+    """Test check sends conditional HEAD requests, and none with --offline."""
+    import logging
+    from unittest.mock import Mock
+
+    (tmp_path / "gallery.yaml").write_text(
+        "examples:\n  - title: Remote Run\n"
+        "    info_file: https://example.org/main/run_info.json\n"
+    )
+    info = json.dumps({"output_paths": {
+        "usage": "run_usage.json", "stdout": "run_stdout", "stderr": "run_stderr"
+    }})
+
+    def get(url, headers=None, **kwargs):
+        text = info if url.endswith("info.json") else '{"timestamp": "2024-01-01T00:00:00"}\n'
+        if headers and "Range" in headers:
+            return Mock(status_code=200, headers={"ETag": '"v1"'}, iter_content=Mock(
+                return_value=[text.encode()]
+            ))
+        return Mock(status_code=200, headers={"ETag": '"v1"'}, text=text, content=text.encode())
+
+    with patch('con_duct_gallery.fetcher.requests.get', side_effect=get):
+        _build(tmp_path, monkeypatch)
+
+    etag = '"v1"'
+
+    def head(url, headers, **kwargs):
+        assert headers == {"If-None-Match": '"v1"'}
+        if etag == '"v1"':
+            return Mock(status_code=304)
+        return Mock(status_code=200, headers={"ETag": etag})
+
+    with patch('con_duct_gallery.fetcher.requests.get') as mock_get, \
+            patch('con_duct_gallery.fetcher.requests.head', side_effect=head) as mock_head:
+        assert _run_check(tmp_path, monkeypatch) == 0
+        assert mock_head.call_count == 4
+
+        etag = '"v2"'
+        with caplog.at_level(logging.INFO, logger='con_duct_gallery.check'):
+            assert _run_check(tmp_path, monkeypatch) == 1
+        assert "fetch:remote-run: inputs changed: upstream" in caplog.text
+
+        mock_head.reset_mock()
+        assert _run_check(tmp_path, monkeypatch, '--offline') == 0
+        mock_head.assert_not_called()
+        mock_get.assert_not_called()
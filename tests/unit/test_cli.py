@@ -113,3 +113,139 @@ def test_main_handles_help_flag():
     with patch.object(sys, 'argv', ['con-duct-gallery', '--help']):
         exit_code = main()
         assert exit_code == 0
+
+
+def test_cli_jobs():
+    """Test -j/--jobs parsing and default."""
+    from con_duct_gallery.cli import parse_args
+
+    assert parse_args(['generate']).jobs == 1
+    assert parse_args(['generate', '-j', '4']).jobs == 4
+
+
+def test_cli_watch_defaults():
+    """Test watch subcommand shares build options with generate."""
+    from con_duct_gallery.cli import parse_args
+
+    args = parse_args(['watch', '--debounce', '0.5'])
+    assert args.command == 'watch'
+    assert args.config == Path('con-duct-gallery.yaml')
+    assert args.debounce == 0.5
+    assert args.poll is False
+
+
+def test_cli_serve_defaults():
+    """Test serve subcommand options."""
+    from con_duct_gallery.cli import parse_args
+
+    args = parse_args(['serve', '--port', '0'])
+    assert args.command == 'serve'
+    assert args.host == '127.0.0.1'
+    assert args.port == 0
+    assert args.cache_size == 64
+    assert args.image_dir == Path('images')
+
+
+def test_cli_check():
+    """Test check subcommand options."""
+    from con_duct_gallery.cli import parse_args
+
+    args = parse_args(['check'])
+    assert args.command == 'check'
+    assert args.offline is False
+    assert parse_args(['check', '--offline']).offline is True
+    assert parse_args(['generate', '--revalidate']).revalidate is True
+
+
+def test_cli_compare():
+    """Test compare subcommand selection options."""
+    from con_duct_gallery.cli import parse_args
+
+    args = parse_args(['compare', 'run-a', 'run-b', '--metrics', 'rss', '-o', 'out.svg'])
+    assert args.command == 'compare'
+    assert args.examples == ['run-a', 'run-b']
+    assert args.metrics == ['rss']
+    assert args.output == Path('out.svg')
+    assert parse_args(['compare', '--tag', 'mriqc']).points == 500
+
+
+def test_cli_query():
+    """Test query subcommands and their options."""
+    from con_duct_gallery.cli import parse_args
+
+    args = parse_args(['query', 'top', 'peak_rss', '-n', '5', '--tag', 'mriqc'])
+    assert (args.command, args.query, args.metric) == ('query', 'top', 'peak_rss')
+    assert args.limit == 5 and args.tag == 'mriqc'
+    assert args.history == Path('.con-duct-gallery/history.sqlite')
+
+    args = parse_args(['query', 'growth', 'wall_clock_time', '--threshold', '20'])
+    assert args.since == '30d' and args.threshold == 20.0
+    assert parse_args(['generate']).history == Path('.con-duct-gallery/history.sqlite')
+
+
+def test_cli_deadline_and_host_failures():
+    """Test run budget and circuit breaker options."""
+    import argparse
+    from con_duct_gallery.cli import duration, parse_args
+
+    assert duration("45m") == 2700
+    assert duration("1h30m") == 5400
+    assert duration("90s") == duration("90") == 90
+    for text in ("", "soon", "1d"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            duration(text)
+
+    args = parse_args(['generate', '--deadline', '1h', '--host-failures', '2'])
+    assert args.deadline == 3600 and args.host_failures == 2
+    args = parse_args(['generate'])
+    assert args.deadline is None and args.host_failures == 3
+
+
+def test_cli_diff_against():
+    """Test diff-only preview options."""
+    from con_duct_gallery.cli import parse_args
+
+    args = parse_args(['generate', '--diff-against', 'origin/main', '--preview-dir', 'out'])
+    assert args.diff_against == 'origin/main'
+    assert args.preview_dir == Path('out')
+    args = parse_args(['generate'])
+    assert args.diff_against is None and args.preview_dir == Path('preview')
+
+
+def test_cli_cache_options():
+    """Test persistent cache options and the cache subcommand."""
+    import argparse
+    from con_duct_gallery.cli import parse_args, size
+
+    assert size("500M") == 500 << 20
+    assert size("2GiB") == size("2g") == 2 << 30
+    assert size("1048576") == 1 << 20
+    with pytest.raises(argparse.ArgumentTypeError):
+        size("lots")
+
+    args = parse_args(['generate'])
+    assert args.cache_dir is None and args.cache_limit == 1 << 30 and not args.no_cache
+    args = parse_args(['generate', '--cache-dir', 'c', '--cache-limit', '10M', '--no-cache'])
+    assert args.cache_dir == Path('c') and args.cache_limit == 10 << 20 and args.no_cache
+    args = parse_args(['cache', 'key', '--output', 'key.txt'])
+    assert args.cache == 'key' and args.output == Path('key.txt')
+    assert parse_args(['cache', 'prune', '--cache-limit', '1G']).cache_limit == 1 << 30
+
+
+def test_cache_key_command(tmp_path, monkeypatch, capsys):
+    """Test the cache key file is written once and left alone while unchanged."""
+    import sys
+    from con_duct_gallery.__main__ import main
+
+    config = tmp_path / "gallery.yaml"
+    config.write_text("examples: []\n")
+    key_file = tmp_path / "cache-key"
+    argv = ['con-duct-gallery', 'cache', 'key', '--config', str(config), '--output', str(key_file)]
+    monkeypatch.setattr(sys, 'argv', argv)
+
+    assert main() == 0
+    key = capsys.readouterr().out.strip()
+    assert key_file.read_text() == key + "\n"
+    mtime = key_file.stat().st_mtime_ns
+    assert main() == 0
+    assert key_file.stat().st_mtime_ns == mtime
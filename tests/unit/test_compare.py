@@ -0,0 +1,100 @@
+"""Unit tests for compare module."""
+
+import json
+import pytest
+from datetime import datetime, timedelta
+
+
+def _write_usage(path, rss_values, step=1.0):
+    start = datetime(2024, 1, 1)
+    with open(path, "w") as f:
+        for i, rss in enumerate(rss_values):
+            f.write(json.dumps({
+                "timestamp": (start + timedelta(seconds=i * step)).isoformat(),
+                "totals": {"rss": rss, "vsz": 2 * rss, "pcpu": 10.0 * i, "pmem": 0.5},
+            }) + "\n")
+
+
+def test_load_series_and_resample(tmp_path):
+    """Test normalized resampling of runs with different lengths."""
+    import numpy as np
+    from con_duct_gallery.compare import resample
+    from con_duct_gallery.series import load_series
+
+    short = tmp_path / "short_usage.json"
+    long = tmp_path / "long_usage.json"
+    _write_usage(short, [0, 100], step=2)
+    _write_usage(long, list(range(0, 20001, 1)), step=0.5)
+
+    series = load_series(short)
+    assert list(series.seconds) == [0.0, 2.0]
+    assert list(series.vsz) == [0.0, 200.0]
+
+    curve = resample(series, points=5)
+    assert np.allclose(curve["progress"], [0, 0.25, 0.5, 0.75, 1])
+    assert np.allclose(curve["rss"], [0, 25, 50, 75, 100])
+
+    long_curve = resample(load_series(long), points=3)
+    assert np.allclose(long_curve["rss"], [0, 10000, 20000])
+    assert long_curve["pcpu"].shape == (3,)
+
+
+def test_resample_single_report(tmp_path):
+    """Test that a run with one report is held constant."""
+    import numpy as np
+    from con_duct_gallery.compare import resample
+    from con_duct_gallery.series import load_series
+
+    usage = tmp_path / "usage.json"
+    _write_usage(usage, [42])
+    assert np.allclose(resample(load_series(usage), points=4)["rss"], 42)
+
+    usage.write_text("")
+    with pytest.raises(ValueError):
+        load_series(usage)
+
+
+def test_select_examples():
+    """Test selection by title, slug and tag in registry order."""
+    from con_duct_gallery.compare import select_examples
+    from con_duct_gallery.models import ExampleEntry, ExampleRegistry
+
+    registry = ExampleRegistry(examples=[
+        ExampleEntry(title="Run A", info_file="a.json", tags=["x"]),
+        ExampleEntry(title="Run B", info_file="b.json"),
+        ExampleEntry(title="Run C", info_file="c.json", tags=["x"]),
+    ])
+    titles = [e.title for e in select_examples(registry, ["run-b"], tag="x")]
+    assert titles == ["Run A", "Run B", "Run C"]
+    assert [e.title for e in select_examples(registry, ["Run C"])] == ["Run C"]
+    with pytest.raises(ValueError, match="Unknown"):
+        select_examples(registry, ["nope"])
+    with pytest.raises(ValueError):
+        select_examples(registry, [], tag="missing")
+
+
+def test_render_comparison(tmp_path):
+    """Test that overlaid curves are written as SVG."""
+    from con_duct_gallery.compare import render_comparison, resample
+    from con_duct_gallery.series import load_series
+
+    usage = tmp_path / "usage.json"
+    _write_usage(usage, [1 << 30, 2 << 30, 1 << 30])
+    curves = {
+        "Run A": resample(load_series(usage), 50),
+        "Run B": resample(load_series(usage), 50),
+    }
+    output = render_comparison(curves, tmp_path / "out" / "cmp.svg", ("rss", "pcpu", "pmem"))
+
+    svg = output.read_text()
+    assert svg.startswith("<?xml")
+    assert "Run A" in svg and "Run B" in svg
+
+
+def test_memory_axis_uses_shared_byte_units():
+    """Test the comparison scales memory like the plots and the README."""
+    import numpy as np
+    from con_duct_gallery.compare import _scale_bytes
+
+    assert _scale_bytes([np.array([0.0, 1024.0]), np.array([3.0 * (1 << 30)])]) == (1 << 30, "GiB")
+    assert _scale_bytes([np.array([])]) == (1, "B")
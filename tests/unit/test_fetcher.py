@@ -76,3 +76,231 @@ def test_fetch_with_cache(tmp_path):
         result = fetch_log_files(example, tmp_path, force=False)
         mock_fetch.assert_not_called()  # Cache used
         assert result.info_json.exists()
+
+
+def test_revalidate_uses_conditional_head():
+    """Test upstream revalidation only reports changed mutable URLs."""
+    from con_duct_gallery.fetcher import is_mutable_url, revalidate
+
+    pinned = "https://raw.githubusercontent.com/o/r/" + "a" * 40 + "/run_info.json"
+    assert not is_mutable_url(pinned)
+    assert is_mutable_url("https://example.org/branch/main/run_info.json")
+
+    def head(url, headers, timeout, allow_redirects):
+        response = Mock()
+        if url.endswith("same"):
+            assert headers == {"If-None-Match": '"v1"'}
+            response.status_code = 304
+        else:
+            response.status_code = 200
+            response.headers = {"ETag": '"v2"'}
+        return response
+
+    session = Mock()
+    session.head.side_effect = head
+    changed = revalidate({
+        "info": {"url": pinned, "etag": '"v1"'},
+        "usage": {"url": "https://example.org/same", "etag": '"v1"'},
+        "stdout": {"url": "https://example.org/changed", "etag": '"v1"'},
+        "stderr": {"url": "https://example.org/no-validator"},
+    }, session=session)
+
+    assert changed == ["stderr", "stdout"]
+    assert session.head.call_count == 2
+
+
+def test_response_validators_ignores_missing_headers():
+    """Test validator extraction from responses without cache headers."""
+    from con_duct_gallery.fetcher import response_validators
+
+    response = Mock()
+    response.headers = {"Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+    assert response_validators("u", response) == {
+        "url": "u", "last_modified": "Wed, 01 Jan 2025 00:00:00 GMT"
+    }
+    assert response_validators("u", Mock()) == {"url": "u"}
+
+
+def test_tail_file_reads_from_end(tmp_path):
+    """Test tailing local files without reading them whole."""
+    from con_duct_gallery.fetcher import tail_file
+
+    log = tmp_path / "stdout"
+    log.write_text("".join(f"line {i}\n" for i in range(10000)))
+    assert tail_file(log, lines=3) == "line 9997\nline 9998\nline 9999"
+    # Lines cut by max_bytes are dropped rather than shown partially
+    assert tail_file(log, lines=100, max_bytes=25) == "line 9998\nline 9999"
+
+    short = tmp_path / "stderr"
+    short.write_text("only\n")
+    assert tail_file(short) == "only"
+    short.write_text("")
+    assert tail_file(short) == ""
+
+
+def test_tail_url_uses_range_request():
+    """Test tailing remote files with and without Range support."""
+    from con_duct_gallery.fetcher import tail_url
+
+    session = Mock()
+    partial = Mock(status_code=206, content=b"ial line\nlast line\n",
+                   headers={"Content-Range": "bytes 100-119/120"})
+    session.get.return_value = partial
+    assert tail_url("https://example.org/stdout", lines=5, session=session) == "last line"
+    assert session.get.call_args[1]["headers"] == {"Range": "bytes=-8192"}
+
+    full = Mock(status_code=200)
+    full.iter_content.return_value = [b"a\nb\n", b"c\n"]
+    session.get.return_value = full
+    assert tail_url("https://example.org/stdout", lines=2, session=session) == "b\nc"
+
+    # A long file served without Range support is not downloaded to the end
+    read = []
+
+    def chunks():
+        for i in range(100):
+            read.append(i)
+            yield b"x" * 4096 + b"\n"
+
+    full.iter_content.return_value = chunks()
+    assert tail_url("https://example.org/stdout", session=session) == ""
+    assert len(read) == 2  # just past the default max_bytes of 8192
+
+
+def test_bytes_downloaded_counts_responses(tmp_path):
+    """Test only the bytes of responses received count as downloaded."""
+    from con_duct_gallery.fetcher import cached_log_paths, fetch_log_files
+    from con_duct_gallery.models import ExampleEntry
+
+    example = ExampleEntry(title="Test Example", info_file="https://example.com/run_info.json")
+    cached = cached_log_paths(example, tmp_path)
+    cached.info_json.parent.mkdir(parents=True)
+    cached.stderr.write_text("left from an earlier fetch" * 100)
+
+    # No stderr in output_paths: the earlier file is not downloaded again
+    info = json.dumps({"output_paths": {"usage": "run_usage.json", "stdout": "run_stdout"}})
+
+    def get(url, headers=None, **kwargs):
+        if headers and "Range" in headers:
+            return Mock(headers={"Content-Range": "bytes 0-2/3"}, status_code=206, content=b"new")
+        text = info if url.endswith("info.json") else "new"
+        return Mock(headers={}, status_code=200, text=text, content=text.encode())
+
+    with patch('con_duct_gallery.fetcher.requests.get', side_effect=get):
+        fetched = fetch_log_files(example, tmp_path, force=True)
+    assert fetched.bytes_downloaded == len(info) + 2 * len("new")
+
+
+def test_remote_output_keeps_only_its_tail(tmp_path):
+    """Test remote stdout is fetched with one Range request and linked upstream."""
+    from con_duct_gallery.fetcher import PREVIEW_MAX_BYTES, fetch_log_files, log_previews, tail_links
+    from con_duct_gallery.models import ExampleEntry
+
+    example = ExampleEntry(title="Test Example", info_file="https://example.com/run/run_info.json")
+    info = json.dumps({"output_paths": {"usage": "run_usage.json", "stdout": "run_stdout"}})
+    stdout = b"".join(b"line %d\n" % i for i in range(20_000))
+    requested = []
+
+    def get(url, headers=None, **kwargs):
+        requested.append((url, headers))
+        if url.endswith("run_stdout"):
+            start = len(stdout) - PREVIEW_MAX_BYTES
+            return Mock(status_code=206, content=stdout[start:], headers={
+                "Content-Range": f"bytes {start}-{len(stdout) - 1}/{len(stdout)}", "ETag": '"v1"',
+            })
+        text = info if url.endswith("info.json") else "{}"
+        return Mock(headers={}, status_code=200, text=text, content=text.encode())
+
+    with patch('con_duct_gallery.fetcher.requests.get', side_effect=get):
+        fetched = fetch_log_files(example, tmp_path)
+
+    assert ("https://example.com/run/run_stdout", {"Range": f"bytes=-{PREVIEW_MAX_BYTES}"}) in requested
+    tail = fetched.stdout.read_bytes()
+    assert stdout.endswith(tail) and tail.startswith(b"line ") and len(tail) < PREVIEW_MAX_BYTES
+    assert fetched.validators["stdout"]["etag"] == '"v1"'
+    assert fetched.bytes_downloaded == len(info) + 2 + PREVIEW_MAX_BYTES
+    # Previews come from the stored tail, and links go to the full file upstream
+    previews = log_previews({"stdout": fetched.stdout}, fetched.validators, lines=2)
+    assert previews == {"stdout": "line 19998\nline 19999"}
+    assert len(requested) == 3
+    assert tail_links(example, fetched.info_json) == {"stdout": "https://example.com/run/run_stdout"}
+
+
+def test_interrupted_fetch_keeps_previous_logs(tmp_path):
+    """Test that a failed download replaces none of the cached files."""
+    import requests
+    from con_duct_gallery.fetcher import cached_log_paths, fetch_log_files
+    from con_duct_gallery.models import ExampleEntry
+
+    example = ExampleEntry(title="Test Example", info_file="https://example.com/run_info.json")
+    cached = cached_log_paths(example, tmp_path)
+    cached.info_json.parent.mkdir(parents=True)
+    for path in cached.paths:
+        path.write_text("old")
+
+    info = {"output_paths": {"usage": "run_usage.json", "stdout": "run_stdout", "stderr": "run_stderr"}}
+
+    def get(url, **kwargs):
+        response = Mock(headers={}, status_code=200)
+        if url.endswith("run_stdout"):
+            raise requests.ConnectionError("connection reset")
+        response.text = json.dumps(info) if url.endswith("info.json") else "new"
+        response.content = response.text.encode()
+        return response
+
+    with patch('con_duct_gallery.fetcher.requests.get', side_effect=get):
+        with pytest.raises(requests.ConnectionError):
+            fetch_log_files(example, tmp_path, force=True)
+
+    assert [p.read_text() for p in cached.paths] == ["old"] * 4
+    assert sorted(p.name for p in cached.info_json.parent.iterdir()) == sorted(
+        p.name for p in cached.paths
+    )
+
+
+def test_fetch_guard_opens_circuit_per_host():
+    """Test that a failing host is skipped after consecutive failures."""
+    import requests
+    from con_duct_gallery.fetcher import FetchGuard, FetchSkipped
+
+    session = Mock()
+    session.get.side_effect = requests.ConnectTimeout("timed out")
+    guard = FetchGuard(max_failures=2, session=session)
+
+    for _ in range(2):
+        with pytest.raises(requests.ConnectTimeout):
+            guard.get("https://dead.example.org/a", timeout=30)
+    with pytest.raises(FetchSkipped, match="dead.example.org"):
+        guard.get("https://dead.example.org/b")
+    assert session.get.call_count == 2
+    assert guard.is_open("dead.example.org")
+
+    # Other hosts are unaffected, and a success resets the count
+    session.get.side_effect = None
+    session.get.return_value = Mock(status_code=200)
+    guard.get("https://ok.example.org/a")
+    session.get.return_value = Mock(status_code=503)
+    guard.get("https://ok.example.org/a")
+    session.get.return_value = Mock(status_code=404)
+    guard.get("https://ok.example.org/a")
+    guard.get("https://ok.example.org/a")
+    assert not guard.is_open("ok.example.org")
+
+
+def test_fetch_guard_deadline():
+    """Test that timeouts are capped by the deadline and nothing starts after it."""
+    import time
+    from con_duct_gallery.fetcher import FetchGuard, FetchSkipped
+
+    session = Mock()
+    session.head.return_value = Mock(status_code=200)
+    guard = FetchGuard(deadline=time.monotonic() + 5, session=session)
+    guard.head("https://example.org/a", timeout=30)
+    assert session.head.call_args[1]["timeout"] <= 5
+    assert not guard.expired
+
+    expired = FetchGuard.with_budget(0, max_failures=3)
+    assert expired.expired
+    with pytest.raises(FetchSkipped, match="deadline"):
+        expired.get("https://example.org/a")
+    assert FetchGuard.with_budget(None).remaining() is None
@@ -132,3 +132,83 @@ def test_footer_section():
     assert "🛠️" in footer or "Maintenance" in footer
     assert "con-duct-gallery.yaml" in footer or "examples" in footer.lower()
     assert "GitHub Actions" in footer or "automatically" in footer.lower()
+
+
+def test_example_section_with_previews():
+    """Test collapsible stdout/stderr previews."""
+    from pathlib import Path
+    from con_duct_gallery.generator import generate_example_section
+    from con_duct_gallery.models import ExampleEntry
+
+    example = ExampleEntry(title="Test Example", info_file="https://example.com/info.json")
+    log_paths = {k: Path(f"logs/test/{k}") for k in ["info", "usage", "stdout", "stderr"]}
+    section = generate_example_section(
+        example, True, log_paths, "images",
+        previews={"stdout": "done\nexit 0", "stderr": "```fenced```"}
+    )
+
+    assert "<summary>📄 stdout (last 2 lines)</summary>\n\n```text\ndone\nexit 0\n```\n" in section
+    assert "````text\n```fenced```\n````" in section
+    assert "📄" not in generate_example_section(example, True, log_paths, "images")
+
+
+def test_example_section_with_processes():
+    """Test the collapsible top-processes table."""
+    from pathlib import Path
+    from con_duct_gallery.generator import generate_example_section
+    from con_duct_gallery.models import ExampleEntry
+
+    example = ExampleEntry(title="Test Example", info_file="https://example.com/info.json")
+    log_paths = {k: Path(f"logs/test/{k}") for k in ["info", "usage", "stdout", "stderr"]}
+    section = generate_example_section(
+        example, True, log_paths, "images",
+        processes=[
+            {"name": "mriqc", "processes": 4, "peak_rss": 3 * 2**30, "cpu_seconds": 7384},
+            {"name": "a|b", "processes": 1, "peak_rss": 512, "cpu_seconds": 0.25},
+        ]
+    )
+
+    assert "![Memory by process for Test Example](images/test-example-processes.svg)" in section
+    assert "| `mriqc` | 4 | 3.0 GiB | 2h 03m |" in section
+    assert "| `a\\|b` | 1 | 512 B | 0.2s |" in section
+    assert "Top processes" not in generate_example_section(example, True, log_paths, "images")
+
+
+def test_leaderboards_rank_execution_summaries():
+    """Test leaderboards rank examples by info file values and list failed runs."""
+    from con_duct_gallery.generator import generate_leaderboards
+    from con_duct_gallery.models import ExampleEntry
+
+    def entry(title):
+        return ExampleEntry(title=title, info_file=f"https://example.com/{title}.json")
+
+    summaries = [
+        (entry("Small"), {
+            "execution_summary": {"peak_rss": 1024, "wall_clock_time": 3600, "exit_code": 0},
+            "system": {"memory_total": 4096, "cpu_total": 8},
+        }),
+        (entry("Large"), {
+            "execution_summary": {
+                "peak_rss": 2 * 1024 ** 3, "wall_clock_time": 5,
+                "average_pcpu": 250.0, "num_samples": 12, "exit_code": 137,
+            },
+            "system": {},
+        }),
+        (entry("Unparsed"), {}),
+    ]
+
+    markdown = generate_leaderboards(summaries)
+    memory = markdown.split("#### 🧠 Largest memory")[1].split("####")[0]
+    longest = markdown.split("#### ⏱️ Longest runs")[1].split("####")[0]
+    failed = markdown.split("#### ❌ Failed runs")[1]
+
+    assert markdown.startswith("## 🏆 Leaderboards")
+    assert memory.index("[Large](#large)") < memory.index("[Small](#small)")
+    assert longest.index("[Small](#small)") < longest.index("[Large](#large)")
+    assert "| 1.0 KiB (25%) | 1h 00m | — | — | 0 |" in memory
+    assert "| 2.0 GiB | 5.0s | 250% | 12 | 137 (SIGKILL) |" in memory
+    assert "[Large](#large)" in failed and "[Small](#small)" not in failed
+    assert "Unparsed" not in markdown
+
+    assert generate_leaderboards(summaries, limit=1).count("[Small](#small)") == 1
+    assert generate_leaderboards([(entry("Unparsed"), {})]) == ""
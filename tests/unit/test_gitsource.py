@@ -0,0 +1,143 @@
+"""Unit tests for gitsource module."""
+
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+
+def _git(*args, cwd):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=cwd, check=True, capture_output=True
+    )
+
+
+def _make_remote(root: Path, runs=("one", "two")) -> tuple[str, str]:
+    """Commit duct logs of some runs to a bare repository; return its URL and the commit."""
+    work = root / "work"
+    for name in runs:
+        logs = work / "logs" / name
+        logs.mkdir(parents=True)
+        info = {"output_paths": {
+            "usage": f".duct/logs/{name}_usage.json",
+            "stdout": f".duct/logs/{name}_stdout",
+            "stderr": f".duct/logs/{name}_stderr",
+        }}
+        (logs / f"{name}_info.json").write_text(json.dumps(info))
+        usage = {"timestamp": "2024-01-01T00:00:00", "run": name}
+        (logs / f"{name}_usage.json").write_text(json.dumps(usage) + "\n")
+        (logs / f"{name}_stdout").write_text(f"{name} out\n")
+        (logs / f"{name}_stderr").write_text("")
+    (work / "large.bin").write_bytes(b"x" * 100000)
+    _git("init", "-q", cwd=work)
+    _git("add", ".", cwd=work)
+    _git("commit", "-q", "-m", "logs", cwd=work)
+    commit = subprocess.run(
+        ["git", "rev-parse", "HEAD"], cwd=work, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+    bare = root / "remote.git"
+    _git("clone", "-q", "--bare", str(work), str(bare), cwd=root)
+    # As on GitHub, which serves partial clones
+    _git("config", "uploadpack.allowFilter", "true", cwd=bare)
+    _git("config", "uploadpack.allowAnySHA1InWant", "true", cwd=bare)
+    return bare.as_uri(), commit
+
+
+def _example(title, url, commit, run):
+    from con_duct_gallery.models import ExampleEntry
+
+    return ExampleEntry(
+        title=title, info_file=f"logs/{run}/{run}_info.json", git={"url": url, "commit": commit}
+    )
+
+
+def test_repository_fetches_only_needed_blobs(tmp_path):
+    """Test reading files fetches trees and the requested blobs, not the rest."""
+    from con_duct_gallery.gitsource import GitRepository
+
+    url, commit = _make_remote(tmp_path)
+    repo = GitRepository(url, tmp_path / "clones" / "remote.git")
+
+    files = repo.read(commit, ["logs/one/one_stdout", "logs/two/two_stdout"])
+    assert files == {"logs/one/one_stdout": b"one out\n", "logs/two/two_stdout": b"two out\n"}
+    large = repo.blob_ids(commit, ["large.bin"])["large.bin"]
+    assert large not in repo._present()
+
+    with pytest.raises(FileNotFoundError, match="missing.json"):
+        repo.read(commit, ["missing.json"])
+
+
+def test_prefetch_then_read_without_network(tmp_path, monkeypatch):
+    """Test prefetching a repository's examples takes three fetches, then reads are local."""
+    from con_duct_gallery.gitsource import GitRepository, GitSources, fetch_git_logs
+
+    url, commit = _make_remote(tmp_path)
+    examples = [_example("Run One", url, commit, "one"), _example("Run Two", url, commit, "two")]
+    sources = GitSources(tmp_path / "clones")
+
+    fetches = []
+    fetch = GitRepository._fetch
+
+    def counted(self, wants, shallow):
+        fetches.append(wants)
+        fetch(self, wants, shallow)
+
+    monkeypatch.setattr(GitRepository, "_fetch", counted)
+    sources.prefetch(examples)
+    assert len(fetches) == 3  # commit, info files, logs
+
+    def offline(self, wants, shallow):
+        raise AssertionError(f"unexpected fetch of {wants}")
+
+    monkeypatch.setattr(GitRepository, "_fetch", offline)
+    fetched = fetch_git_logs(examples[1], tmp_path / "logs", sources)
+    assert fetched.usage_json == tmp_path / "logs" / "run-two" / "example_output_usage.json"
+    assert '"run": "two"' in fetched.usage_json.read_text()
+    assert fetched.stdout.read_text() == "two out\n"
+    info = json.loads(fetched.info_json.read_text())
+    assert info["output_paths"]["usage"].endswith("two_usage.json")
+    assert fetched.bytes_downloaded > 0
+
+    # Files in place are reused without reading the repository
+    assert fetch_git_logs(examples[1], tmp_path / "logs", sources).bytes_downloaded == 0
+
+
+def test_git_processes_per_example(tmp_path, monkeypatch):
+    """Test objects and trees are listed once and each example is read by one process."""
+    from con_duct_gallery.gitsource import GitSources, fetch_git_logs
+
+    url, commit = _make_remote(tmp_path)
+    examples = [_example(f"Run {run}", url, commit, run) for run in ("one", "two")]
+    sources = GitSources(tmp_path / "clones")
+
+    commands = []
+    popen = subprocess.Popen
+
+    def counted(args, **kwargs):
+        # subprocess.run starts its process through Popen too
+        commands.append(args[3])
+        return popen(args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "Popen", counted)
+    sources.prefetch(examples)
+    assert commands.count("ls-tree") == 1
+    assert commands.count("fetch") == 3
+    # init, remote add, listing the objects once, and reading all info files at once
+    assert len(commands) == 8
+
+    commands.clear()
+    for example in examples:
+        fetch_git_logs(example, tmp_path / "logs", sources)
+    assert commands == ["cat-file", "cat-file"]
+
+
+def test_unreachable_repository(tmp_path):
+    """Test fetch failures are reported as GitError."""
+    from con_duct_gallery.gitsource import GitError, GitSources, fetch_git_logs
+
+    example = _example("Gone", (tmp_path / "missing.git").as_uri(), "0" * 40, "one")
+    with pytest.raises(GitError, match="fetch failed"):
+        fetch_git_logs(example, tmp_path / "logs", GitSources())
@@ -0,0 +1,137 @@
+"""Unit tests for history module."""
+
+from pathlib import Path
+
+import pytest
+
+
+def summary(wall, peak_rss, exit_code=0):
+    return {
+        "exit_code": exit_code, "wall_clock_time": wall, "peak_rss": peak_rss,
+        "average_pcpu": 50.0, "num_samples": 10, "start_time": 1.0, "end_time": 1.0 + wall,
+    }
+
+
+def test_record_run_once_per_info_file(tmp_path):
+    """Test runs are keyed by info hash and derive statistics."""
+    from con_duct_gallery.history import RunHistory
+
+    with RunHistory(tmp_path / "db" / "history.sqlite") as history:
+        assert history.record_run("a", "h1", summary(100, 2048), {"memory_total": 4096}, 10.0)
+        assert not history.record_run("a", "h1", summary(100, 2048), {}, 20.0)
+        row = history.connection.execute(
+            "SELECT recorded_at, exit_code, cpu_seconds, memory_fraction, peak_vsz FROM runs"
+        ).fetchall()
+    assert row == [(10.0, 0, 50.0, 0.5, None)]
+
+    # Reopening keeps the data and schema
+    with RunHistory(tmp_path / "db" / "history.sqlite") as history:
+        assert history.record_run("a", "h2", summary(120, 4096), {}, 30.0)
+        assert history.connection.execute("SELECT COUNT(*) FROM runs").fetchone() == (2,)
+
+
+def test_top_and_growth_queries(tmp_path):
+    """Test ranking latest runs and comparing them to a baseline."""
+    from con_duct_gallery.history import RunHistory
+
+    with RunHistory(tmp_path / "history.sqlite") as history:
+        history.set_examples([
+            ("a", "Run A", ["mriqc"]), ("b", "Run B", ["mriqc"]), ("c", "Run C", []),
+        ])
+        history.record_run("a", "a1", summary(100, 10), recorded_at=100)
+        history.record_run("b", "b1", summary(100, 30), recorded_at=100)
+        history.record_run("c", "c1", summary(100, 20), recorded_at=100)
+        history.record_run("a", "a2", summary(150, 40), recorded_at=200)
+        history.record_run("b", "b2", summary(110, 5), recorded_at=200)
+        history.record_run("d", "d1", summary(500, 50), recorded_at=200)
+
+        top = history.top("peak_rss", limit=3)
+        assert [(r.slug, r.title, r.values) for r in top] == [
+            ("d", "d", (50,)), ("a", "Run A", (40,)), ("c", "Run C", (20,))
+        ]
+        assert [r.slug for r in history.top("peak_rss", tag="mriqc")] == ["a", "b"]
+
+        grown = history.growth("wall_clock_time", since=150, threshold=5)
+        assert [(r.slug, r.values) for r in grown] == [
+            ("a", (100, 150, 50.0)), ("b", (100, 110, 10.0))
+        ]
+        assert history.growth("wall_clock_time", since=150, threshold=20) == grown[:1]
+        assert history.growth("wall_clock_time", since=50) == []
+
+        with pytest.raises(ValueError, match="Unknown metric"):
+            history.top("peak_rss; DROP TABLE runs")
+
+        history.set_examples([("a", "Run A", [])])
+        assert history.top("peak_rss", tag="mriqc") == []
+
+
+def test_parse_since():
+    """Test relative ages and ISO dates."""
+    from datetime import datetime
+    from con_duct_gallery.history import parse_since
+
+    assert parse_since("30d", now=100 * 86400) == 70 * 86400
+    assert parse_since("2w", now=100 * 86400) == 86 * 86400
+    assert parse_since("2025-09-01") == datetime(2025, 9, 1).timestamp()
+    with pytest.raises(ValueError):
+        parse_since("last month")
+
+
+def test_record_build(tmp_path):
+    """Test recording the fetched examples of a build."""
+    from con_duct_gallery.history import RunHistory, record_build
+    from con_duct_gallery.manifest import BuildManifest
+    from con_duct_gallery.models import ExampleRegistry
+    from con_duct_gallery.pipeline import ExampleResult
+
+    info = tmp_path / "info.json"
+    info.write_text("{}")
+    registry = ExampleRegistry(examples=[
+        {"title": "Run One", "info_file": "one.json", "tags": ["x"]},
+        {"title": "Run Two", "info_file": "two.json"},
+    ])
+    one, two = registry.examples
+    results = [
+        ExampleResult(one, {"info": info}, {"execution_summary": summary(5, 1)}, None),
+        ExampleResult(two, None, {}, None, fetch_error="offline"),
+    ]
+
+    with RunHistory(tmp_path / "history.sqlite") as history:
+        assert record_build(history, registry, results, BuildManifest()) == 1
+        assert record_build(history, registry, results, BuildManifest()) == 0
+        assert [r.title for r in history.top("wall_clock_time", tag="x")] == ["Run One"]
+
+
+def test_distribution_columns_and_migration(tmp_path):
+    """Test distribution columns are added to old databases and filled in later."""
+    import sqlite3
+    from con_duct_gallery.history import RunHistory
+
+    path = tmp_path / "history.sqlite"
+    with sqlite3.connect(path) as connection:
+        connection.executescript(
+            "CREATE TABLE runs (id INTEGER PRIMARY KEY, slug TEXT NOT NULL, "
+            "info_hash TEXT NOT NULL, recorded_at REAL NOT NULL, start_time REAL, "
+            "end_time REAL, exit_code INTEGER, wall_clock_time REAL, peak_rss REAL, "
+            "average_rss REAL, peak_vsz REAL, average_vsz REAL, peak_pmem REAL, "
+            "average_pmem REAL, peak_pcpu REAL, average_pcpu REAL, num_samples REAL, "
+            "num_reports REAL, cpu_seconds REAL, memory_fraction REAL, "
+            "UNIQUE (slug, info_hash));"
+            "PRAGMA user_version = 1;"
+        )
+    connection.close()
+
+    distribution = {
+        "reports": 10, "duration": 100.0,
+        "rss": {"p50": 10, "p90": 20, "p99": 30, "peak": 32, "time_above": 5.0},
+        "pcpu": {"p50": 50, "p90": 90, "p99": 99, "peak": 100, "time_above": 20.0},
+    }
+    with RunHistory(path) as history:
+        assert history.record_run("a", "h1", summary(100, 32), recorded_at=10.0)
+        assert not history.record_run("a", "h1", summary(100, 32), distribution=distribution)
+        assert history.connection.execute("PRAGMA user_version").fetchone() == (2,)
+        assert [(r.slug, r.values) for r in history.top("rss_p90")] == [("a", (20,))]
+        row = history.connection.execute(
+            "SELECT recorded_at, rss_p99, pcpu_p50, pcpu_time_above FROM runs"
+        ).fetchone()
+    assert row == (10.0, 30, 50, 20.0)
@@ -0,0 +1,137 @@
+"""Unit tests for images module."""
+
+import os
+
+import pytest
+
+
+def _render(alias, text):
+    from con_duct_gallery.images import image_output
+
+    with image_output(alias) as tmp:
+        tmp.write_text(text)
+
+
+def test_image_output_stores_by_content(tmp_path):
+    """Test a render is stored once by hash and linked from its alias."""
+    from con_duct_gallery.images import OBJECTS_DIR, resolve_alias
+    from con_duct_gallery.manifest import hash_bytes
+
+    _render(tmp_path / "a.svg", "<svg>a</svg>")
+    _render(tmp_path / "b.svg", "<svg>a</svg>")
+
+    objects = sorted((tmp_path / OBJECTS_DIR).iterdir())
+    assert [p.name for p in objects] == [hash_bytes(b"<svg>a</svg>") + ".svg"]
+    assert resolve_alias(tmp_path / "a.svg") == resolve_alias(tmp_path / "b.svg") == objects[0]
+    # Aliases are regular files sharing the object's storage
+    assert not (tmp_path / "a.svg").is_symlink()
+    assert os.path.samefile(tmp_path / "a.svg", objects[0])
+    assert (tmp_path / "b.svg").read_text() == "<svg>a</svg>"
+
+
+def test_identical_rerender_touches_nothing(tmp_path):
+    """Test re-rendering the same bytes leaves the object and alias as they were."""
+    from con_duct_gallery.images import resolve_alias
+
+    alias = tmp_path / "a.svg"
+    _render(alias, "<svg>a</svg>")
+    target = resolve_alias(alias)
+    os.utime(target, ns=(1, 1))
+    alias_mtime = alias.lstat().st_mtime_ns
+
+    _render(alias, "<svg>a</svg>")
+
+    assert target.stat().st_mtime_ns == 1
+    assert alias.lstat().st_mtime_ns == alias_mtime
+    assert not any(p.name.startswith(".") for p in target.parent.iterdir())
+
+
+def test_changed_render_relinks_and_prune(tmp_path):
+    """Test new content moves the alias and pruning drops the old object."""
+    from con_duct_gallery.images import prune_objects, resolve_alias
+
+    alias = tmp_path / "a.svg"
+    _render(alias, "<svg>old</svg>")
+    old = resolve_alias(alias)
+    _render(alias, "<svg>new</svg>")
+    new = resolve_alias(alias)
+
+    assert new != old
+    assert alias.read_text() == "<svg>new</svg>"
+    assert prune_objects(tmp_path) == [old]
+    assert not old.exists() and new.exists()
+    assert prune_objects(tmp_path) == []
+
+    # An alias no longer generated goes, and with it its object
+    assert prune_objects(tmp_path, aliases={"b.svg"}) == [alias, new]
+    assert list(tmp_path.iterdir()) == [new.parent]
+
+
+def test_failed_render_leaves_alias(tmp_path):
+    """Test a render that raises does not touch the store or the alias."""
+    from con_duct_gallery.images import OBJECTS_DIR, image_output
+
+    alias = tmp_path / "a.svg"
+    _render(alias, "<svg>a</svg>")
+
+    with pytest.raises(RuntimeError):
+        with image_output(alias) as tmp:
+            tmp.write_text("<svg>trunc")
+            raise RuntimeError("renderer crashed")
+
+    assert alias.read_text() == "<svg>a</svg>"
+    assert len(list((tmp_path / OBJECTS_DIR).iterdir())) == 1
+
+
+def test_alias_copy_without_hard_links(tmp_path, monkeypatch):
+    """Test aliases fall back to copies, which keep their objects from pruning."""
+    from con_duct_gallery.images import prune_objects, resolve_alias
+
+    def no_link(*args):
+        raise OSError("hard links not supported")
+
+    monkeypatch.setattr(os, "link", no_link)
+    alias = tmp_path / "a.svg"
+    _render(alias, "<svg>a</svg>")
+    target = resolve_alias(alias)
+    mtime = alias.stat().st_mtime_ns
+
+    assert not os.path.samefile(alias, target)
+    assert alias.read_text() == "<svg>a</svg>"
+    assert prune_objects(tmp_path) == []
+    # A copy with the right content, e.g. from a checkout, is left alone
+    _render(alias, "<svg>a</svg>")
+    assert alias.stat().st_mtime_ns == mtime
+
+
+def test_con_duct_rerender_is_stored_once(tmp_path):
+    """Test rendering the same log twice with con-duct keeps one untouched object."""
+    import json
+    import shutil
+
+    from con_duct_gallery.images import OBJECTS_DIR, image_output
+    from con_duct_gallery.plotter import generate_plot
+
+    if shutil.which("con-duct") is None:
+        pytest.skip("con-duct is not installed")
+    usage = tmp_path / "usage.json"
+    usage.write_text("".join(
+        json.dumps({
+            "timestamp": f"2024-01-01T00:00:0{i}+00:00",
+            "num_samples": 1,
+            "processes": {},
+            "totals": {"pmem": 1.0, "pcpu": 10.0 * i, "rss": 1000 * (i + 1), "vsz": 2000},
+        }) + "\n"
+        for i in range(5)
+    ))
+    alias = tmp_path / "images" / "a.svg"
+
+    with image_output(alias) as tmp:
+        generate_plot(usage, tmp)
+    (target,) = (alias.parent / OBJECTS_DIR).iterdir()
+    os.utime(target, ns=(1, 1))
+    with image_output(alias) as tmp:
+        generate_plot(usage, tmp)
+
+    assert list((alias.parent / OBJECTS_DIR).iterdir()) == [target]
+    assert target.stat().st_mtime_ns == 1
@@ -0,0 +1,137 @@
+"""Unit tests for manifest module."""
+
+import json
+import os
+
+import pytest
+from pathlib import Path
+
+
+def test_hash_data_is_key_order_independent():
+    """Test that equal mappings hash identically."""
+    from con_duct_gallery.manifest import hash_data
+
+    assert hash_data({"a": 1, "b": [1, 2]}) == hash_data({"b": [1, 2], "a": 1})
+    assert hash_data({"a": 1}) != hash_data({"a": 2})
+
+
+def test_manifest_roundtrip(tmp_path):
+    """Test saving and loading stage records."""
+    from con_duct_gallery.manifest import BuildManifest, StageRecord
+
+    path = tmp_path / "state" / "manifest.json"
+    manifest = BuildManifest(path)
+    manifest.record("plot:example", StageRecord({"usage": "abc"}, {"out.svg": "def"}, {"k": 1}))
+    manifest.save()
+
+    loaded = BuildManifest.load(path)
+    record = loaded.get("plot:example")
+    assert record.inputs == {"usage": "abc"}
+    assert record.outputs == {"out.svg": "def"}
+    assert record.result == {"k": 1}
+    assert not path.with_name("manifest.json.tmp").exists()
+
+
+def test_manifest_load_missing_or_corrupt(tmp_path):
+    """Test that a missing or corrupt manifest loads empty."""
+    from con_duct_gallery.manifest import BuildManifest
+
+    assert BuildManifest.load(tmp_path / "missing.json").records == {}
+
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text("{not json")
+    assert BuildManifest.load(corrupt).records == {}
+
+
+def test_manifest_hash_file_tracks_changes(tmp_path):
+    """Test that file hashes follow content changes."""
+    from con_duct_gallery.manifest import BuildManifest
+
+    manifest = BuildManifest()
+    path = tmp_path / "usage.json"
+
+    assert manifest.hash_file(path) is None
+
+    path.write_text("one")
+    first = manifest.hash_file(path)
+    assert manifest.hash_file(path) == first
+
+    path.write_text("two!")
+    second = manifest.hash_file(path)
+    assert second != first
+
+    # A same-size rewrite in place with its mtime restored is rehashed too
+    mtime = path.stat().st_mtime_ns
+    with open(path, "r+") as f:
+        f.write("owt!")
+    os.utime(path, ns=(mtime, mtime))
+    assert path.stat().st_mtime_ns == mtime
+    assert manifest.hash_file(path) not in (first, second)
+
+
+def test_manifest_rehashes_files_of_old_signature(tmp_path):
+    """Test file entries recorded with an older stat signature are rehashed."""
+    from con_duct_gallery.manifest import MANIFEST_VERSION, BuildManifest, hash_bytes
+
+    path = tmp_path / "usage.json"
+    path.write_text("new")
+    st = path.stat()
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps({
+        "version": MANIFEST_VERSION,
+        "stages": {},
+        "files": {str(path): [st.st_size, st.st_mtime_ns, hash_bytes(b"old")]},
+    }))
+
+    assert BuildManifest.load(manifest_path).hash_file(path) == hash_bytes(b"new")
+
+
+def test_manifest_journal_resumes_interrupted_build(tmp_path):
+    """Test that stages recorded before a crash survive without a save."""
+    from con_duct_gallery.manifest import BuildManifest, StageRecord
+
+    path = tmp_path / "state" / "manifest.json"
+    output = tmp_path / "out.svg"
+    output.write_text("<svg/>")
+
+    manifest = BuildManifest(path)
+    manifest.record("fetch:a", StageRecord({"source": "1"}, {}, {}))
+    manifest.save()
+    digest = manifest.hash_file(output)
+    manifest.record("plot:a", StageRecord({"usage": "abc"}, {str(output): digest}, {}))
+    # Killed here: no save, and a torn entry from the stage that was running
+    with open(manifest.journal_path, "ab") as f:
+        f.write(b'{"stage": "plot:b", "rec')
+    del manifest
+
+    resumed = BuildManifest.load(path)
+    assert set(resumed.records) == {"fetch:a", "plot:a"}
+    assert resumed._file_hashes[str(output)][-1] == digest
+
+    # Entries appended after the torn one are still readable
+    resumed.record("plot:c", StageRecord({}, {}, {}))
+    assert "plot:c" in BuildManifest.load(path).records
+
+    resumed.save()
+    assert not resumed.journal_path.exists()
+    assert set(BuildManifest.load(path).records) == {"fetch:a", "plot:a", "plot:c"}
+
+
+def test_manifest_journal_syncs_once_per_batch(tmp_path, monkeypatch):
+    """Test recording stages does not fsync; sync covers all of them at once."""
+    from con_duct_gallery import manifest as manifest_module
+    from con_duct_gallery.manifest import BuildManifest, StageRecord
+
+    synced = []
+    monkeypatch.setattr(manifest_module.os, "fsync", synced.append)
+    manifest = BuildManifest(tmp_path / "manifest.json")
+    manifest.sync()
+    for stage in ("fetch:a", "parse:a", "plot:a"):
+        manifest.record(stage, StageRecord({}, {}, {}))
+    assert synced == []
+
+    manifest.sync()
+    manifest.sync()
+    assert len(synced) == 1
+    # Recorded entries reach the OS before any sync
+    assert len(manifest.journal_path.read_text().splitlines()) == 3
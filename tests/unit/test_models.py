@@ -126,3 +126,63 @@ def test_at_least_one_example_required():
     with pytest.raises(ValidationError) as exc:
         ExampleRegistry(examples=[])
     assert "At least one example" in str(exc.value)
+
+
+def test_renderer_validated():
+    """Test per-example renderer selection."""
+    from con_duct_gallery.models import ExampleEntry
+
+    assert ExampleEntry(title="Test", info_file="a.json").renderer is None
+    assert ExampleEntry(title="Test", info_file="a.json", renderer="native").renderer == "native"
+    with pytest.raises(ValidationError):
+        ExampleEntry(title="Test", info_file="a.json", renderer="gnuplot")
+
+
+def test_process_options_validated():
+    """Test per-example process breakdown settings."""
+    from con_duct_gallery.models import ExampleEntry
+
+    assert ExampleEntry(title="Test", info_file="a.json").processes is None
+    example = ExampleEntry(title="Test", info_file="a.json", processes={})
+    assert example.processes.top == 8 and example.processes.group is None
+    assert example.processes.rank == "rss"
+    with pytest.raises(ValidationError):
+        ExampleEntry(title="Test", info_file="a.json", processes={"group": "(a)(b)"})
+    with pytest.raises(ValidationError):
+        ExampleEntry(title="Test", info_file="a.json", processes={"group": "("})
+    with pytest.raises(ValidationError):
+        ExampleEntry(title="Test", info_file="a.json", processes={"top": 0})
+    with pytest.raises(ValidationError):
+        ExampleEntry(title="Test", info_file="a.json", processes={"rank": "pids"})
+
+
+def test_git_source_validated():
+    """Test git sources need a full commit and a path inside the repository."""
+    from con_duct_gallery.models import ExampleEntry
+
+    commit = "0123456789abcdef0123456789ABCDEF01234567"
+    example = ExampleEntry(
+        title="Test", info_file="logs/run_info.json",
+        git={"url": "https://github.com/con/duct", "commit": commit}
+    )
+    assert example.git.commit == commit.lower()
+    assert not example.is_local
+    assert ExampleEntry(title="Test", info_file="a.json").is_local
+
+    with pytest.raises(ValidationError):
+        ExampleEntry(title="Test", info_file="a.json", git={"url": "x", "commit": "0123abc"})
+    for path in ("/abs/info.json", "../info.json", "https://example.com/info.json"):
+        with pytest.raises(ValidationError):
+            ExampleEntry(title="Test", info_file=path, git={"url": "x", "commit": commit})
+
+
+def test_archive_members():
+    """Test info_file can name a member of an archive."""
+    from con_duct_gallery.models import ExampleEntry
+
+    example = ExampleEntry(title="Test", info_file="jobs/run.tar.gz#.duct/logs/run_info.json")
+    assert example.archive == ("jobs/run.tar.gz", ".duct/logs/run_info.json")
+    assert not example.is_local
+    remote = ExampleEntry(title="Test", info_file="https://example.com/run.zip#run_info.json")
+    assert remote.archive == ("https://example.com/run.zip", "run_info.json")
+    assert ExampleEntry(title="Test", info_file="logs/run#1/info.json").archive is None
@@ -0,0 +1,445 @@
+"""Unit tests for pipeline module."""
+
+import json
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+
+def _make_stage(name, inputs, outputs, calls):
+    from con_duct_gallery.pipeline import Stage
+
+    def action(reason):
+        calls.append(reason)
+        for path in outputs:
+            path.write_text(f"{name} output")
+        return {"value": len(calls)}
+
+    return Stage(name, "example", inputs, outputs, action)
+
+
+def test_runner_runs_only_outdated_stages(tmp_path):
+    """Test make-style execution with reasons."""
+    from con_duct_gallery.manifest import BuildManifest
+    from con_duct_gallery.pipeline import PipelineRunner
+
+    runner = PipelineRunner(BuildManifest())
+    out = tmp_path / "out.svg"
+    calls = []
+
+    first = runner.run(_make_stage("plot", {"usage": "a"}, [out], calls))
+    assert first.ran and first.reason == "never built"
+
+    second = runner.run(_make_stage("plot", {"usage": "a"}, [out], calls))
+    assert not second.ran
+    assert second.result == {"value": 1}
+
+    third = runner.run(_make_stage("plot", {"usage": "b"}, [out], calls))
+    assert third.ran and third.reason == "inputs changed: usage"
+
+    out.write_text("edited by hand")
+    fourth = runner.run(_make_stage("plot", {"usage": "b"}, [out], calls))
+    assert fourth.ran and fourth.reason.startswith("output modified")
+
+    out.unlink()
+    fifth = runner.run(_make_stage("plot", {"usage": "b"}, [out], calls))
+    assert fifth.ran and fifth.reason.startswith("output missing")
+
+    assert len(calls) == 4
+
+
+def test_runner_force_and_failures(tmp_path):
+    """Test forced runs and that failed stages are not recorded."""
+    from con_duct_gallery.manifest import BuildManifest
+    from con_duct_gallery.pipeline import PipelineRunner, Stage
+
+    manifest = BuildManifest()
+    calls = []
+    PipelineRunner(manifest).run(_make_stage("parse", {"info": "x"}, [], calls))
+
+    forced = PipelineRunner(manifest, force=True).run(_make_stage("parse", {"info": "x"}, [], calls))
+    assert forced.ran and forced.reason == "forced"
+
+    def boom(reason):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        PipelineRunner(manifest).run(Stage("plot", "other", {}, [], boom))
+    assert manifest.get("plot:other") is None
+
+
+def _write_local_example(root: Path) -> Path:
+    """Write a minimal local duct log set and return its info path."""
+    logs = root / "logs" / "run"
+    logs.mkdir(parents=True)
+    info = {
+        "execution_summary": {"exit_code": 0, "peak_rss": 1024},
+        "system": {"cpu_total": 4},
+        "output_paths": {
+            "usage": ".duct/logs/run_usage.json",
+            "stdout": ".duct/logs/run_stdout",
+            "stderr": ".duct/logs/run_stderr",
+            "info": ".duct/logs/run_info.json",
+        },
+    }
+    (logs / "run_info.json").write_text(json.dumps(info))
+    (logs / "run_usage.json").write_text('{"timestamp": "2024-01-01T00:00:00"}\n')
+    (logs / "run_stdout").write_text("hello\n")
+    (logs / "run_stderr").write_text("")
+    return logs / "run_info.json"
+
+
+@patch('con_duct_gallery.pipeline.generate_plot')
+def test_gallery_pipeline_incremental(mock_plot, tmp_path):
+    """Test that a second build only reruns stages whose inputs changed."""
+    from con_duct_gallery.models import ExampleEntry, ExampleRegistry
+    from con_duct_gallery.pipeline import BuildOptions, GalleryPipeline
+
+    info_path = _write_local_example(tmp_path)
+
+    def fake_plot(usage, svg, opts, **kwargs):
+        svg.parent.mkdir(parents=True, exist_ok=True)
+        svg.write_text("<svg/>")
+
+    mock_plot.side_effect = fake_plot
+
+    registry = ExampleRegistry(examples=[
+        ExampleEntry(title="Local Run", info_file="logs/run/run_info.json")
+    ])
+    options = BuildOptions(
+        output=tmp_path / "README.md",
+        log_dir=tmp_path / "logs",
+        image_dir=tmp_path / "images",
+        manifest=tmp_path / "manifest.json",
+        repo_root=tmp_path
+    )
+
+    def build():
+        pipeline = GalleryPipeline(options)
+        results = [pipeline.build_example(e) for e in registry.examples]
+        pipeline.render(registry, results)
+        pipeline.save()
+        return pipeline, results
+
+    pipeline, results = build()
+    assert results[0].summary["execution_summary"]["peak_rss"] == 1024
+    assert all(o.ran for o in pipeline.runner.outcomes)
+    assert mock_plot.call_count == 1
+    assert "### Local Run" in options.output.read_text()
+
+    pipeline, _ = build()
+    assert not any(o.ran for o in pipeline.runner.outcomes)
+    assert mock_plot.call_count == 1
+
+    (info_path.parent / "run_usage.json").write_text('{"timestamp": "2024-01-02T00:00:00"}\n')
+    pipeline, _ = build()
+    ran = {o.name: o.reason for o in pipeline.runner.outcomes if o.ran}
+    assert ran == {"plot": "inputs changed: usage", "distribution": "inputs changed: usage"}
+    assert mock_plot.call_count == 2
+
+
+@patch('con_duct_gallery.pipeline.generate_plot')
+def test_leaderboards_follow_info_files(mock_plot, tmp_path):
+    """Test leaderboards are re-ranked from info files without replotting."""
+    from con_duct_gallery.models import ExampleEntry, ExampleRegistry
+    from con_duct_gallery.pipeline import BuildOptions, GalleryPipeline
+
+    info_path = _write_local_example(tmp_path)
+
+    def fake_plot(usage, svg, opts, **kwargs):
+        svg.write_text("<svg/>")
+
+    mock_plot.side_effect = fake_plot
+
+    registry = ExampleRegistry(examples=[
+        ExampleEntry(title="Local Run", info_file="logs/run/run_info.json")
+    ])
+    options = BuildOptions(
+        output=tmp_path / "README.md",
+        log_dir=tmp_path / "logs",
+        image_dir=tmp_path / "images",
+        manifest=tmp_path / "manifest.json",
+        repo_root=tmp_path
+    )
+
+    def build():
+        pipeline = GalleryPipeline(options)
+        pipeline.render(registry, pipeline.build_examples(registry.examples))
+        pipeline.save()
+        return {o.name for o in pipeline.runner.outcomes if o.ran}
+
+    build()
+    readme = options.output.read_text()
+    assert "#### 🧠 Largest memory" in readme
+    assert "Failed runs" not in readme
+
+    info = json.loads(info_path.read_text())
+    info["execution_summary"]["exit_code"] = 137
+    info_path.write_text(json.dumps(info))
+    assert build() == {"fetch", "parse", "render"}
+    assert "| [Local Run](#local-run) | 1.0 KiB | — | — | — | 137 (SIGKILL) |" in options.output.read_text()
+    assert mock_plot.call_count == 1
+
+
+@patch('con_duct_gallery.pipeline.generate_plot')
+def test_streaming_build_preserves_registry_order(mock_plot, tmp_path):
+    """Test that streamed builds return results in registry order."""
+    from con_duct_gallery.models import ExampleEntry, ExampleRegistry
+    from con_duct_gallery.pipeline import BuildOptions, GalleryPipeline
+
+    _write_local_example(tmp_path)
+
+    def fake_plot(usage, svg, opts, **kwargs):
+        svg.parent.mkdir(parents=True, exist_ok=True)
+        svg.write_text("<svg/>")
+
+    mock_plot.side_effect = fake_plot
+
+    examples = [
+        ExampleEntry(title=f"Run {i}", info_file="logs/run/run_info.json")
+        for i in range(8)
+    ] + [ExampleEntry(title="Missing", info_file="logs/missing_info.json")]
+    registry = ExampleRegistry(examples=examples)
+    options = BuildOptions(
+        output=tmp_path / "README.md",
+        log_dir=tmp_path / "logs",
+        image_dir=tmp_path / "images",
+        manifest=None,
+        repo_root=tmp_path
+    )
+
+    pipeline = GalleryPipeline(options)
+    results = pipeline.build_examples(registry.examples, jobs=3)
+
+    assert [r.example.title for r in results] == [e.title for e in examples]
+    assert all(r.section.startswith(f"### Run {i}") for i, r in enumerate(results[:8]))
+    assert results[-1].fetch_error is not None
+    assert results[-1].section is None
+
+    pipeline.render(registry, results)
+    readme = options.output.read_text()
+    assert readme.index("### Run 0") < readme.index("### Run 7")
+    assert "### Missing" not in readme
+
+
+def test_fetch_serves_stale_cache_when_host_is_down(tmp_path):
+    """Test that a forced refetch of an unreachable example keeps its intact logs."""
+    import requests
+    from con_duct_gallery.fetcher import cached_log_paths
+    from con_duct_gallery.models import ExampleEntry
+    from con_duct_gallery.pipeline import BuildOptions, GalleryPipeline
+
+    example = ExampleEntry(title="Remote Run", info_file="https://dead.example.org/run_info.json")
+    options = BuildOptions(log_dir=tmp_path / "logs", manifest=tmp_path / "manifest.json")
+    cached = cached_log_paths(example, options.log_dir)
+    cached.info_json.parent.mkdir(parents=True)
+    for path in cached.paths:
+        path.write_text("{}")
+
+    # First build trusts the files found in the cache
+    pipeline = GalleryPipeline(options)
+    assert pipeline.fetch_example(example).log_paths is not None
+    pipeline.save()
+
+    with patch('con_duct_gallery.fetcher.requests.get',
+               side_effect=requests.ConnectionError("refused")) as mock_get:
+        pipeline = GalleryPipeline(options._replace(force=True, host_failures=1))
+        result = pipeline.fetch_example(example)
+        assert result.log_paths["usage"] == cached.usage_json
+        assert result.fetch_error is None
+        assert mock_get.call_count == 1
+
+        # A tampered cache is not served
+        cached.usage_json.write_text("{partial")
+        pipeline = GalleryPipeline(options._replace(force=True))
+        assert pipeline.fetch_example(example).fetch_error == "refused"
+
+
+@patch('con_duct_gallery.pipeline.generate_plot')
+def test_deadline_skips_outdated_plots(mock_plot, tmp_path):
+    """Test that past the deadline, outdated plots are left for the next build."""
+    from con_duct_gallery.models import ExampleEntry
+    from con_duct_gallery.pipeline import BuildOptions, GalleryPipeline
+
+    _write_local_example(tmp_path)
+    example = ExampleEntry(title="Local Run", info_file="logs/run/run_info.json")
+    options = BuildOptions(
+        output=tmp_path / "README.md",
+        image_dir=tmp_path / "images",
+        manifest=tmp_path / "manifest.json",
+        repo_root=tmp_path,
+        deadline=0
+    )
+
+    pipeline = GalleryPipeline(options)
+    result = pipeline.build_example(example)
+    mock_plot.assert_not_called()
+    assert result.log_paths is not None and result.plot_error is None
+    assert "Plot not available" in result.section
+    assert pipeline.manifest.get("plot:local-run") is None
+
+
+@patch('con_duct_gallery.pipeline.generate_plot')
+def test_identical_plots_are_stored_once(mock_plot, tmp_path):
+    """Test examples with identical plots share one stored image."""
+    from con_duct_gallery.images import OBJECTS_DIR, resolve_alias
+    from con_duct_gallery.models import ExampleEntry, ExampleRegistry
+    from con_duct_gallery.pipeline import BuildOptions, GalleryPipeline
+
+    _write_local_example(tmp_path)
+
+    def fake_plot(usage, svg, opts, **kwargs):
+        svg.write_text("<svg/>")
+
+    mock_plot.side_effect = fake_plot
+
+    registry = ExampleRegistry(examples=[
+        ExampleEntry(title=title, info_file="logs/run/run_info.json")
+        for title in ("First", "Second")
+    ])
+    options = BuildOptions(
+        output=tmp_path / "README.md",
+        log_dir=tmp_path / "logs",
+        image_dir=tmp_path / "images",
+        manifest=None,
+        repo_root=tmp_path,
+        force=True
+    )
+
+    for _ in range(2):
+        pipeline = GalleryPipeline(options)
+        pipeline.render(registry, pipeline.build_examples(registry.examples))
+        assert pipeline.prune_images(registry.examples) == []
+
+    images = options.image_dir
+    assert mock_plot.call_count == 4
+    assert len(list((images / OBJECTS_DIR).iterdir())) == 1
+    assert resolve_alias(images / "first.svg") == resolve_alias(images / "second.svg")
+    assert "](" + str(images) + "/second.svg)" in options.output.read_text()
+
+    # Renaming an example drops the plot under its old name
+    (images / "notes.txt").write_text("kept")
+    (stored,) = (images / OBJECTS_DIR).iterdir()
+    removed = GalleryPipeline(options).prune_images(registry.examples[:1])
+    assert removed == [images / "second.svg"]
+    assert sorted(p.name for p in images.iterdir()) == ["first.svg", "notes.txt", OBJECTS_DIR]
+    assert stored.exists()
+
+
+@patch('con_duct_gallery.pipeline.generate_plot')
+def test_git_examples_are_fetched_once_per_repository(mock_plot, tmp_path):
+    """Test git examples are prefetched together and up to date on the next build."""
+    import subprocess
+    from con_duct_gallery.gitsource import GitRepository
+    from con_duct_gallery.models import ExampleEntry, ExampleRegistry
+    from con_duct_gallery.pipeline import BuildOptions, GalleryPipeline
+
+    def git(*args, cwd):
+        subprocess.run(
+            ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+            cwd=cwd, check=True, capture_output=True
+        )
+
+    work = tmp_path / "work"
+    for name in ("one", "two"):
+        _write_local_example(work / name)
+    git("init", "-q", cwd=work)
+    git("add", ".", cwd=work)
+    git("commit", "-q", "-m", "logs", cwd=work)
+    commit = subprocess.run(
+        ["git", "rev-parse", "HEAD"], cwd=work, check=True, capture_output=True, text=True
+    ).stdout.strip()
+    git("clone", "-q", "--bare", str(work), str(tmp_path / "remote.git"), cwd=tmp_path)
+    git("config", "uploadpack.allowFilter", "true", cwd=tmp_path / "remote.git")
+    git("config", "uploadpack.allowAnySHA1InWant", "true", cwd=tmp_path / "remote.git")
+
+    def fake_plot(usage, svg, opts, **kwargs):
+        svg.write_text("<svg/>")
+
+    mock_plot.side_effect = fake_plot
+
+    source = {"url": (tmp_path / "remote.git").as_uri(), "commit": commit}
+    registry = ExampleRegistry(examples=[
+        ExampleEntry(title=f"Run {name}", info_file=f"{name}/logs/run/run_info.json", git=source)
+        for name in ("one", "two")
+    ])
+    options = BuildOptions(
+        output=tmp_path / "README.md",
+        log_dir=tmp_path / "logs",
+        image_dir=tmp_path / "images",
+        manifest=tmp_path / "manifest.json",
+        repo_root=tmp_path,
+        cache_dir=tmp_path / "cache"
+    )
+
+    fetches = []
+    fetch = GitRepository._fetch
+
+    def counted(self, wants, shallow):
+        fetches.append(wants)
+        fetch(self, wants, shallow)
+
+    with patch.object(GitRepository, "_fetch", counted):
+        pipeline = GalleryPipeline(options)
+        results = pipeline.build_examples(registry.examples)
+        pipeline.render(registry, results)
+        pipeline.save()
+        assert len(fetches) == 3  # commit, info files, logs
+        assert results[1].log_paths["stdout"].read_text() == "hello\n"
+        assert (tmp_path / "cache" / "git").is_dir()
+        assert "### Run two" in options.output.read_text()
+
+        pipeline = GalleryPipeline(options)
+        pipeline.build_examples(registry.examples)
+        assert not any(o.ran for o in pipeline.runner.outcomes)
+        assert len(fetches) == 3
+
+
+@patch('con_duct_gallery.pipeline.generate_plot')
+def test_archive_examples_follow_their_archive(mock_plot, tmp_path):
+    """Test logs in a local archive are copied out and refetched when it changes."""
+    import tarfile
+    from con_duct_gallery.models import ExampleEntry, ExampleRegistry
+    from con_duct_gallery.pipeline import BuildOptions, GalleryPipeline
+
+    def fake_plot(usage, svg, opts, **kwargs):
+        svg.write_text("<svg/>")
+
+    mock_plot.side_effect = fake_plot
+
+    info_path = _write_local_example(tmp_path / "job")
+
+    def pack():
+        with tarfile.open(tmp_path / "job.tar.gz", "w:gz") as tar:
+            tar.add(info_path.parent, arcname="run")
+
+    pack()
+    registry = ExampleRegistry(examples=[
+        ExampleEntry(title="Packed Run", info_file="job.tar.gz#run/run_info.json")
+    ])
+    options = BuildOptions(
+        output=tmp_path / "README.md",
+        log_dir=tmp_path / "logs",
+        image_dir=tmp_path / "images",
+        manifest=tmp_path / "manifest.json",
+        repo_root=tmp_path
+    )
+
+    def build():
+        pipeline = GalleryPipeline(options)
+        results = pipeline.build_examples(registry.examples)
+        pipeline.save()
+        return results[0], {o.name: o.reason for o in pipeline.runner.outcomes if o.ran}
+
+    result, ran = build()
+    assert result.log_paths["stdout"] == tmp_path / "logs" / "packed-run" / "example_output_stdout"
+    assert result.log_paths["stdout"].read_text() == "hello\n"
+    assert result.summary["execution_summary"]["peak_rss"] == 1024
+
+    assert build()[1] == {}
+
+    (info_path.parent / "run_stdout").write_text("bye\n")
+    pack()
+    result, ran = build()
+    assert ran["fetch"] == "inputs changed: archive"
+    assert result.log_paths["stdout"].read_text() == "bye\n"
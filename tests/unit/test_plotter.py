@@ -36,8 +36,11 @@ def test_generate_plot(mock_run, tmp_path):
     usage_json.write_text("{}")
     output_svg = tmp_path / "output.svg"
 
-    # Mock successful subprocess call
-    mock_run.return_value = Mock(returncode=0)
+    # Mock successful subprocess call that writes its --output file
+    def run(cmd, **kwargs):
+        Path(cmd[cmd.index("--output") + 1]).write_text("<svg/>")
+        return Mock(returncode=0)
+    mock_run.side_effect = run
 
     result = generate_plot(usage_json, output_svg)
 
@@ -46,7 +49,10 @@ def test_generate_plot(mock_run, tmp_path):
     args = mock_run.call_args[0][0]
     assert "con-duct" in args
     assert "plot" in args
-    assert str(output_svg) in args
+    # con-duct renders to a temporary sibling that replaces the output
+    assert Path(args[args.index("--output") + 1]).parent == output_svg.parent
+    assert output_svg.read_text() == "<svg/>"
+    assert sorted(tmp_path.iterdir()) == sorted([usage_json, output_svg])
 
 
 @patch('con_duct_gallery.plotter.subprocess.run')
@@ -81,3 +87,66 @@ def test_con_duct_not_found(mock_run, tmp_path):
 
     with pytest.raises(FileNotFoundError):
         generate_plot(usage_json, output_svg)
+
+
+def test_run_measured_reports_child_usage():
+    """Test that run_measured returns resources of the child process."""
+    import sys
+    from con_duct_gallery.plotter import run_measured
+
+    usage = run_measured([sys.executable, "-c", "x = bytearray(50 * 1024 * 1024)"])
+
+    assert usage["max_rss"] > 50 * 1024 * 1024
+    assert usage["cpu_user"] >= 0
+
+    with pytest.raises(subprocess.CalledProcessError) as exc_info:
+        run_measured([sys.executable, "-c", "import sys; sys.exit('bad input')"])
+    assert "bad input" in exc_info.value.stderr
+
+
+@patch('con_duct_gallery.plotter.subprocess.run')
+def test_generate_plot_window(mock_run, tmp_path):
+    """Test that --window plots only the selected slice of the log."""
+    from con_duct_gallery.plotter import generate_plot
+
+    usage_json = tmp_path / "usage.json"
+    usage_json.write_text(
+        '{"timestamp": "2024-01-01T00:00:00"}\n'
+        '{"timestamp": "2024-01-01T00:01:00"}\n'
+        '{"timestamp": "2024-01-01T00:02:00"}\n'
+    )
+    plotted = []
+
+    def run(cmd, **kwargs):
+        plotted.append((cmd, open(cmd[-1]).read()))
+        return Mock(returncode=0)
+
+    mock_run.side_effect = run
+    generate_plot(usage_json, tmp_path / "output.svg", ["--window", "30s-90s", "--min-ratio=2"])
+
+    cmd, content = plotted[0]
+    assert "--window" not in cmd and "--min-ratio=2" in cmd
+    assert cmd[-1] != str(usage_json)
+    assert content == '{"timestamp": "2024-01-01T00:01:00"}\n'
+    assert not (tmp_path / cmd[-1]).exists()
+
+
+@patch('con_duct_gallery.plotter.subprocess.run')
+def test_generate_plot_native_renderer(mock_run, tmp_path):
+    """Test that the native renderer writes SVG without running con-duct."""
+    import pytest
+    from con_duct_gallery.plotter import generate_plot
+
+    usage_json = tmp_path / "usage.json"
+    usage_json.write_text(
+        '{"timestamp": "2024-01-01T00:00:00", "totals": {"rss": 1, "vsz": 2, "pcpu": 3}}\n'
+        '{"timestamp": "2024-01-01T00:01:00", "totals": {"rss": 4, "vsz": 5, "pcpu": 6}}\n'
+    )
+    output_svg = tmp_path / "images" / "output.svg"
+
+    generate_plot(usage_json, output_svg, ["--min-ratio=2"], renderer="native")
+    assert output_svg.read_text().startswith("<svg")
+    mock_run.assert_not_called()
+
+    with pytest.raises(ValueError, match="Unknown renderer"):
+        generate_plot(usage_json, output_svg, renderer="gnuplot")
@@ -0,0 +1,104 @@
+"""Unit tests for preview module."""
+
+import json
+import subprocess
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+
+def _write_local_example(root):
+    """Write a minimal local duct log set."""
+    logs = root / "logs" / "run"
+    logs.mkdir(parents=True)
+    info = {"execution_summary": {"exit_code": 0}, "output_paths": {"usage": "run_usage.json"}}
+    (logs / "run_info.json").write_text(json.dumps(info))
+    (logs / "run_usage.json").write_text('{"timestamp": "2024-01-01T00:00:00"}\n')
+    (logs / "run_stdout").write_text("hello\n")
+    (logs / "run_stderr").write_text("")
+
+
+def _registry(**descriptions):
+    from con_duct_gallery.models import ExampleEntry, ExampleRegistry
+
+    return ExampleRegistry(examples=[
+        ExampleEntry(title=title, info_file="logs/run/run_info.json", description=description)
+        for title, description in descriptions.items()
+    ])
+
+
+def test_diff_examples():
+    """Test examples are classified by slug and configuration fingerprint."""
+    from con_duct_gallery.preview import diff_examples, registry_fingerprints
+
+    base = registry_fingerprints(_registry(Kept="same", Edited="before", Gone="bye"))
+    diff = diff_examples(_registry(Kept="same", Edited="after", New="hi"), base)
+
+    assert [e.title for e in diff.added] == ["New"]
+    assert [e.title for e in diff.changed] == ["Edited"]
+    assert [e.title for e in diff.unchanged] == ["Kept"]
+    assert diff.removed == ["gone"]
+    assert diff.rebuild == {"new", "edited"}
+
+
+def test_base_fingerprints_from_git_ref(tmp_path):
+    """Test the base configuration can be read at a git ref."""
+    from con_duct_gallery.preview import base_fingerprints, diff_examples
+
+    config = tmp_path / "gallery.yaml"
+    config.write_text(yaml.safe_dump(_registry(A="one", B="two").model_dump(mode="json")))
+    git = ["git", "-C", str(tmp_path), "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(git + ["init", "-q"], check=True)
+    subprocess.run(git + ["add", "gallery.yaml"], check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "base"], check=True)
+
+    diff = diff_examples(_registry(A="one", B="changed"), base_fingerprints("HEAD", config))
+    assert [e.title for e in diff.changed] == ["B"]
+    assert [e.title for e in diff.unchanged] == ["A"]
+
+    with pytest.raises(ValueError, match="no-such-ref"):
+        base_fingerprints("no-such-ref", config)
+
+
+@patch('con_duct_gallery.pipeline.generate_plot')
+def test_build_changed_against_manifest(mock_plot, tmp_path):
+    """Test only changed examples are built and previewed."""
+    from con_duct_gallery.manifest import BuildManifest
+    from con_duct_gallery.pipeline import BuildOptions, GalleryPipeline
+    from con_duct_gallery.preview import (
+        base_fingerprints, diff_examples, write_preview
+    )
+
+    _write_local_example(tmp_path)
+    mock_plot.side_effect = lambda usage, svg, opts, **kwargs: svg.write_text("<svg/>")
+    options = BuildOptions(
+        output=tmp_path / "README.md",
+        log_dir=tmp_path / "logs",
+        image_dir=tmp_path / "images",
+        manifest=tmp_path / "manifest.json",
+        repo_root=tmp_path
+    )
+
+    pipeline = GalleryPipeline(options)
+    registry = _registry(Kept="same", Edited="before")
+    pipeline.render(registry, pipeline.build_examples(registry.examples))
+    pipeline.save()
+
+    registry = _registry(Kept="same", Edited="after", New="hi")
+    diff = diff_examples(registry, base_fingerprints(str(options.manifest), tmp_path / "x.yaml"))
+    pipeline = GalleryPipeline(options)
+    results = pipeline.build_changed(registry.examples, diff.rebuild)
+    pipeline.render(registry, results)
+
+    assert {o.key for o in pipeline.runner.outcomes if o.name != "render"} == {"edited", "new"}
+    assert [r.example.title for r in results] == ["Kept", "Edited", "New"]
+    readme = options.output.read_text()
+    assert "same" in readme and "after" in readme and "before" not in readme
+
+    preview = write_preview(diff, results, tmp_path / "preview", options.image_dir)
+    text = preview.read_text()
+    assert "1 added, 1 changed, 0 removed, 1 unchanged" in text
+    assert "### Edited" in text and "### New" in text and "### Kept" not in text
+    assert "](images/edited.svg)" in text
+    assert (preview.parent / "images" / "edited.svg").read_text() == "<svg/>"
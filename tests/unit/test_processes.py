@@ -0,0 +1,114 @@
+"""Unit tests for processes module."""
+
+import json
+from datetime import datetime, timedelta
+
+
+def write_usage(path, reports):
+    start = datetime(2024, 1, 1)
+    with open(path, "w") as f:
+        for i, processes in enumerate(reports):
+            f.write(json.dumps({
+                "timestamp": (start + timedelta(seconds=10 * i)).isoformat(),
+                "processes": processes,
+                "totals": {},
+            }) + "\n")
+
+
+def test_command_name():
+    """Test short names look through interpreters and shells."""
+    from con_duct_gallery.processes import command_name
+
+    assert command_name("/opt/conda/bin/python3.11 /opt/conda/bin/mriqc in out") == "mriqc"
+    assert command_name("/bin/sh -c 3dvolreg -Fourier -twopass") == "3dvolreg"
+    assert command_name("python -u -m pytest -q") == "pytest"
+    assert command_name("python -c 'print(1)'") == "python"
+    assert command_name("bash -c for i in 1 2; do :; done") == "bash"
+    assert command_name("Singularity runtime parent") == "Singularity"
+    assert command_name("") == "(other)"
+
+
+def test_group_processes_by_pattern():
+    """Test regex grouping by capture group with a remainder group."""
+    from con_duct_gallery.processes import group_processes
+
+    names, codes = group_processes(
+        ["ants Reg a", "ants Reg b", "ants Apply", "sleep 1"], r"ants (\w+)"
+    )
+    assert names == ["Reg", "Apply", "(other)"]
+    assert list(codes) == [0, 0, 1, 2]
+
+
+def test_breakdown_ranks_and_aggregates(tmp_path):
+    """Test the top groups by CPU time, with the rest merged."""
+    from con_duct_gallery.processes import breakdown, load_process_samples
+
+    usage = tmp_path / "usage.json"
+    write_usage(usage, [
+        {"1": {"cmd": "main", "rss": 100, "pcpu": 10}},
+        {"1": {"cmd": "main", "rss": 100, "pcpu": 10},
+         "2": {"cmd": "worker a", "rss": 50, "pcpu": 100},
+         "3": {"cmd": "worker b", "rss": 70, "pcpu": 100}},
+        {"1": {"cmd": "main", "rss": 300, "pcpu": 10},
+         "2": {"cmd": "sleep 5", "rss": 10, "pcpu": 0}},
+    ])
+    samples = load_process_samples(usage)
+    assert len(samples.pids) == 4  # PID 2 reused by another command
+    assert list(samples.seconds) == [0, 10, 20]
+
+    result = breakdown(samples, top=2, rank="cpu")
+    assert [g.name for g in result.groups] == ["worker", "main", "(other)"]
+    worker, main, other = result.groups
+    assert worker.processes == 2 and worker.peak_rss == 120 and worker.cpu_seconds == 20
+    assert main.peak_rss == 300 and main.cpu_seconds == 2
+    assert other.processes == 1 and other.peak_rss == 10
+    assert result.rss.shape == (3, 3)
+    assert list(result.rss.sum(axis=0)) == [100, 220, 310]
+
+
+def test_breakdown_ranks_by_memory(tmp_path):
+    """Test a memory-heavy group that uses little CPU is not folded into the rest."""
+    import pytest
+    from con_duct_gallery.processes import breakdown, load_process_samples
+
+    usage = tmp_path / "usage.json"
+    write_usage(usage, [
+        {"1": {"cmd": "compute", "rss": 10, "pcpu": 400},
+         "2": {"cmd": "cache", "rss": 5000, "pcpu": 1},
+         "3": {"cmd": "io", "rss": 20, "pcpu": 50}},
+        {"1": {"cmd": "compute", "rss": 10, "pcpu": 400},
+         "2": {"cmd": "cache", "rss": 5000, "pcpu": 1},
+         "3": {"cmd": "io", "rss": 20, "pcpu": 50}},
+    ])
+    samples = load_process_samples(usage)
+
+    by_memory = breakdown(samples, top=1)
+    assert [g.name for g in by_memory.groups] == ["cache", "(other)"]
+    by_cpu = breakdown(samples, top=1, rank="cpu")
+    assert [g.name for g in by_cpu.groups] == ["compute", "(other)"]
+    with pytest.raises(ValueError, match="Unknown ranking"):
+        breakdown(samples, rank="pids")
+
+
+def test_write_breakdown(tmp_path):
+    """Test the stacked-area chart of many short-lived processes."""
+    import xml.etree.ElementTree as ET
+    from con_duct_gallery.processes import write_breakdown
+
+    usage = tmp_path / "usage.json"
+    write_usage(usage, [
+        {str(pid): {"cmd": f"/usr/bin/tool{pid % 12} --job {pid}", "rss": pid, "pcpu": pid % 7}
+         for pid in range(i * 20, i * 20 + 40)}
+        for i in range(500)
+    ])
+
+    svg = tmp_path / "images" / "run-processes.svg"
+    groups = write_breakdown(usage, svg, top=5)
+    assert len(groups) == 6 and groups[-1].name == "(other)"
+    assert sum(g.processes for g in groups) == 500 * 20 + 20
+
+    root = ET.parse(svg).getroot()
+    ns = "{http://www.w3.org/2000/svg}"
+    assert len(root.findall(f"{ns}polygon")) == 6
+    assert groups[0].name in [t.text for t in root.iter(f"{ns}text")]
+    assert svg.stat().st_size < 40_000
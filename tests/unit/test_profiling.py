@@ -0,0 +1,58 @@
+"""Unit tests for profiling module."""
+
+import json
+
+
+def test_time_stage_counts_hits_and_misses():
+    """Test stage timing and cache hit/miss accounting."""
+    from con_duct_gallery.profiling import BuildProfile
+
+    profile = BuildProfile()
+    with profile.time_stage("plot", "a"):
+        pass
+    with profile.time_stage("plot", "b") as status:
+        status["ran"] = False
+
+    assert profile.cache_misses["plot"] == 1
+    assert profile.cache_hits["plot"] == 1
+    assert [t.key for t in profile.timings] == ["a", "b"]
+
+
+def test_summary_aligns_stage_names():
+    """Test stage totals line up whatever the length of the stage names."""
+    from con_duct_gallery.profiling import BuildProfile
+
+    profile = BuildProfile()
+    for stage in ("plot", "distribution", "processes"):
+        with profile.time_stage(stage, "example"):
+            pass
+    profile.finish()
+
+    rows = [line for line in profile.summary_lines() if "ran," in line]
+    assert len(rows) == 3
+    assert len({row.index("s  (") for row in rows}) == 1
+
+
+def test_report_roundtrip(tmp_path):
+    """Test JSON report content and summary lines."""
+    from con_duct_gallery.profiling import BuildProfile
+
+    profile = BuildProfile()
+    with profile.time_stage("fetch", "example"):
+        pass
+    profile.add_download(2_000_000)
+    profile.add_plot("example", {"cpu_user": 1.5, "cpu_system": 0.5, "max_rss": 100_000_000})
+    profile.finish()
+
+    report_path = tmp_path / "profile.json"
+    profile.write(report_path)
+    report = json.loads(report_path.read_text())
+
+    assert report["bytes_downloaded"] == 2_000_000
+    assert report["cache"] == {"fetch": {"hits": 0, "misses": 1}}
+    assert "fetch" in report["examples"]["example"]
+    assert report["plots"][0]["max_rss"] == 100_000_000
+
+    summary = "\n".join(profile.summary_lines())
+    assert "Downloaded 1.9 MiB" in summary
+    assert "2.00s CPU over 1 runs, max RSS 95.4 MiB (example)" in summary
@@ -0,0 +1,72 @@
+"""Unit tests for quantiles module."""
+
+import json
+
+import pytest
+
+
+def test_sketch_quantiles_are_accurate_in_bounded_memory():
+    """Test KLL quantiles stay within the expected rank error as the stream grows."""
+    import random
+    from bisect import bisect_left
+    from con_duct_gallery.quantiles import KLLSketch
+
+    rng = random.Random(1)
+    values = [rng.random() for _ in range(50000)]
+    sketch = KLLSketch(k=200)
+    retained = []
+    for i, value in enumerate(values, 1):
+        sketch.update(value)
+        if i % 10000 == 0:
+            retained.append(sketch.retained)
+
+    ordered = sorted(values)
+    for q in (0.01, 0.5, 0.9, 0.99):
+        rank = bisect_left(ordered, sketch.quantile(q)) / len(values)
+        assert abs(rank - q) < 0.02
+    assert sketch.quantile(0) == ordered[0] and sketch.quantile(1) == ordered[-1]
+    assert abs(sketch.fraction_at_least(0.75) - 0.25) < 0.02
+    assert len(sketch) == 50000
+    # About 3k items plus two per level, however long the stream
+    assert max(retained) < 3 * 200 + 2 * len(sketch.compactors) + 50
+
+    # Seeded, so the same stream gives the same sketch
+    again = KLLSketch(k=200)
+    for value in values:
+        again.update(value)
+    assert again.quantile(0.9) == sketch.quantile(0.9)
+
+    with pytest.raises(ValueError):
+        KLLSketch().quantile(0.5)
+    with pytest.raises(ValueError):
+        sketch.quantile(1.5)
+
+
+def test_usage_distribution(tmp_path):
+    """Test quantiles and time near the peak of a usage log's totals."""
+    from con_duct_gallery.quantiles import usage_distribution
+
+    usage = tmp_path / "usage.json"
+    lines = []
+    for second in range(101):
+        rss = 1000 if second >= 80 else 100
+        lines.append(json.dumps({
+            "timestamp": f"2024-01-01T00:{second // 60:02d}:{second % 60:02d}",
+            "processes": {"1": {"rss": rss}},
+            "totals": {"rss": rss, "pcpu": float(second)},
+        }))
+    usage.write_text("\n".join(lines) + '\n{"timestamp": "2024-01-01T00:02:00", "tot')
+
+    distribution = usage_distribution(usage)
+    assert distribution.reports == 101
+    assert distribution.duration == 100.0
+    assert distribution.rss.p50 == 100 and distribution.rss.p99 == 1000
+    assert distribution.rss.peak == 1000
+    assert distribution.rss.time_above == pytest.approx(21 / 101 * 100)
+    assert distribution.pcpu.p90 == 90.0 and distribution.pcpu.peak == 100.0
+    assert json.loads(json.dumps(distribution.to_dict()))["rss"]["p90"] == 1000
+
+    empty = tmp_path / "empty.json"
+    empty.write_text("")
+    with pytest.raises(ValueError, match="No usage reports"):
+        usage_distribution(empty)
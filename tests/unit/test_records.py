@@ -0,0 +1,80 @@
+"""Unit tests for records module."""
+
+import json
+import sys
+
+import pytest
+
+
+INFO = {
+    "command": "sleep 1",
+    "duct_version": "0.13.0",
+    "schema_version": "0.2.1",
+    "execution_summary": {
+        "exit_code": 0,
+        "wall_clock_time": 1.5,
+        "peak_rss": 1024,
+        "average_pcpu": 12.5,
+        "unknown_field": "ignored",
+    },
+    "system": {"cpu_total": 8, "memory_total": 16 << 30, "hostname": "node1"},
+    "output_paths": {"usage": "run_usage.json", "info": "run_info.json"},
+}
+
+
+def test_json_backend():
+    """Test the backend is the fastest installed decoder."""
+    from con_duct_gallery.records import JSON_BACKEND, loads
+
+    expected = "orjson" if "orjson" in sys.modules else "msgspec" if "msgspec" in sys.modules else "json"
+    assert JSON_BACKEND == expected
+    assert loads(b'{"a": [1, 2.5, null]}') == {"a": [1, 2.5, None]}
+    assert loads('{"a": "é"}') == {"a": "é"}
+
+
+def test_loads_invalid_raises_value_error():
+    """Test invalid documents raise ValueError whatever the backend."""
+    from con_duct_gallery.records import loads
+
+    for data in (b'{"truncated": ', b'\x89PNG\r\n', b''):
+        with pytest.raises(ValueError):
+            loads(data)
+
+
+def test_read_info(tmp_path):
+    """Test an info file decodes into records with missing fields as None."""
+    from con_duct_gallery.records import ExecutionSummary, read_info
+
+    path = tmp_path / "info.json"
+    path.write_text(json.dumps(INFO))
+
+    info = read_info(path)
+    assert info.command == "sleep 1"
+    assert isinstance(info.execution_summary, ExecutionSummary)
+    assert info.execution_summary.wall_clock_time == 1.5
+    assert info.execution_summary.peak_vsz is None
+    assert not hasattr(info.execution_summary, "unknown_field")
+    assert info.system.hostname == "node1"
+    assert info.output_paths.usage == "run_usage.json"
+    assert info.working_directory is None
+
+
+def test_read_info_missing_sections(tmp_path):
+    """Test sections absent from older info files are None."""
+    from con_duct_gallery.records import read_info
+
+    path = tmp_path / "info.json"
+    path.write_text(json.dumps({"command": "true"}))
+
+    info = read_info(path)
+    assert info.execution_summary is None
+    assert info.system is None
+    assert info.output_paths is None
+
+
+def test_records_smaller_than_dicts():
+    """Test records take less memory than the decoded dicts they replace."""
+    from con_duct_gallery.records import SystemInfo
+
+    data = {"cpu_total": 8, "memory_total": 1 << 34, "hostname": "node", "uid": 1000, "user": "me"}
+    assert sys.getsizeof(SystemInfo.from_dict(data)) < sys.getsizeof(data)
@@ -0,0 +1,181 @@
+"""Unit tests for server module."""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+from unittest.mock import patch
+
+
+def _write_local_example(root: Path, name: str) -> str:
+    """Write a minimal local duct log set and return its info path relative to root."""
+    logs = root / "logs" / name
+    logs.mkdir(parents=True)
+    info = {"output_paths": {
+        "usage": f".duct/{name}_usage.json",
+        "stdout": f".duct/{name}_stdout",
+        "stderr": f".duct/{name}_stderr",
+    }}
+    (logs / f"{name}_info.json").write_text(json.dumps(info))
+    (logs / f"{name}_usage.json").write_text(
+        '{"timestamp": "2024-01-01T00:00:00", "totals": {"rss": 1024, "pcpu": 50}}\n'
+    )
+    (logs / f"{name}_stdout").write_text("hello\n")
+    (logs / f"{name}_stderr").write_text("")
+    return f"logs/{name}/{name}_info.json"
+
+
+def _fake_plot(usage, svg, opts, **kwargs):
+    svg.parent.mkdir(parents=True, exist_ok=True)
+    svg.write_text("<svg/>")
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test size-bounded eviction order."""
+    from con_duct_gallery.server import LRUCache, make_response
+
+    cache = LRUCache(max_bytes=10)
+    cache.put("a", make_response(b"aaaa", "text/plain"))
+    cache.put("b", make_response(b"bbbb", "text/plain"))
+    assert cache.get("a") is not None  # a is now most recently used
+    cache.put("c", make_response(b"cccc", "text/plain"))
+
+    assert cache.get("b") is None
+    assert cache.get("a").body == b"aaaa"
+    assert cache.get("c").body == b"cccc"
+    assert len(cache) == 2
+
+
+def test_markdown_to_html():
+    """Test conversion of the markdown emitted for example sections."""
+    from con_duct_gallery.server import markdown_to_html
+
+    converted = markdown_to_html(
+        "### Run <1>\n\n"
+        "**Tags**: `a`\n\n"
+        "![Plot](/images/run.svg)\n\n"
+        "<details>\n"
+        "- **Info file**: [info.json](/logs/run/info)\n"
+        "</details>"
+    )
+    assert "<h3>Run &lt;1&gt;</h3>" in converted
+    assert "<strong>Tags</strong>: <code>a</code>" in converted
+    assert '<img alt="Plot" src="/images/run.svg">' in converted
+    assert '<ul>\n<li><strong>Info file</strong>: <a href="/logs/run/info">info.json</a></li>\n</ul>' in converted
+    assert "<details>" in converted
+
+
+@patch('con_duct_gallery.pipeline.generate_plot')
+def test_server_renders_on_demand_with_etags(mock_plot, tmp_path):
+    """Test routes, on-demand builds, caching and conditional requests."""
+    from con_duct_gallery.models import ExampleEntry, ExampleRegistry
+    from con_duct_gallery.pipeline import BuildOptions
+    from con_duct_gallery.server import GalleryServer, make_server
+
+    mock_plot.side_effect = _fake_plot
+    registry = ExampleRegistry(examples=[
+        ExampleEntry(title="Run One", info_file=_write_local_example(tmp_path, "one")),
+        ExampleEntry(title="Run Two", info_file=_write_local_example(tmp_path, "two")),
+    ])
+    options = BuildOptions(
+        output=tmp_path / "README.md",
+        log_dir=tmp_path / "logs",
+        image_dir=tmp_path / "images",
+        manifest=tmp_path / "manifest.json",
+        repo_root=tmp_path
+    )
+    gallery = GalleryServer(registry, options, cache_bytes=1024 * 1024)
+    server = make_server(gallery, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def get(path, headers=None):
+        request = urllib.request.Request(base + path, headers=headers or {})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, b""
+
+    try:
+        status, _, body = get("/")
+        assert status == 200
+        assert b'href="/examples/run-one"' in body
+        assert mock_plot.call_count == 0  # the index needs no plots
+
+        status, _, body = get("/examples/run-one")
+        assert status == 200
+        assert b'src="/images/run-one.svg"' in body
+        assert "📈 Resource distribution".encode() in body
+        assert b"p90" in body
+        assert mock_plot.call_count == 1  # only the requested example was built
+
+        status, headers, body = get("/images/run-one.svg")
+        assert status == 200 and body == b"<svg/>"
+        assert headers["Content-Type"] == "image/svg+xml"
+        assert mock_plot.call_count == 1
+
+        status, _, _ = get("/images/run-one.svg", {"If-None-Match": headers["ETag"]})
+        assert status == 304
+
+        status, _, body = get("/logs/run-one/stdout")
+        assert status == 200 and body == b"hello\n"
+
+        assert get("/examples/missing")[0] == 404
+        assert get("/logs/run-one/secrets")[0] == 404
+        assert mock_plot.call_count == 1
+        assert json.loads(options.manifest.read_text())["stages"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_markdown_to_html_code_blocks():
+    """Test fenced code blocks are escaped verbatim."""
+    from con_duct_gallery.server import markdown_to_html
+
+    converted = markdown_to_html("````text\n- <b>not a list</b>\n```\n````\nafter")
+    assert "<pre><code>\n- &lt;b&gt;not a list&lt;/b&gt;\n```\n</code></pre>" in converted
+    assert "<p>after</p>" in converted
+
+
+def test_markdown_to_html_tables():
+    """Test pipe tables with escaped pipes."""
+    from con_duct_gallery.server import markdown_to_html
+
+    converted = markdown_to_html("| A | B |\n| --- | ---: |\n| `x\\|y` | 2 |\n\nafter")
+    assert converted.startswith("<table>\n<tr><th>A</th><th>B</th></tr>\n")
+    assert "<tr><td><code>x|y</code></td><td>2</td></tr>\n</table>" in converted
+    assert "<p>after</p>" in converted
+
+
+@patch('con_duct_gallery.pipeline.generate_plot')
+def test_server_retries_failed_fetch(mock_plot, tmp_path):
+    """Test the page of an example whose logs could not be fetched is not cached."""
+    from con_duct_gallery.models import ExampleEntry, ExampleRegistry
+    from con_duct_gallery.pipeline import BuildOptions
+    from con_duct_gallery.server import GalleryServer
+
+    mock_plot.side_effect = _fake_plot
+    registry = ExampleRegistry(examples=[
+        ExampleEntry(title="Run One", info_file="logs/one/one_info.json"),
+    ])
+    options = BuildOptions(
+        output=tmp_path / "README.md",
+        log_dir=tmp_path / "logs",
+        image_dir=tmp_path / "images",
+        manifest=None,
+        repo_root=tmp_path
+    )
+    gallery = GalleryServer(registry, options, cache_bytes=1024 * 1024)
+
+    assert b"Logs could not be fetched" in gallery.resolve("/examples/run-one").body
+    assert gallery.cache.get("/examples/run-one") is None
+
+    # Once the logs are there, the next request builds and caches the example
+    _write_local_example(tmp_path, "one")
+    body = gallery.resolve("/examples/run-one").body
+    assert b'src="/images/run-one.svg"' in body
+    assert gallery.cache.get("/examples/run-one").body == body
@@ -0,0 +1,78 @@
+"""Import-time benchmarks for CLI startup, measured with -X importtime."""
+
+import subprocess
+import sys
+import pytest
+
+HEAVY_MODULES = {"requests", "pydantic", "yaml", "matplotlib", "con_duct_gallery.fetcher",
+                 "con_duct_gallery.models", "con_duct_gallery.pipeline"}
+
+# Generous bound on the cumulative import time of the CLI entry point;
+# importing the full pipeline costs well over this.
+ENTRY_POINT_BUDGET_US = 100_000
+
+
+def _import_times(argv: list[str], cwd=None) -> tuple[dict[str, int], subprocess.CompletedProcess]:
+    """Run main() under -X importtime and return cumulative import times (us)."""
+    code = (
+        "import sys; "
+        f"sys.argv = {['con-duct-gallery'] + argv!r}; "
+        "from con_duct_gallery.__main__ import main; "
+        "sys.exit(main())"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=cwd
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times, proc
+
+
+def test_help_imports_no_heavy_modules():
+    """Test that --help does not import the pipeline or its dependencies."""
+    times, proc = _import_times(["--help"])
+
+    assert proc.returncode == 0
+    assert not HEAVY_MODULES & set(times)
+    assert times["con_duct_gallery.__main__"] < ENTRY_POINT_BUDGET_US
+
+
+def test_dry_run_imports_only_yaml(tmp_path):
+    """Test that generate --dry-run only needs PyYAML."""
+    (tmp_path / "con-duct-gallery.yaml").write_text(
+        "examples:\n  - title: A\n    info_file: a_info.json\n"
+    )
+    times, proc = _import_times(["generate", "--dry-run"], cwd=tmp_path)
+
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert "[DRY RUN] Would fetch logs for 1 examples" in proc.stderr
+    assert not (HEAVY_MODULES - {"yaml"}) & set(times)
+
+
+def test_dry_run_rejects_config_without_examples(tmp_path):
+    """Test that --dry-run still fails on a structurally broken config."""
+    (tmp_path / "con-duct-gallery.yaml").write_text("examples: []\n")
+    _, proc = _import_times(["generate", "--dry-run"], cwd=tmp_path)
+
+    assert proc.returncode == 1
+
+
+@pytest.mark.parametrize("examples", [
+    "  - title: A\n    info_file: a_info.json\n  - title: a\n    info_file: b_info.json\n",
+    "  - title: A\n    info_file: a_info.json\n    tags: [Bad Tag!]\n",
+    "  - title: A\n    info_file: a_info.yaml\n",
+    "  - title: ' '\n    info_file: a_info.json\n",
+])
+def test_dry_run_rejects_invalid_examples(tmp_path, examples):
+    """Test that --dry-run applies the model rules without importing pydantic."""
+    (tmp_path / "con-duct-gallery.yaml").write_text("examples:\n" + examples)
+    times, proc = _import_times(["generate", "--dry-run"], cwd=tmp_path)
+
+    assert proc.returncode == 1
+    assert "Failed to load configuration" in proc.stderr
+    assert not (HEAVY_MODULES - {"yaml"}) & set(times)
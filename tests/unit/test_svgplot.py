@@ -0,0 +1,68 @@
+"""Unit tests for svgplot module."""
+
+import json
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+
+
+def test_nice_ticks():
+    """Test round tick steps covering or bounded by the range."""
+    from con_duct_gallery.svgplot import nice_ticks
+
+    assert list(nice_ticks(0, 57)) == [0, 20, 40, 60]
+    assert list(nice_ticks(0, 7.4, cover=False)) == [0, 2, 4, 6]
+    assert list(nice_ticks(0, 100)) == [0, 20, 40, 60, 80, 100]
+    assert list(nice_ticks(0, 0)) == [0, 0.2, 0.4, 0.6000000000000001, 0.8, 1.0]
+
+
+def test_decimate_keeps_envelope():
+    """Test min/max reduction per column preserves extremes."""
+    import numpy as np
+    from con_duct_gallery.svgplot import decimate
+
+    x = np.arange(100_000, dtype=float)
+    y = np.sin(x / 1000)
+    y[54_321] = 5.0
+    xs, ys = decimate(x, y, columns=100)
+    assert len(xs) == len(ys) == 200
+    assert ys.max() == 5.0 and ys.min() == y.min()
+    assert np.all(np.diff(xs) >= 0)
+
+    short_x, short_y = decimate(x[:10], y[:10], columns=100)
+    assert len(short_x) == 10
+
+
+def test_decimate_keeps_samples_in_order():
+    """Test kept extremes stay at their own x, e.g. a decreasing series falls."""
+    import numpy as np
+    from con_duct_gallery.svgplot import decimate
+
+    x = np.arange(10_000, dtype=float)
+    xs, ys = decimate(x, 10_000 - x, columns=50)
+    assert len(xs) == 100
+    assert np.all(ys == 10_000 - xs)
+    assert np.all(np.diff(xs) > 0) and np.all(np.diff(ys) < 0)
+
+
+def test_render_usage_svg(tmp_path):
+    """Test a complete, well-formed and compact chart."""
+    from con_duct_gallery.svgplot import render_usage_svg
+
+    usage = tmp_path / "usage.json"
+    start = datetime(2024, 1, 1)
+    with open(usage, "w") as f:
+        for i in range(20_000):
+            f.write(json.dumps({
+                "timestamp": (start + timedelta(seconds=i)).isoformat(),
+                "processes": {"1": {"rss": i}},
+                "totals": {"rss": i * 1024, "vsz": i * 4096, "pcpu": i % 100, "pmem": 0.1},
+            }) + "\n")
+
+    output = render_usage_svg(usage, tmp_path / "images" / "run.svg", title="Run <1>")
+    root = ET.parse(output).getroot()
+    ns = "{http://www.w3.org/2000/svg}"
+    assert len(root.findall(f"{ns}polyline")) == 3
+    labels = [t.text for t in root.iter(f"{ns}text")]
+    assert "Run <1>" in labels
+    assert "Elapsed time (h)" in labels and "Memory (MiB)" in labels
+    assert output.stat().st_size < 40_000
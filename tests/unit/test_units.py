@@ -0,0 +1,10 @@
+"""Unit tests for units module."""
+
+
+def test_byte_unit_matches_format_bytes():
+    """Test axes and text pick the same binary unit for a byte count."""
+    from con_duct_gallery.units import byte_unit, format_bytes
+
+    assert byte_unit(512) == (1, "B") and format_bytes(512) == "512 B"
+    assert byte_unit(1 << 20) == (1 << 20, "MiB") and format_bytes(1 << 20) == "1.0 MiB"
+    assert byte_unit(3 << 40) == (1 << 40, "TiB") and format_bytes(3 << 40) == "3.0 TiB"
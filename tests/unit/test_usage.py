@@ -0,0 +1,107 @@
+"""Unit tests for usage module."""
+
+import json
+import pytest
+from datetime import datetime, timedelta
+
+
+def _report(seconds: int) -> str:
+    timestamp = datetime(2024, 10, 28, 11, 0, 0) + timedelta(seconds=seconds)
+    return json.dumps({"timestamp": timestamp.isoformat(), "num_samples": 1, "seq": seconds})
+
+
+def _write_log(path, seconds):
+    path.write_text("".join(_report(s) + "\n" for s in seconds))
+
+
+def test_parse_window():
+    """Test window bounds in HH:MM[:SS] or h/m/s units from the run start."""
+    from con_duct_gallery.usage import parse_window
+
+    # Hours 2 to 3, however the bounds are written
+    assert parse_window("02:00-03:00") == (7200, 10800)
+    assert parse_window("02:00:00-03:00:00") == (7200, 10800)
+    assert parse_window("2h-3h") == (7200, 10800)
+    assert parse_window("01:30-") == (5400, None)
+    assert parse_window("1h30m-") == (5400, None)
+    assert parse_window("-0:00:10.5") == (None, 10.5)
+    assert parse_window("90s-2.5m") == (90, 150)
+    for bad in ["02:00", "a-b", "03:00-02:00", "-0:10.5", "2x-3h", "h-"]:
+        with pytest.raises(ValueError):
+            parse_window(bad)
+
+
+def test_usage_index_window_and_sidecar(tmp_path):
+    """Test building, saving, reloading and querying the offset index."""
+    from con_duct_gallery.usage import UsageIndex
+
+    usage = tmp_path / "run_usage.json"
+    _write_log(usage, range(0, 600, 60))
+
+    index = UsageIndex.build(usage)
+    assert len(index) == 10
+    # Written through a temporary file that .gitignore covers, and nothing left behind
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["run_usage.json", "run_usage.json.idx"]
+
+    begin, end = index.window(120, 240)
+    lines = usage.read_bytes()[begin:end].decode().splitlines()
+    assert [json.loads(line)["seq"] for line in lines] == [120, 180, 240]
+    assert index.window(None, None) == (0, usage.stat().st_size)
+    assert index.window(10_000, None) == (0, 0)
+
+    loaded = UsageIndex.load(usage)
+    assert list(loaded.offsets) == list(index.offsets)
+    assert loaded.size == index.size
+
+
+def test_usage_index_extends_appended_log(tmp_path):
+    """Test that appended reports are indexed incrementally and rewrites rescanned."""
+    from con_duct_gallery.usage import UsageIndex
+
+    usage = tmp_path / "run_usage.json"
+    _write_log(usage, [0, 60])
+    UsageIndex.build(usage)
+
+    with open(usage, "a") as f:
+        f.write(_report(120) + "\n")
+        f.write(_report(180)[:20])  # report still being written
+    index = UsageIndex.build(usage)
+    assert len(index) == 3
+    assert index.size < usage.stat().st_size
+
+    _write_log(usage, [30, 90])
+    rebuilt = UsageIndex.build(usage)
+    assert len(rebuilt) == 2
+    begin, end = rebuilt.window(60, 60)
+    assert json.loads(usage.read_bytes()[begin:end])["seq"] == 90
+
+
+def test_usage_index_rescans_same_size_rewrite(tmp_path):
+    """Test a log rewritten in place with its size and first report kept is rescanned."""
+    from con_duct_gallery.usage import UsageIndex
+
+    usage = tmp_path / "run_usage.json"
+    _write_log(usage, [0, 60, 120])
+    UsageIndex.build(usage)
+
+    size = usage.stat().st_size
+    _write_log(usage, [0, 65, 125])
+    assert usage.stat().st_size == size
+
+    index = UsageIndex.build(usage)
+    assert [t - index.timestamps[0] for t in index.timestamps] == [0, 65, 125]
+
+
+def test_write_window(tmp_path):
+    """Test slicing a window out of a log."""
+    from con_duct_gallery.usage import write_window
+
+    usage = tmp_path / "run_usage.json"
+    _write_log(usage, range(0, 7200 * 2, 600))
+    dest = tmp_path / "window.json"
+
+    write_window(usage, "01:00:00-01:30:00", dest)
+    assert [json.loads(line)["seq"] for line in dest.read_text().splitlines()] == [3600, 4200, 4800, 5400]
+
+    with pytest.raises(ValueError, match="No usage reports"):
+        write_window(usage, "10:00:00-", dest)
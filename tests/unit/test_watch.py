@@ -0,0 +1,112 @@
+"""Unit tests for watch module."""
+
+import json
+import sys
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+
+def _write_local_example(root: Path, name: str) -> str:
+    """Write a minimal local duct log set and return its info path relative to root."""
+    logs = root / "logs" / name
+    logs.mkdir(parents=True)
+    info = {"output_paths": {
+        "usage": f".duct/{name}_usage.json",
+        "stdout": f".duct/{name}_stdout",
+        "stderr": f".duct/{name}_stderr",
+    }}
+    (logs / f"{name}_info.json").write_text(json.dumps(info))
+    (logs / f"{name}_usage.json").write_text('{"timestamp": "2024-01-01T00:00:00"}\n')
+    (logs / f"{name}_stdout").write_text("")
+    (logs / f"{name}_stderr").write_text("")
+    return f"logs/{name}/{name}_info.json"
+
+
+def _fake_plot(usage, svg, opts, **kwargs):
+    svg.parent.mkdir(parents=True, exist_ok=True)
+    svg.write_text("<svg/>")
+
+
+def test_polling_watcher_detects_changes(tmp_path):
+    """Test that the polling watcher reports modified and created files."""
+    from con_duct_gallery.watch import PollingWatcher
+
+    existing = tmp_path / "a.json"
+    existing.write_text("1")
+    created = tmp_path / "b.json"
+
+    watcher = PollingWatcher(interval=0.01)
+    watcher.watch({existing, created})
+    assert watcher.wait(0.05) == set()
+
+    existing.write_text("22")
+    created.write_text("new")
+    assert watcher.wait(1) == {existing, created}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+def test_inotify_watcher_detects_replaced_file(tmp_path):
+    """Test that inotify notices files saved by rename, ignoring unwatched ones."""
+    from con_duct_gallery.watch import InotifyWatcher
+
+    config = tmp_path / "config.yaml"
+    config.write_text("a")
+
+    watcher = InotifyWatcher()
+    try:
+        watcher.watch({config})
+        (tmp_path / "unrelated.txt").write_text("x")
+        assert watcher.wait(0.1) == set()
+
+        replacement = tmp_path / "config.yaml.swp"
+        replacement.write_text("b")
+        replacement.rename(config)
+        assert config.absolute() in watcher.wait(1)
+    finally:
+        watcher.close()
+
+
+@patch('con_duct_gallery.pipeline.generate_plot')
+def test_gallery_watcher_rebuilds_affected_examples(mock_plot, tmp_path):
+    """Test that only examples touched by a change are rebuilt."""
+    from con_duct_gallery.pipeline import BuildOptions
+    from con_duct_gallery.watch import GalleryWatcher
+
+    mock_plot.side_effect = _fake_plot
+    info_a = _write_local_example(tmp_path, "a")
+    info_b = _write_local_example(tmp_path, "b")
+    config = tmp_path / "con-duct-gallery.yaml"
+    config.write_text(
+        f"examples:\n"
+        f"  - title: Run A\n    info_file: {info_a}\n"
+        f"  - title: Run B\n    info_file: {info_b}\n"
+    )
+    options = BuildOptions(
+        output=tmp_path / "README.md",
+        log_dir=tmp_path / "logs",
+        image_dir=tmp_path / "images",
+        manifest=None,
+    )
+
+    gallery = GalleryWatcher(config, options, repo_root=tmp_path)
+    gallery.rebuild()
+    assert mock_plot.call_count == 2
+    usage_b = (tmp_path / "logs" / "b" / "b_usage.json").absolute()
+    assert usage_b in gallery.watched_files()
+
+    usage_b.write_text('{"timestamp": "2024-01-02T00:00:00"}\n')
+    rebuilt = gallery.rebuild({usage_b})
+    assert [e.title for e in rebuilt] == ["Run B"]
+    assert mock_plot.call_count == 3
+
+    config.write_text(
+        f"examples:\n"
+        f"  - title: Run A\n    info_file: {info_a}\n    description: Edited\n"
+    )
+    rebuilt = gallery.rebuild({config.absolute()})
+    assert [e.title for e in rebuilt] == ["Run A"]
+    assert mock_plot.call_count == 3
+    readme = options.output.read_text()
+    assert "Edited" in readme
+    assert "### Run B" not in readme